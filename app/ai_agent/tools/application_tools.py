@@ -21,8 +21,6 @@ from app.schemas.invitations import (
 )
 from fastapi import HTTPException
 
-# Global service instance
-application_service = get_application_service()
     
 @tool
 async def create_application(
@@ -100,7 +98,7 @@ async def create_application(
                 introduction_message=introduction_message,
                 supplements_url=supplements_url
             )
-            result = await application_service.create_application(helper_id, task_id, application_data)
+            result = await get_application_service().create_application(helper_id, task_id, application_data)
             if not result:
                 return HTTPException(status_code=500, detail="Failed to create application")
             return result
@@ -150,7 +148,7 @@ async def get_application(application_id: str) -> ApplicationResponse:
             >>> print(f"Helper Message: {application.introduction_message}")
         """
         try:
-            result = await application_service.get_application(application_id)
+            result = await get_application_service().get_application(application_id)
             if not result:
                 return HTTPException(status_code=404, detail="Application not found")
             
@@ -199,7 +197,7 @@ async def get_task_applications(task_id: str) -> ApplicationListResponse:
             ...     print(f"Helper {app.helper_id}: {app.status}")
         """
         try:
-            result = await application_service.get_task_applications(task_id)
+            result = await get_application_service().get_task_applications(task_id)
             if not result:
                 return HTTPException(status_code=404, detail="No applications found for this task")
             return result
@@ -248,7 +246,7 @@ async def get_helper_applications(helper_id: str) -> ApplicationListResponse:
             >>> print(f"Pending applications: {len(pending_apps)}")
         """
         try:    
-            result = await application_service.get_helper_applications(helper_id)
+            result = await get_application_service().get_helper_applications(helper_id)
             if not result:
                 return HTTPException(status_code=500, detail="Failed to get helper applications")
             return result
@@ -303,7 +301,7 @@ async def invite_helper_to_task(task_id: str, helper_id: str) -> InvitationRespo
             >>> print(f"Invitation sent with ID: {invitation.id}")
         """
         try:
-            result = await application_service.invite_helper_to_task(task_id, helper_id)
+            result = await get_application_service().invite_helper_to_task(task_id, helper_id)
             if not result:
                 return HTTPException(status_code=500, detail="Failed to invite helper to task")
             return result
@@ -354,7 +352,7 @@ async def get_task_invitations(task_id: str) -> InvitationListResponse:
             >>> print(f"Accepted invitations: {len(accepted_invites)}")
         """
         try:
-            result = await application_service.get_task_invitations(task_id)
+            result = await get_application_service().get_task_invitations(task_id)
             if not result:
                 return HTTPException(status_code=404, detail="No invitations found for this task")
             return result
@@ -407,7 +405,7 @@ async def get_helper_invitations(helper_id: str) -> InvitationListResponse:
             >>> print(f"Pending invitations: {len(pending_invites)}")
         """
         try:
-            result = await application_service.get_helper_invitations(helper_id)
+            result = await get_application_service().get_helper_invitations(helper_id)
             if not result:
                 return HTTPException(status_code=404, detail="No invitations found for this helper")
             return result
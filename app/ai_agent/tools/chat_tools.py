@@ -22,8 +22,6 @@ from app.schemas.chat import (
 from langchain_core.tools import tool
 from fastapi import HTTPException
 
-# Global service instance
-chat_service = get_chat_service()
 
 @tool
 async def create_chat(user_id: str, participant_id: str) -> ChatResponse:
@@ -74,7 +72,7 @@ async def create_chat(user_id: str, participant_id: str) -> ChatResponse:
             >>> print(f"Chat created with ID: {result.id}")
         """
         try:
-            result = await chat_service.create_chat(UUID(user_id), UUID(participant_id))
+            result = await get_chat_service().create_chat(UUID(user_id), UUID(participant_id))
             if not result:
                 return HTTPException(status_code=500, detail="Failed to create chat")
             return result
@@ -129,7 +127,7 @@ async def get_user_chats(user_id: str) -> ChatListResponse:
             ...     print(f"Chat {chat.id} with {len(chat.users)} participants")
         """
         try:
-            result = await chat_service.get_user_chats(UUID(user_id))
+            result = await get_chat_service().get_user_chats(UUID(user_id))
             if not result:
                 return HTTPException(status_code=500, detail="Failed to get user chats")
             return result
@@ -192,7 +190,7 @@ async def get_chat_with_participants(chat_id: str, user_id: str) -> ChatWithPart
             >>> print(f"Unread messages: {chat_details.unread_count}")
         """
         try:
-            result = await chat_service.get_chat_with_participants(UUID(chat_id), UUID(user_id))
+            result = await get_chat_service().get_chat_with_participants(UUID(chat_id), UUID(user_id))
             if not result:
                 return HTTPException(status_code=500, detail="Failed to get chat with participants")
             return result
@@ -253,7 +251,7 @@ async def send_message(chat_id: str, sender_id: str, content: str) -> MessageRes
         """
         try:
             request = MessageCreateRequest(content=content)
-            result = await chat_service.send_message(UUID(chat_id), UUID(sender_id), request)
+            result = await get_chat_service().send_message(UUID(chat_id), UUID(sender_id), request)
             if not result:
                 return HTTPException(status_code=500, detail="Failed to send message")
             return result
@@ -325,7 +323,7 @@ async def get_chat_messages(chat_id: str, user_id: str, limit: int = 50, offset:
             ...     print("More messages available")
         """
         try:
-            result = await chat_service.get_chat_messages(UUID(chat_id), UUID(user_id), limit, offset)
+            result = await get_chat_service().get_chat_messages(UUID(chat_id), UUID(user_id), limit, offset)
             if not result:
                 return HTTPException(status_code=500, detail="Failed to get chat messages")
             return result
@@ -385,7 +383,7 @@ async def mark_messages_read(chat_id: str, user_id: str, message_ids: List[str])
         """
         try:
             request = ChatMarkReadRequest(message_ids=[UUID(msg_id) for msg_id in message_ids])
-            result = await chat_service.mark_messages_read(UUID(chat_id), UUID(user_id), request)
+            result = await get_chat_service().mark_messages_read(UUID(chat_id), UUID(user_id), request)
             if not result:
                 return HTTPException(status_code=500, detail="Failed to mark messages as read")
             return result
@@ -16,8 +16,6 @@ from app.schemas.helper import (
 from langchain_core.tools import tool
 from fastapi import HTTPException
 
-# Global service instance
-helper_service = get_helper_service()
     
 @tool
 async def get_helper(helper_id: str) -> HelperResponse:
@@ -63,7 +61,7 @@ async def get_helper(helper_id: str) -> HelperResponse:
             >>> print(f"Bio: {helper.bio}")
         """
         try:
-            result = await helper_service.get_helper(helper_id)
+            result = await get_helper_service().get_helper(helper_id)
             if not result:
                 return HTTPException(status_code=500, detail="Failed to get helper")
             return result
@@ -125,7 +123,7 @@ async def get_helpers(limit: int = 20, offset: int = 0) -> HelperListResponse:
             ...     print(f"- {helper.first_name} {helper.last_name} from {helper.college}")
         """
         try:
-            result = await helper_service.get_helpers(limit, offset)
+            result = await get_helper_service().get_helpers(limit, offset)
             if not result:
                 return HTTPException(status_code=500, detail="Failed to get helpers")
             return result
@@ -233,7 +231,7 @@ async def search_helpers(
                 limit=limit,
                 offset=offset
             )
-            result = await helper_service.search_helpers(search_request)
+            result = await get_helper_service().search_helpers(search_request)
             if not result:
                 return HTTPException(status_code=500, detail="Failed to search helpers")
             return result
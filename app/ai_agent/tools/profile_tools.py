@@ -19,8 +19,6 @@ from app.schemas.profile import (
 )
 from fastapi import HTTPException
 
-# Global service instance
-profile_service = get_profile_service()
     
     
 @tool
@@ -61,7 +59,7 @@ async def get_user_profile_status(user_id: str) -> UserProfileStatusResponse:
             ...     print("Missing sections:", status.missing_sections)
         """
         try:
-            result = await profile_service.get_user_profile_status(user_id)
+            result = await get_profile_service().get_user_profile_status(user_id)
             if not result:
                 return HTTPException(status_code=500, detail="Failed to get user profile status")
             return result
@@ -112,7 +110,7 @@ async def get_client_profile(user_id: str) -> ClientProfileData:
             ...     print(f"Profile picture: {client_profile.pfp_url}")
         """
         try:
-            result = await profile_service.get_client_profile(user_id)
+            result = await get_profile_service().get_client_profile(user_id)
             if not result:
                 return HTTPException(status_code=500, detail="Failed to get client profile")
             return result
@@ -169,7 +167,7 @@ async def get_helper_profile(user_id: str) -> HelperProfileData:
             >>> print(f"Bio: {helper_profile.bio}")
         """
         try:
-            result = await profile_service.get_helper_profile(user_id)
+            result = await get_profile_service().get_helper_profile(user_id)
             if not result:
                 return HTTPException(status_code=500, detail="Failed to get helper profile")
             return result
@@ -242,7 +240,7 @@ async def update_client_profile(user_id: str,
                 last_name=last_name,
                 pfp_url=pfp_url
             )
-            result = await profile_service.update_client_profile(user_id, profile_data)
+            result = await get_profile_service().update_client_profile(user_id, profile_data)
             if not result:
                 return HTTPException(status_code=500, detail="Failed to update client profile")
             return result
@@ -356,7 +354,7 @@ async def update_helper_profile(user_id: str,
                 zip_code=zip_code,
                 pfp_url=pfp_url
             )
-            result = await profile_service.update_helper_profile(user_id, profile_data)
+            result = await get_profile_service().update_helper_profile(user_id, profile_data)
             if not result:
                 return HTTPException(status_code=500, detail="Failed to update helper profile")
             return result
@@ -21,9 +21,6 @@ from app.schemas.task import (
 )
 from langchain_core.tools import tool
 
-# Global service instances
-task_service = get_task_service()
-stripe_service = get_stripe_service()
 
 # For tool decorator in langchain tools, the name is inferred from the function name,
 # but can be overridden with the name parameter. Description is inferred from the docstring.
@@ -130,7 +127,7 @@ async def create_task(client_id: str,
             tools_info=tools_info,
             public_transport_info=public_transport_info
         )
-        result = await task_service.create_task(client_id, request)
+        result = await get_task_service().create_task(client_id, request)
         if not result:
             return HTTPException(status_code=500, detail="Failed to create task")
         return result
@@ -175,7 +172,7 @@ async def get_task(task_id: str) -> TaskResponse:
         >>> print(f"Task: {task.title} - Rate: ${task.hourly_rate}/hr")
     """
     try:
-        result = await task_service.get_task(task_id)
+        result = await get_task_service().get_task(task_id)
         if not result:
             return HTTPException(status_code=404, detail="Task not found")
         
@@ -272,7 +269,7 @@ async def update_task(
             tools_info=tools_info,
             public_transport_info=public_transport_info
         )
-        result = await task_service.update_task(task_id, user_id, request)
+        result = await get_task_service().update_task(task_id, user_id, request)
         if not result:
             return HTTPException(status_code=500, detail="Failed to update task")
         return result
@@ -316,7 +313,7 @@ async def delete_task(task_id: str, user_id: str) -> bool:
             ...     print("Task successfully deleted")
         """
         try:
-            result = await task_service.delete_task(task_id, user_id)
+            result = await get_task_service().delete_task(task_id, user_id)
             if not result:
                 return HTTPException(status_code=500, detail="Failed to delete task")
             return result 
@@ -422,7 +419,7 @@ async def search_tasks(
             search_limit=limit,
             search_offset=offset
         )
-        result = await task_service.search_tasks(request)
+        result = await get_task_service().search_tasks(request)
         if not result:
             return HTTPException(status_code=404, detail="No tasks found")
         return result
@@ -493,7 +490,7 @@ async def get_user_tasks(
         >>> completed_tasks = [t for t in user_tasks.tasks if t.completed_at is not None]
     """
     try:
-        result = await task_service.get_user_tasks(user_id, limit, offset)
+        result = await get_task_service().get_user_tasks(user_id, limit, offset)
         if not result:
             return HTTPException(status_code=404, detail="No tasks found")
         
@@ -540,7 +537,7 @@ async def complete_task(task_id: str, user_id: str) -> bool:
         ...     print("Task marked as completed successfully")
     """
     try:
-        result = await task_service.complete_task(task_id, user_id)
+        result = await get_task_service().complete_task(task_id, user_id)
         if not result:
             return HTTPException(status_code=500, detail="Failed to complete task")
         
@@ -584,7 +581,7 @@ async def get_remaining_post_limit(user_id: str) -> int:
         ...     print("You have reached your task posting limit")
     """
     try:
-        result = await stripe_service.get_client_posts_remaining(user_id)
+        result = await get_stripe_service().get_client_posts_remaining(user_id)
         return result
     except Exception as e:
         return HTTPException(status_code=500, detail=str(e))
@@ -29,7 +29,7 @@ async def ai_assistant(
     try:
         current_user = None
         try:
-            current_user = get_current_user(credentials)
+            current_user = await get_current_user(credentials)
         except Exception:
             pass
         
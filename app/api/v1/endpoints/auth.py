@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 
-from app.deps.supabase import get_current_user, get_profile_service, get_auth_service
+from app.deps.supabase import get_current_user, get_current_user_remote, get_profile_service, get_auth_service
 from app.services.auth_service import AuthService
 from app.schemas.auth import (
     PhoneOTPRequest,
@@ -320,7 +320,7 @@ async def check_helper_email_verification(
 
 @router.post("/helper/update-email", response_model=OTPResponse)
 async def update_helper_email(
-    request: dict, auth_service: AuthService = Depends(get_auth_service), current_user: CurrentUser = Depends(get_current_user)
+    request: dict, auth_service: AuthService = Depends(get_auth_service), current_user: CurrentUser = Depends(get_current_user_remote)
 ):
     """Update helper email"""
     try:
@@ -1,5 +1,7 @@
+import asyncio
+import logging
 from uuid import UUID
-from typing import List
+from typing import List, Optional, Set
 from fastapi import (
     APIRouter,
     Depends,
@@ -8,11 +10,17 @@ from fastapi import (
     WebSocketDisconnect,
     status,
 )
+from pydantic import TypeAdapter, ValidationError
+
+from app.core.config import settings
 
 from app.deps.supabase import (
+    authenticate_token,
+    get_chat_membership_cache,
     get_current_user,
     get_chat_service,
     get_notifications_service,
+    get_websocket_manager,
 )
 from app.schemas.auth import CurrentUser
 from app.schemas.chat import (
@@ -24,15 +32,25 @@ from app.schemas.chat import (
     MessageListResponse,
     ChatMarkReadRequest,
     ChatWithParticipantsResponse,
+    ChatInboxResponse,
     WebSocketChatMessage,
     WebSocketReadReceipt,
+    WebSocketClientFrame,
+    WebSocketSendMessageFrame,
+    WebSocketAck,
+    WebSocketError,
 )
 from app.services.notification_service import NotificationService
 from app.services.chat_service import ChatService
+from app.services.chat_membership_cache import ChatMembershipCache
 from app.services.websocket_manager import WebSocketManager
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
-websocket_manager = WebSocketManager()
+client_frames = TypeAdapter(WebSocketClientFrame)
+# Notifications started from socket frames; held so they are not collected mid-flight
+background_tasks: Set[asyncio.Task] = set()
 
 
 @router.post("/create", response_model=ChatResponse)
@@ -70,6 +88,25 @@ async def get_user_chats(
         )
 
 
+@router.get("/inbox", response_model=ChatInboxResponse)
+async def get_inbox(
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    chat_service: ChatService = Depends(get_chat_service),
+):
+    """Get the current user's chats with last message previews and unread counts"""
+    try:
+        return await chat_service.get_inbox(current_user.id, limit, cursor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get inbox: {str(e)}",
+        )
+
+
 @router.get("/{chat_id}", response_model=ChatWithParticipantsResponse)
 async def get_chat_with_participants(
     chat_id: UUID,
@@ -95,6 +132,7 @@ async def send_message(
     current_user: CurrentUser = Depends(get_current_user),
     chat_service: ChatService = Depends(get_chat_service),
     notification_service: NotificationService = Depends(get_notifications_service),
+    websocket_manager: WebSocketManager = Depends(get_websocket_manager),
 ):
     """Send a new message in a chat"""
     try:
@@ -204,6 +242,7 @@ async def mark_messages_read(
     request: ChatMarkReadRequest,
     current_user: CurrentUser = Depends(get_current_user),
     chat_service: ChatService = Depends(get_chat_service),
+    websocket_manager: WebSocketManager = Depends(get_websocket_manager),
 ):
     """Mark messages as read"""
     try:
@@ -234,35 +273,130 @@ async def mark_messages_read(
 async def websocket_endpoint(
     websocket: WebSocket,
     chat_id: UUID,
+    token: Optional[str] = None,
+    membership_cache: ChatMembershipCache = Depends(get_chat_membership_cache),
     chat_service: ChatService = Depends(get_chat_service),
+    notification_service: NotificationService = Depends(get_notifications_service),
+    websocket_manager: WebSocketManager = Depends(get_websocket_manager),
 ):
-    """WebSocket endpoint for real-time chat communication"""
+    """WebSocket endpoint for real-time chat communication
+
+    When an access token is passed as ?token=, the subscriber must be a
+    member of the chat and may send typed frames: ``send_message`` and
+    ``mark_read``. Each is answered with an ``ack`` (carrying the server
+    message id) or an ``error`` echoing the frame's client_id. Sockets
+    without a token only receive.
+    """
     await websocket.accept()
 
-    try:
-        # Subscribe to chat updates
-        await websocket_manager.connect(websocket, chat_id)
+    user = None
+    if token is not None:
+        try:
+            user = await authenticate_token(token)
+            await membership_cache.require_member(chat_id, user.id)
+        except HTTPException as e:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+            return
 
-        # Send connection confirmation
+    in_flight = asyncio.Semaphore(settings.WEBSOCKET_MAX_PENDING_FRAMES)
+    handlers: Set[asyncio.Task] = set()
+
+    def handler_done(task: asyncio.Task):
+        handlers.discard(task)
+        in_flight.release()
+
+    try:
+        # Send connection confirmation before the writer task owns the socket
         await websocket.send_text("Connected to chat")
 
+        # Subscribe to chat updates
+        await websocket_manager.connect(websocket, chat_id, user.id if user else None)
+
         # Keep connection alive and handle incoming messages
         while True:
             try:
                 # Wait for messages from client
-                _ = await websocket.receive_text()
-
-                # Handle incoming WebSocket messages if needed
-                # For now, just keep connection alive
-
+                text = await websocket.receive_text()
             except WebSocketDisconnect:
                 break
             except Exception as e:
                 print(f"WebSocket error: {str(e)}")
                 break
 
+            if user is None:
+                # Receive-only subscriber; frames just keep the connection alive
+                continue
+
+            # Frames are handled concurrently so sends pipeline into one
+            # group-committed insert; reads pause once too many are pending
+            await in_flight.acquire()
+            task = asyncio.create_task(
+                handle_client_frame(
+                    websocket, chat_id, user, text, chat_service, notification_service, websocket_manager
+                )
+            )
+            handlers.add(task)
+            task.add_done_callback(handler_done)
+
     except Exception as e:
         print(f"WebSocket connection error: {str(e)}")
     finally:
         # Clean up connection
         await websocket_manager.disconnect(websocket, chat_id)
+
+
+async def handle_client_frame(
+    websocket: WebSocket,
+    chat_id: UUID,
+    user: CurrentUser,
+    text: str,
+    chat_service: ChatService,
+    notification_service: NotificationService,
+    websocket_manager: WebSocketManager,
+):
+    """Apply one client frame and queue its ack or error for the sender"""
+    try:
+        frame = client_frames.validate_json(text)
+    except ValidationError as e:
+        detail = "; ".join(error["msg"] for error in e.errors())
+        websocket_manager.send_to(websocket, WebSocketError(detail=f"Invalid frame: {detail}").model_dump_json())
+        return
+
+    try:
+        if isinstance(frame, WebSocketSendMessageFrame):
+            message = await chat_service.send_message(
+                chat_id, user.id, MessageCreateRequest(content=frame.content)
+            )
+            websocket_manager.send_to(websocket, WebSocketAck(
+                client_id=frame.client_id, message_id=message.id, created_at=message.created_at
+            ).model_dump_json())
+            await websocket_manager.broadcast_chat_message(
+                chat_id, WebSocketChatMessage(chat_id=chat_id, message=message)
+            )
+
+            task = asyncio.create_task(
+                notification_service.send_msg_notification(chat_id, user.id, message.content)
+            )
+            background_tasks.add(task)
+            task.add_done_callback(background_tasks.discard)
+        else:
+            request = ChatMarkReadRequest(message_ids=frame.message_ids)
+            result = await chat_service.mark_messages_read(chat_id, user.id, request)
+            websocket_manager.send_to(websocket, WebSocketAck(
+                client_id=frame.client_id, read_at=result["read_at"]
+            ).model_dump_json())
+            await websocket_manager.broadcast_read_receipt(chat_id, WebSocketReadReceipt(
+                chat_id=chat_id,
+                message_ids=frame.message_ids,
+                read_by=user.id,
+                read_at=result["read_at"],
+            ))
+    except HTTPException as e:
+        websocket_manager.send_to(websocket, WebSocketError(
+            client_id=frame.client_id, detail=str(e.detail)
+        ).model_dump_json())
+    except Exception as e:
+        logger.error(f"Failed to handle WebSocket frame in chat {chat_id}: {e}")
+        websocket_manager.send_to(websocket, WebSocketError(
+            client_id=frame.client_id, detail="Internal error"
+        ).model_dump_json())
@@ -5,6 +5,7 @@ import logging
 
 from app.utils.emailer import EmailUtils
 from app.core.config import settings
+from app.deps.supabase import get_emailer
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +25,10 @@ class ContactResponse(BaseModel):
     message: str
 
 
-emailer = EmailUtils()
-
 @router.post("/contact", response_model=ContactResponse)
-async def submit_contact_form(contact_data: ContactFormData):
+async def submit_contact_form(
+    contact_data: ContactFormData, emailer: EmailUtils = Depends(get_emailer)
+):
     """
     Submit contact form and send emails
     """
@@ -2,7 +2,7 @@ from app.schemas.profile import ProfileExpoNotificationRequest
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 
-from app.deps.supabase import get_current_user, get_profile_service
+from app.deps.supabase import get_current_user, get_current_user_remote, get_profile_service
 from app.services.profile_service import ProfileService
 from app.schemas.auth import ClientProfileUpdateRequest, HelperProfileUpdateRequest
 from app.schemas.profile import ProfileUpdateData
@@ -144,7 +144,7 @@ async def get_profile_status(
 
 @router.post("/delete-profile")
 async def delete_profile(
-    current_user: str = Depends(get_current_user),
+    current_user: str = Depends(get_current_user_remote),
     profile_service: ProfileService = Depends(get_profile_service),
 ):
     try:
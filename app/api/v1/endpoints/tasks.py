@@ -46,7 +46,8 @@ async def get_tasks(
     search_offset: int = 0,
     task_service: TaskService = Depends(get_task_service),
     distance_radius: float = 100,
-    sort_by: str = None
+    sort_by: str = None,
+    cursor: str = None
 ):
     """Get tasks with pagination, filtering, and distance-based sorting"""
     try:
@@ -60,7 +61,8 @@ async def get_tasks(
             search_limit=search_limit,
             search_offset=search_offset,
             sort_by=sort_by,
-            distance_radius=distance_radius
+            distance_radius=distance_radius,
+            cursor=cursor
         )
         return await task_service.search_tasks(search_request)
     except HTTPException:
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,6 +8,36 @@ class Settings(BaseSettings):
     SUPABASE_ANON_KEY: str
     SUPABASE_SERVICE_ROLE_KEY: str
 
+    # Async PostgREST connection pool
+    SUPABASE_MAX_CONNECTIONS: int = 200
+    SUPABASE_MAX_KEEPALIVE_CONNECTIONS: int = 50
+    SUPABASE_KEEPALIVE_EXPIRY: float = 30.0
+
+    # Local access-token verification (HS256 secret; asymmetric keys come from JWKS)
+    SUPABASE_JWT_SECRET: Optional[str] = None
+    SUPABASE_JWKS_REFRESH_SECONDS: int = 600
+    AUTH_USER_CACHE_TTL_SECONDS: int = 60
+    CHAT_MEMBERSHIP_CACHE_TTL_SECONDS: int = 300
+    # Helper search pages per process; profile changes here invalidate them at once
+    HELPER_SEARCH_CACHE_TTL_SECONDS: float = 60.0
+    HELPER_SEARCH_CACHE_SIZE: int = 1000
+
+    # Cross-worker WebSocket broadcasts (postgresql:// URL for LISTEN/NOTIFY).
+    # Unset keeps broadcasts in-process, which is only correct with one worker.
+    WEBSOCKET_BACKPLANE_URL: Optional[str] = None
+    # Frames buffered per socket before a slow client is disconnected
+    WEBSOCKET_SEND_QUEUE_SIZE: int = 100
+    WEBSOCKET_SEND_TIMEOUT_SECONDS: float = 10.0
+    # Client frames a socket may have in flight before reads pause
+    WEBSOCKET_MAX_PENDING_FRAMES: int = 32
+
+    # Background notification jobs (public.notification_jobs), per app process
+    NOTIFICATION_WORKERS: int = 4
+    NOTIFICATION_POLL_SECONDS: float = 1.0
+    NOTIFICATION_MAX_ATTEMPTS: int = 5
+    # Chat SMS/pushes to one recipient within this window are sent as one summary
+    NOTIFICATION_COALESCE_SECONDS: float = 30.0
+
     # Stripe Configuration
     STRIPE_SECRET_KEY: str
     STRIPE_PUBLISHABLE_KEY: str
@@ -19,6 +51,14 @@ class Settings(BaseSettings):
     # OpenPhone Configuration
     OPENPHONE_API_KEY: str
     OPENPHONE_FROM_NUMBER: str
+    OPENPHONE_URL: str = "https://api.openphone.com/v1"
+    OPENPHONE_RATE_LIMIT_PER_SECOND: float = 10.0
+    # Requests in flight per process; 429/5xx responses are retried with backoff
+    OPENPHONE_MAX_CONCURRENCY: int = 10
+    OPENPHONE_MAX_RETRIES: int = 3
+    # Bulk sends: recipients per request, and chunk requests in flight at once
+    OPENPHONE_BULK_CHUNK_SIZE: int = 100
+    OPENPHONE_BULK_CONCURRENCY: int = 5
 
     OPENAI_API_KEY: str
 
@@ -27,12 +67,20 @@ class Settings(BaseSettings):
     EMAIL_PASSWORD: str
     SMTP_SERVER: str = "smtp.gmail.com"
     SMTP_PORT: int = 587
+    SMTP_STARTTLS: bool = True
+    # Authenticated sessions kept open and reused across sends
+    SMTP_MAX_CONNECTIONS: int = 2
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_IDLE_TIMEOUT_SECONDS: float = 60.0
+    EMAIL_RATE_LIMIT_PER_SECOND: float = 5.0
 
     # Apple app bundle information
     HELPER_MOBILE_APP_BUNDLE_ID: str
     HELPER_PUSH_NOTIFICATION_P8_ID: str
     PUSH_TOKEN_SECRET: str
     APPLE_ID: str
+    APNS_URL: str = "https://api.sandbox.push.apple.com"
+    APNS_MAX_CONCURRENT_STREAMS: int = 500
 
     model_config = SettingsConfigDict(
         env_file=".env", case_sensitive=False, extra="ignore"
@@ -0,0 +1,144 @@
+import logging
+from functools import lru_cache
+
+from supabase import AClient, Client
+
+from app.core.config import settings
+
+from app.services.apns_client import APNsClient, close_apns_client, get_apns_client
+from app.services.application_service import ApplicationService
+from app.services.auth_service import AuthService
+from app.services.chat_membership_cache import ChatMembershipCache
+from app.services.chat_service import ChatService
+from app.services.helper_search_cache import HelperSearchCache
+from app.services.helper_service import HelperService
+from app.services.notification_queue import NotificationQueue
+from app.services.openphone_client import close_openphone_client
+from app.services.smtp_pool import close_smtp_pool
+from app.services.notification_service import NotificationService
+from app.services.profile_service import ProfileService
+from app.services.stripe_service import StripeService
+from app.services.supabase_client import (
+    close_supabase_pools,
+    get_admin_supabase,
+    get_admin_supabase_async,
+    get_public_supabase,
+)
+from app.services.task_service import TaskService
+from app.services.token_verifier import TokenVerifier, get_token_verifier
+from app.services.websocket_backplane import create_backplane
+from app.services.websocket_manager import WebSocketManager
+from app.services.zip_code_index import ZipCodeIndex
+from app.utils.emailer import EmailUtils
+from app.utils.sms import SMSUtils
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """Process-wide service graph.
+
+    Services are stateless apart from the clients they hold, so one instance
+    of each is shared by every request. Built on startup by the app lifespan
+    and closed on shutdown.
+    """
+
+    def __init__(self):
+        # Shared clients and pools
+        self.public_client: Client = get_public_supabase()
+        self.sync_admin_client: Client = get_admin_supabase()
+        self.admin_client: AClient = get_admin_supabase_async()
+        self.token_verifier: TokenVerifier = get_token_verifier()
+        self.apns: APNsClient = get_apns_client()
+        self.emailer = EmailUtils()
+        self.smser = SMSUtils()
+        self.websocket_manager = WebSocketManager(
+            create_backplane(settings.WEBSOCKET_BACKPLANE_URL),
+            send_queue_size=settings.WEBSOCKET_SEND_QUEUE_SIZE,
+            send_timeout=settings.WEBSOCKET_SEND_TIMEOUT_SECONDS,
+        )
+        self.zip_code_index = ZipCodeIndex()
+        self.chat_membership_cache = ChatMembershipCache(
+            self.admin_client, ttl_seconds=settings.CHAT_MEMBERSHIP_CACHE_TTL_SECONDS
+        )
+        self.helper_search_cache = HelperSearchCache(
+            ttl_seconds=settings.HELPER_SEARCH_CACHE_TTL_SECONDS,
+            max_size=settings.HELPER_SEARCH_CACHE_SIZE,
+        )
+        self.notification_queue = NotificationQueue(
+            self.admin_client,
+            workers=settings.NOTIFICATION_WORKERS,
+            poll_interval=settings.NOTIFICATION_POLL_SECONDS,
+            max_attempts=settings.NOTIFICATION_MAX_ATTEMPTS,
+            coalesce_window=settings.NOTIFICATION_COALESCE_SECONDS,
+            # OpenPhone is limited in OpenPhoneClient, shared with bulk sends
+            rate_limits={"email": settings.EMAIL_RATE_LIMIT_PER_SECOND},
+        )
+
+        # Services
+        self.stripe_service = StripeService(self.admin_client)
+        self.profile_service = ProfileService(self.admin_client, helper_search_cache=self.helper_search_cache)
+        self.auth_service = AuthService(
+            self.public_client, self.sync_admin_client, helper_search_cache=self.helper_search_cache
+        )
+        self.helper_service = HelperService(self.admin_client, search_cache=self.helper_search_cache)
+        self.task_service = TaskService(
+            self.admin_client,
+            self.stripe_service,
+            emailer=self.emailer,
+            smser=self.smser,
+            zip_code_index=self.zip_code_index,
+            jobs=self.notification_queue,
+        )
+        self.application_service = ApplicationService(
+            self.admin_client,
+            self.task_service,
+            self.helper_service,
+            smser=self.smser,
+            jobs=self.notification_queue,
+        )
+        self.chat_service = ChatService(
+            self.admin_client,
+            smser=self.smser,
+            membership_cache=self.chat_membership_cache,
+            presence=self.websocket_manager,
+            jobs=self.notification_queue,
+        )
+        self.notification_service = NotificationService(
+            self.admin_client,
+            membership_cache=self.chat_membership_cache,
+            presence=self.websocket_manager,
+            apns=self.apns,
+            jobs=self.notification_queue,
+        )
+
+    async def startup(self) -> None:
+        self.token_verifier.start()
+        await self.websocket_manager.start()
+        self.notification_queue.start()
+        try:
+            await self.zip_code_index.load(self.admin_client)
+        except Exception as e:
+            # Zip lookups fall back to the database until the next restart
+            logger.error(f"Failed to load zip codes: {e}")
+
+    async def aclose(self) -> None:
+        await self.token_verifier.stop()
+        await self.notification_queue.stop()
+        await self.websocket_manager.stop()
+        await close_apns_client()
+        await close_openphone_client()
+        await close_smtp_pool()
+        await close_supabase_pools()
+
+
+@lru_cache(maxsize=1)
+def get_service_container() -> ServiceContainer:
+    return ServiceContainer()
+
+
+async def close_service_container() -> None:
+    """Close the shared container, if one was built, so the next startup gets a fresh graph"""
+    if get_service_container.cache_info().currsize:
+        await get_service_container().aclose()
+        get_service_container.cache_clear()
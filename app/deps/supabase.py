@@ -1,8 +1,12 @@
-from supabase import Client
+from supabase import Client, AClient
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.services.notification_service import NotificationService
-from app.services.supabase_client import get_public_supabase, get_admin_supabase
+from starlette.concurrency import run_in_threadpool
+from app.services.supabase_client import (
+    get_public_supabase,
+    get_admin_supabase,
+    get_admin_supabase_async,
+)
 from app.services.profile_service import ProfileService
 from app.services.stripe_service import StripeService
 from app.services.task_service import TaskService
@@ -10,8 +14,16 @@ from app.services.auth_service import AuthService
 from app.services.helper_service import HelperService
 from app.services.application_service import ApplicationService
 from app.services.chat_service import ChatService
+from app.services.chat_membership_cache import ChatMembershipCache
 from app.services.notification_service import NotificationService
+from app.services.websocket_manager import WebSocketManager
+from app.services.token_verifier import (
+    LocalVerificationUnavailable,
+    TokenVerificationError,
+)
 from app.schemas.auth import CurrentUser
+from app.utils.emailer import EmailUtils
+from app.deps.container import get_service_container
 
 security = HTTPBearer()
 
@@ -24,40 +36,86 @@ def get_supabase_admin() -> Client:
     return get_admin_supabase()
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current authenticated user from JWT token"""
+def get_supabase_admin_async() -> AClient:
+    return get_admin_supabase_async()
+
+
+def _fetch_remote_user(token: str) -> CurrentUser:
+    """Resolve a token through the Supabase auth server"""
+    public_client = get_public_supabase()
+    user = public_client.auth.get_user(token)
+
+    # if not user or not user.user:
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+        )
+
+    return CurrentUser(
+        id=user.user.id,
+        email=user.user.email,
+        phone=user.user.phone,
+        email_confirmed_at=(
+            user.user.email_confirmed_at.isoformat()
+            if user.user.email_confirmed_at
+            else None
+        ),
+        phone_confirmed_at=(
+            user.user.phone_confirmed_at.isoformat()
+            if user.user.phone_confirmed_at
+            else None
+        ),
+        created_at=user.user.created_at.isoformat(),
+    )
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> CurrentUser:
+    """Get current authenticated user from JWT token, verified locally"""
+    return await authenticate_token(credentials.credentials)
+
+
+async def authenticate_token(token: str) -> CurrentUser:
+    """Resolve an access token to a user; for callers without a bearer header, e.g. WebSockets"""
+    verifier = get_service_container().token_verifier
 
     try:
-        public_client = get_public_supabase()
-        user = public_client.auth.get_user(credentials.credentials)
-
-        # if not user or not user.user:
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token",
-            )
-
-        return CurrentUser(
-            id=user.user.id,
-            email=user.user.email,
-            phone=user.user.phone,
-            email_confirmed_at=(
-                user.user.email_confirmed_at.isoformat()
-                if user.user.email_confirmed_at
-                else None
-            ),
-            phone_confirmed_at=(
-                user.user.phone_confirmed_at.isoformat()
-                if user.user.phone_confirmed_at
-                else None
-            ),
-            created_at=user.user.created_at.isoformat(),
-            # email_confirmed_at=user.user.email_confirmed_at,
-            # phone_confirmed_at=user.user.phone_confirmed_at,
-            # created_at=user.user.created_at,
+        return await verifier.verify(token)
+    except TokenVerificationError as e:
+        print(e)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token"
         )
+    except LocalVerificationUnavailable:
+        # No key material for this token; fall back to the auth server
+        pass
 
+    try:
+        user = await run_in_threadpool(_fetch_remote_user, token)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(e)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token"
+        )
+    verifier.cache_user(token, user)
+    return user
+
+
+def get_current_user_remote(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> CurrentUser:
+    """Get current user by asking the auth server on every call.
+
+    Use on sensitive routes where a revoked session must be rejected
+    immediately; bypasses local verification and the user cache.
+    """
+
+    try:
+        return _fetch_remote_user(credentials.credentials)
     except HTTPException:
         raise
     except Exception as e:
@@ -69,51 +127,50 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
 
 def get_stripe_service() -> StripeService:
     """Dependency to get Stripe service"""
-    admin_client = get_supabase_admin()
-    return StripeService(admin_client)
+    return get_service_container().stripe_service
 
 
 def get_profile_service() -> ProfileService:
     """Dependency to get profile service with Supabase admin client"""
-    admin_client = get_supabase_admin()
-    return ProfileService(admin_client)
+    return get_service_container().profile_service
 
 
 def get_auth_service() -> AuthService:
     """Dependency to get auth service with Supabase clients"""
-    public_client = get_public_supabase()
-    admin_client = get_supabase_admin()
-    return AuthService(public_client, admin_client)
+    return get_service_container().auth_service
 
 
 def get_task_service() -> TaskService:
     """Dependency to get task service with Supabase admin client"""
-    admin_client = get_supabase_admin()
-    stripe_service = get_stripe_service()
-    task_service = TaskService(admin_client, stripe_service)
-    return task_service
+    return get_service_container().task_service
 
 
 def get_helper_service() -> HelperService:
     """Dependency to get helper service with Supabase admin client"""
-    admin_client = get_supabase_admin()
-    return HelperService(admin_client)
+    return get_service_container().helper_service
 
 
 def get_application_service() -> ApplicationService:
     """Dependency to get application service with Supabase admin client and task service"""
-    admin_client = get_supabase_admin()
-    task_service = get_task_service()
-    helper_service = get_helper_service()
-    return ApplicationService(admin_client, task_service, helper_service)
+    return get_service_container().application_service
 
 
 def get_chat_service() -> ChatService:
     """Dependency to get chat service with Supabase admin client"""
-    admin_client = get_supabase_admin()
-    return ChatService(admin_client)
+    return get_service_container().chat_service
 
 
 def get_notifications_service() -> NotificationService:
-    admin_client = get_supabase_admin()
-    return NotificationService(admin_client)
+    return get_service_container().notification_service
+
+
+def get_emailer() -> EmailUtils:
+    return get_service_container().emailer
+
+
+def get_websocket_manager() -> WebSocketManager:
+    return get_service_container().websocket_manager
+
+
+def get_chat_membership_cache() -> ChatMembershipCache:
+    return get_service_container().chat_membership_cache
@@ -1,4 +1,6 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.cors import CORS_KWARGS
@@ -11,8 +13,20 @@ from app.api.v1.endpoints.helper import router as helper_router
 from app.api.v1.endpoints.chat import router as chat_router
 from app.api.v1.endpoints.ai_agent import router as ai_agent_router
 from app.api.v1.endpoints.contact import router as contact_router
+from app.deps.container import get_service_container, close_service_container
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the shared service graph once; request dependencies hand out its members
+    container = get_service_container()
+    await container.startup()
+    app.state.services = container
+    yield
+    await close_service_container()
+
 
-app = FastAPI(title="HelperU Backend Server", version="0.1.0")
+app = FastAPI(title="HelperU Backend Server", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -40,6 +54,19 @@ def healthz() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/healthz/jobs")
+async def healthz_jobs(request: Request) -> dict:
+    # This process's workers, plus queue depth across every worker
+    queue = request.app.state.services.notification_queue
+    return {"worker": queue.metrics(), "queue": await queue.stats()}
+
+
+@app.get("/healthz/caches")
+def healthz_caches(request: Request) -> dict:
+    # Per process; each app worker keeps its own
+    return {"helper_search": request.app.state.services.helper_search_cache.metrics()}
+
+
 @app.get("/")
 def root() -> dict:
     return {
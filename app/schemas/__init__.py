@@ -84,8 +84,15 @@ from .chat import (
     ChatMarkReadRequest,
     ChatWithParticipantsResponse,
     ChatParticipantInfo,
+    ChatInboxEntry,
+    ChatInboxResponse,
     WebSocketChatMessage,
-    WebSocketReadReceipt
+    WebSocketReadReceipt,
+    WebSocketSendMessageFrame,
+    WebSocketMarkReadFrame,
+    WebSocketClientFrame,
+    WebSocketAck,
+    WebSocketError,
 )
 
 from .sms import (
@@ -103,6 +110,7 @@ from .sms import (
     VerificationCodeNotification,
     WelcomeMessageNotification,
     BulkNotificationRequest,
+    BulkChunkResult,
     BulkNotificationResponse,
     InvitationNotification
 )
@@ -190,8 +198,15 @@ __all__ = [
     "ChatMarkReadRequest",
     "ChatWithParticipantsResponse",
     "ChatParticipantInfo",
+    "ChatInboxEntry",
+    "ChatInboxResponse",
     "WebSocketChatMessage",
     "WebSocketReadReceipt",
+    "WebSocketSendMessageFrame",
+    "WebSocketMarkReadFrame",
+    "WebSocketClientFrame",
+    "WebSocketAck",
+    "WebSocketError",
     
     # OpenPhone schemas
     "OpenPhoneMessageRequest",
@@ -208,6 +223,7 @@ __all__ = [
     "VerificationCodeNotification",
     "WelcomeMessageNotification",
     "BulkNotificationRequest",
+    "BulkChunkResult",
     "BulkNotificationResponse",
     "InvitationNotification",
     # AI schemas
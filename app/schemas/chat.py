@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Annotated, List, Literal, Optional, Union
 from datetime import datetime
 from uuid import UUID
 from pydantic import BaseModel, Field
@@ -72,6 +72,26 @@ class ChatWithParticipantsResponse(BaseModel):
     unread_count: int
 
 
+class ChatInboxEntry(BaseModel):
+    """One chat in a user's inbox with its latest message and unread count"""
+    id: UUID
+    participants: List[ChatParticipantInfo]
+    last_message: Optional[str] = Field(None, description="Preview of the latest message")
+    last_message_at: Optional[datetime] = None
+    last_message_sender_id: Optional[UUID] = None
+    unread_count: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+
+class ChatInboxResponse(BaseModel):
+    """One page of a user's inbox, most recently active first"""
+    chats: List[ChatInboxEntry]
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as cursor to fetch the next page; null on the last page"
+    )
+
+
 class WebSocketChatMessage(BaseModel):
     """WebSocket message for chat updates"""
     type: str = "chat_message"
@@ -86,3 +106,38 @@ class WebSocketReadReceipt(BaseModel):
     message_ids: List[UUID]
     read_by: UUID
     read_at: datetime
+
+
+class WebSocketSendMessageFrame(BaseModel):
+    """Client frame: post a message to the socket's chat"""
+    type: Literal["send_message"]
+    client_id: Optional[str] = Field(None, max_length=100, description="Echoed back in the ack")
+    content: str = Field(..., min_length=1, max_length=1000)
+
+
+class WebSocketMarkReadFrame(BaseModel):
+    """Client frame: mark messages in the socket's chat as read"""
+    type: Literal["mark_read"]
+    client_id: Optional[str] = Field(None, max_length=100, description="Echoed back in the ack")
+    message_ids: List[UUID]
+
+
+WebSocketClientFrame = Annotated[
+    Union[WebSocketSendMessageFrame, WebSocketMarkReadFrame], Field(discriminator="type")
+]
+
+
+class WebSocketAck(BaseModel):
+    """Server frame confirming a client frame was committed"""
+    type: str = "ack"
+    client_id: Optional[str] = None
+    message_id: Optional[UUID] = Field(None, description="Server id of a sent message")
+    created_at: Optional[datetime] = None
+    read_at: Optional[datetime] = None
+
+
+class WebSocketError(BaseModel):
+    """Server frame rejecting a client frame"""
+    type: str = "error"
+    client_id: Optional[str] = None
+    detail: str
@@ -69,6 +69,7 @@ class MessageNotification(BaseModel):
     sender_name: str = Field(..., description="Name of the message sender")
     chat_id: str = Field(..., description="Chat ID")
     message_preview: str = Field(..., description="Preview of the message content")
+    message_count: int = Field(1, description="Messages summarized by this notification; the preview is the latest")
 
 
 class TaskCompletionNotification(BaseModel):
@@ -106,6 +107,22 @@ class BulkNotificationRequest(BaseModel):
     phone_numbers: List[str] = Field(..., description="List of phone numbers to notify")
     content: str = Field(..., description="Message content to send")
     user_id: Optional[str] = Field(None, description="Optional user ID for tracking")
+    campaign_id: Optional[str] = Field(
+        None, description="Existing campaign to resume; only its unsent chunks are sent again"
+    )
+
+
+class BulkChunkResult(BaseModel):
+    """Model for the outcome of one provider-sized chunk of a bulk send"""
+    index: int = Field(..., description="Position of the chunk in the campaign")
+    recipients: List[str] = Field(..., description="Phone numbers in the chunk")
+    success: bool = Field(..., description="Whether the chunk was accepted by OpenPhone")
+    message_id: Optional[str] = Field(None, description="OpenPhone message ID for the chunk")
+    error: Optional[str] = Field(None, description="Error from the last attempt, if it failed")
+    uncertain: bool = Field(
+        False, description="Whether OpenPhone may have accepted the chunk despite the error; such chunks are not resent"
+    )
+    attempts: int = Field(1, description="Number of times the chunk has been sent")
 
 
 class BulkNotificationResponse(BaseModel):
@@ -116,6 +133,8 @@ class BulkNotificationResponse(BaseModel):
     failed_sends: int = Field(..., description="Number of failed sends")
     message_ids: List[str] = Field(..., description="List of message IDs for successful sends")
     errors: List[str] = Field(default_factory=list, description="List of error messages for failed sends")
+    campaign_id: Optional[str] = Field(None, description="Campaign ID to pass back to resume failed chunks")
+    chunks: List[BulkChunkResult] = Field(default_factory=list, description="Outcome of each chunk")
 
 
 class OpenPhoneServiceHealth(BaseModel):
@@ -61,8 +61,9 @@ class TaskSearchRequest(BaseModel):
     min_hourly_rate: Optional[float] = Field(None, ge=0, description="Minimum hourly rate filter")
     max_hourly_rate: Optional[float] = Field(None, ge=0, description="Maximum hourly rate filter")
     search_limit: int = Field(20, ge=1, le=1000, description="Number of tasks to return")
-    search_offset: int = Field(0, ge=0, description="Number of tasks to skip")
-    sort_by: Optional[str] = Field('post_date', description="Sort mode: 'distance' or 'post_date'")
+    search_offset: int = Field(0, ge=0, description="Number of tasks to skip, ignored when a cursor is given")
+    cursor: Optional[str] = Field(None, description="Opaque next_cursor from the previous page")
+    sort_by: Optional[str] = Field('post_date', description="Sort mode: 'distance', 'post_date' or 'relevance'")
     distance_radius: Optional[float] = Field(100, ge=0, le=500, description="Distance radius in miles for distance sorting, default is 100 miles")
 
     @validator("max_hourly_rate")
@@ -100,6 +101,9 @@ class TaskSearchResponse(BaseModel):
     distance: Optional[float] = Field(
         None, description="Distance in miles from search location"
     )
+    relevance: Optional[float] = Field(
+        None, description="Blended text, recency and distance score when sorting by relevance"
+    )
     client: ClientInfo
 
 
@@ -139,6 +143,9 @@ class TaskSearchListResponse(BaseModel):
     tasks: List[TaskSearchResponse]
     limit: int
     offset: int
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as cursor to fetch the next page; null on the last page"
+    )
 
 
 class PublicTask(BaseModel):
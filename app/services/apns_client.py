@@ -0,0 +1,152 @@
+import asyncio
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+import jwt
+
+from app.core.config import settings
+
+# Worth sending again later: throttled, or APNs failing
+RETRY_STATUSES = {429, 500, 503}
+# The token will never work again (410), or not for this app
+DEAD_TOKEN_REASONS = {"BadDeviceToken", "Unregistered", "DeviceTokenNotForTopic"}
+
+
+class APNsError(Exception):
+    """APNs asked for the push to be retried later"""
+
+    def __init__(self, device_token: str, status: int, reason: Optional[str]):
+        super().__init__(f"APNs returned {status} {reason or ''}".strip())
+        self.device_token = device_token
+        self.status = status
+        self.reason = reason
+
+
+class APNsClient:
+    """Sends pushes to APNs over one long-lived, multiplexed HTTP/2 connection.
+
+    The provider token (an ES256 JWT) is signed once and reused until
+    ``token_ttl_seconds``; Apple rejects tokens older than an hour and
+    throttles ones refreshed more often than every 20 minutes. In-flight
+    requests are capped at ``max_concurrent_streams`` per connection, below
+    the stream limit APNs advertises.
+
+    ``send`` raises APNsError for statuses worth retrying (429, 500, 503) and
+    returns every other response, which ``is_dead_token`` classifies.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        topic: str,
+        key_id: str,
+        team_id: str,
+        private_key: str,
+        max_connections: int = 1,
+        max_concurrent_streams: int = 500,
+        token_ttl_seconds: int = 50 * 60,
+        timeout: float = 10.0,
+        verify=True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.topic = topic
+        self.key_id = key_id
+        self.team_id = team_id
+        self.private_key = private_key
+        self.token_ttl_seconds = token_ttl_seconds
+        self._client = httpx.AsyncClient(
+            http2=True,
+            base_url=self.base_url,
+            timeout=timeout,
+            verify=verify,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=max_connections, max_keepalive_connections=max_connections
+            ),
+        )
+        self._streams = asyncio.Semaphore(max_connections * max_concurrent_streams)
+        self._token: Optional[str] = None
+        self._token_issued_at = 0.0
+
+    def provider_token(self, refresh: bool = False) -> str:
+        """The cached provider token, re-signed once it reaches its TTL"""
+        now = time.time()
+        if refresh or self._token is None or now - self._token_issued_at >= self.token_ttl_seconds:
+            self._token = jwt.encode(
+                {"iss": self.team_id, "iat": int(now)},
+                self.private_key,
+                algorithm="ES256",
+                headers={"alg": "ES256", "kid": self.key_id},
+            )
+            self._token_issued_at = now
+        return self._token
+
+    async def send(self, device_token: str, payload: dict, push_type: str = "alert") -> Dict:
+        """Send one push; returns the device token, HTTP status and response body"""
+        async with self._streams:
+            response = await self._post(device_token, payload, push_type, self.provider_token())
+            if response.status_code == 403 and "ExpiredProviderToken" in response.text:
+                response = await self._post(
+                    device_token, payload, push_type, self.provider_token(refresh=True)
+                )
+        reason = None
+        if response.status_code != 200:
+            try:
+                reason = response.json().get("reason")
+            except ValueError:
+                pass
+        if response.status_code in RETRY_STATUSES:
+            raise APNsError(device_token, response.status_code, reason)
+        return {
+            "device_token": device_token,
+            "status": response.status_code,
+            "reason": reason,
+            "body": response.text,
+        }
+
+    @staticmethod
+    def is_dead_token(result: Dict) -> bool:
+        """Whether a send result means the device token should be forgotten"""
+        return result["status"] == 410 or result.get("reason") in DEAD_TOKEN_REASONS
+
+    async def _post(self, device_token: str, payload: dict, push_type: str, token: str):
+        return await self._client.post(
+            f"/3/device/{device_token}",
+            headers={
+                "authorization": f"bearer {token}",
+                "apns-topic": self.topic,
+                "apns-push-type": push_type,
+            },
+            json=payload,
+        )
+
+    async def send_many(self, device_tokens: Iterable[str], payload: dict) -> List:
+        """Send the same push to several devices concurrently; errors are returned, not raised"""
+        return await asyncio.gather(
+            *(self.send(token, payload) for token in device_tokens), return_exceptions=True
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+@lru_cache(maxsize=1)
+def get_apns_client() -> APNsClient:
+    return APNsClient(
+        settings.APNS_URL,
+        topic=settings.HELPER_MOBILE_APP_BUNDLE_ID,
+        key_id=settings.HELPER_PUSH_NOTIFICATION_P8_ID,
+        team_id=settings.APPLE_ID,
+        private_key=settings.PUSH_TOKEN_SECRET.replace("\\n", "\n"),
+        max_concurrent_streams=settings.APNS_MAX_CONCURRENT_STREAMS,
+    )
+
+
+async def close_apns_client() -> None:
+    """Close the shared APNs connection, if one was opened"""
+    if get_apns_client.cache_info().currsize:
+        await get_apns_client().aclose()
+        get_apns_client.cache_clear()
@@ -1,4 +1,5 @@
-from supabase import Client
+from postgrest.exceptions import APIError
+from supabase import AClient
 from app.schemas.applications import (
     ApplicationInfo,
     ApplicationResponse,
@@ -8,20 +9,28 @@ from app.schemas.applications import (
 from app.schemas.helper import HelperResponse
 from app.schemas.sms import ApplicationReceivedNotification, InvitationNotification
 from app.schemas.invitations import InvitationResponse, InvitationListResponse
-from app.services.task_service import TaskService, TaskResponse
-from app.services.helper_service import HelperService
+from app.services.task_service import TaskService, TaskResponse, TASK_COLUMNS, TASK_WITH_CLIENT_COLUMNS
+from app.services.helper_service import HelperService, HELPER_COLUMNS
+from app.services.notification_queue import NotificationQueue
 from fastapi import HTTPException, status
-from typing import List
-import asyncio
+from typing import List, Optional
 from app.utils.sms import SMSUtils
+from app.utils.projection import select_columns
+
+APPLICATION_COLUMNS = select_columns(ApplicationInfo)
+HELPER_EMBED = f"helpers:helper_id({HELPER_COLUMNS})"
+INVITATION_COLUMNS = select_columns(InvitationResponse, exclude=["helpers", "task"])
 
 
 class ApplicationService:
-    def __init__(self, admin_client: Client, task_service: TaskService, helper_service: HelperService):
+    def __init__(self, admin_client: AClient, task_service: TaskService, helper_service: HelperService, smser: Optional[SMSUtils] = None, jobs: Optional[NotificationQueue] = None):
         self.admin_client = admin_client
         self.task_service = task_service
         self.helper_service = helper_service
-        self.smser = SMSUtils()
+        self.smser = smser or SMSUtils()
+        self.jobs = jobs or NotificationQueue(admin_client)
+        self.jobs.register("sms.application_received", self.send_application_received_notification, provider="openphone")
+        self.jobs.register("sms.invitation", self.send_invitation_notification, provider="openphone")
 
 
     async def get_applications_by_task(self, user_id: str, task_id: str) -> ApplicationListResponse:
@@ -35,11 +44,8 @@ class ApplicationService:
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not the owner of this task")
             
             # Get the applications for the task using embedded relation
-            applications_result = self.admin_client.table("applications")\
-                .select(
-                    "*",
-                    "helpers:helper_id (*)"
-                )\
+            applications_result = await self.admin_client.table("applications")\
+                .select(APPLICATION_COLUMNS, HELPER_EMBED)\
                 .eq("task_id", task_id).execute()
 
             if not applications_result.data:
@@ -57,18 +63,31 @@ class ApplicationService:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
     async def get_applications_by_client(self, user_id: str, limit: int = 20, offset: int = 0) -> ApplicationListResponse:
-        """Get all applications for the tasks of the current client user"""
-        try:
-            tasks = await self.task_service.get_user_tasks(user_id, limit, offset)
-            if not tasks:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No tasks found")
+        """Get applications across all tasks of the current client user, newest first.
 
-            applications = []
-            for task in tasks.tasks:
-                applications_result = await self.get_applications_by_task(user_id, task.id)
-                applications.extend(applications_result.applications)
+        One query: the task embed is an inner join filtered on the client, so
+        pagination and total_count are over applications rather than tasks.
+        """
+        try:
+            applications_result = await (self.admin_client
+                .table("applications")
+                .select(APPLICATION_COLUMNS, HELPER_EMBED, f"tasks:task_id!inner({TASK_COLUMNS})", count="exact")
+                .eq("tasks.client_id", user_id)
+                .order("created_at", desc=True)
+                .order("id", desc=True)
+                .range(offset, offset + limit - 1)
+                .execute()
+            )
 
-            return ApplicationListResponse(applications=applications, total_count=len(applications))
+            applications = [
+                ApplicationResponse(
+                    application=ApplicationInfo(**application),
+                    helper=HelperResponse(**application["helpers"]),
+                    task=TaskResponse(**application["tasks"])
+                )
+                for application in applications_result.data or []
+            ]
+            return ApplicationListResponse(applications=applications, total_count=applications_result.count or 0)
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -78,9 +97,9 @@ class ApplicationService:
         try:
 
             # Join statement for tasks and applications
-            applications_result = (self.admin_client
+            applications_result = await (self.admin_client
                 .table("applications")
-                .select("*, tasks:task_id (*, client:client_id (*))")
+                .select(APPLICATION_COLUMNS, f"tasks:task_id({TASK_WITH_CLIENT_COLUMNS})")
                 .eq("helper_id", helper_id)
                 .execute()
             )
@@ -104,63 +123,49 @@ class ApplicationService:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
     
     async def create_application(self, helper_id: str, task_id: str, application_create_request: ApplicationCreateRequest) -> ApplicationResponse:
-        """Create an application for the current helper user"""
+        """Create an application for the current helper user.
+
+        One RPC validates the task and helper, inserts the application
+        (unique per task and helper), bumps the helper's application count and
+        queues the client's SMS in a single transaction.
+        """
         try:
-            # Check if the task exists
-            task = await self.task_service.get_task(task_id)
-            if not task:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-            
-            helper = await self.helper_service.get_helper(helper_id)
-            if not helper:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Helper not found")
-            
-            # Check if the helper has already applied to the task
-            applications_result = self.admin_client.table("applications").select("*").eq("helper_id", helper_id).eq("task_id", task_id).execute()
-            if applications_result.data:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You have already applied to this task")
-            
-            # Create the application with helper_id from authenticated user
-            application = self.admin_client.table("applications").insert({
-                "task_id": application_create_request.task_id,
-                "helper_id": helper_id,
-                "introduction_message": application_create_request.introduction_message,
-                "supplements_url": application_create_request.supplements_url
+            result = await self.admin_client.rpc("create_application", {
+                "application_task_id": task_id,
+                "application_helper_id": helper_id,
+                "application_introduction_message": application_create_request.introduction_message,
+                "application_supplements_url": application_create_request.supplements_url,
+                "job_max_attempts": self.jobs.max_attempts,
             }).execute()
-            if not application.data:
+            if not result.data:
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create application")
-            
-            # Update helper's application count (fire and forget)
-            asyncio.create_task(self.update_helper_application_count(helper_id))
-            asyncio.create_task(self.send_application_received_notification(client_id=task.client_id, helper_name=helper.first_name + " " + helper.last_name, task_title=task.title, task_id=task_id))
-            # Return the application    
+
+            # The RPC queued the application received SMS and bumped the helper's count
+            self.jobs.notify()
+            self.helper_service.helper_changed(helper_id, ["number_of_applications"])
             return ApplicationResponse(
-                application=ApplicationInfo(**application.data[0]),
-                helper=helper
+                application=ApplicationInfo(**result.data["application"]),
+                helper=HelperResponse(**result.data["helper"]),
+                task=TaskResponse(**result.data["task"])
             )
 
-        except Exception as e:
+        except HTTPException:
+            raise
+        except APIError as e:
+            if e.code == "P0002":
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message)
+            if e.code == "23505":
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You have already applied to this task")
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
-    
-    async def update_helper_application_count(self, helper_id: str) -> bool:
-        """Update helper's total application count (fire and forget)"""
-        try:
-            result = self.admin_client.rpc("increment_helper_application_count", {"helper_uuid": helper_id}).execute()
-            if not result.data:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update helper application count")
-            return True
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
-    
+
     async def get_application(self, application_id: str) -> ApplicationResponse:
         """Get an application by id"""
         try:
-            application_result = self.admin_client\
+            application_result = await self.admin_client\
                 .table("applications")\
-                .select(
-                    "*",
-                    "helpers:helper_id (*)"
-                )\
+                .select(APPLICATION_COLUMNS, HELPER_EMBED)\
                 .eq("id", application_id)\
                 .single()\
                 .execute()
@@ -188,7 +193,7 @@ class ApplicationService:
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not the owner of this task")
             
             # Get all invitations for the task with helper information
-            invitations_result = self.admin_client.table("invitations").select("*, helpers:helper_id(*)").eq("task_id", task_id).execute()
+            invitations_result = await self.admin_client.table("invitations").select(INVITATION_COLUMNS, HELPER_EMBED).eq("task_id", task_id).execute()
             if not invitations_result.data:
                 return InvitationListResponse(invitations=[], total_count=0)
 
@@ -206,10 +211,10 @@ class ApplicationService:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Helper not found")
             
             # Get all invitations for the helper, join statement for tasks and invitations
-            invitations_result = (
+            invitations_result = await (
                 self.admin_client
                     .table("invitations")
-                    .select("*, tasks:task_id (*, client:client_id (*))")
+                    .select(INVITATION_COLUMNS, f"tasks:task_id({TASK_WITH_CLIENT_COLUMNS})")
                     .eq("helper_id", helper_id)
                     .execute()
                 )
@@ -238,36 +243,38 @@ class ApplicationService:
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not the owner of this task")
             
             # Check if the helper has already been invited to the task
-            invitations_result = self.admin_client.table("invitations").select("*").eq("task_id", task_id).eq("helper_id", helper_id).execute()
+            invitations_result = await self.admin_client.table("invitations").select("id").eq("task_id", task_id).eq("helper_id", helper_id).execute()
             if invitations_result.data:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Helper has already been invited to this task")
             
             # Create the invitation
-            invitation = self.admin_client.table("invitations").insert({
+            invitation = await self.admin_client.table("invitations").insert({
                 "task_id": task_id,
                 "helper_id": helper_id
             }).execute()
             if not invitation.data:
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create invitation")
             
-            asyncio.create_task(self.send_invitation_notification(client_id=task.client_id, helper_id=helper_id, task_title=task.title, task_id=task_id, pay=task.hourly_rate))
+            await self.jobs.enqueue("sms.invitation", {"client_id": task.client_id, "helper_id": helper_id, "task_title": task.title, "task_id": task_id, "pay": task.hourly_rate})
             # Return the invitation
             return InvitationResponse(**invitation.data[0])
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
     
-    async def send_application_received_notification(self, client_id: str, helper_name: str, task_title: str, task_id: str) -> None:
+    async def send_application_received_notification(self, client_id: str, helper_name: str, task_title: str, task_id: str, client_phone: Optional[str] = None) -> None:
         """Send application received notification"""
-        client = self.admin_client.table("clients").select("*").eq("id", client_id).execute()
-        if not client.data:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
-        await self.smser.send_application_received_notification(ApplicationReceivedNotification(client_phone=client.data[0]["phone"], helper_name=helper_name, task_title=task_title, task_id=task_id))
+        if client_phone is None:
+            client = await self.admin_client.table("clients").select("phone").eq("id", client_id).execute()
+            if not client.data:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
+            client_phone = client.data[0]["phone"]
+        await self.smser.send_application_received_notification(ApplicationReceivedNotification(client_phone=client_phone, helper_name=helper_name, task_title=task_title, task_id=task_id))
     
     async def send_invitation_notification(self, client_id: str, helper_id: str, task_title: str, task_id: str, pay: float) -> None:
         """Send invitation notification"""
         #create a client helper join request
-        client = self.admin_client.table("clients").select("*").eq("id", client_id).execute()
-        helper = self.admin_client.table("helpers").select("*").eq("id", helper_id).execute()
+        client = await self.admin_client.table("clients").select("first_name, last_name").eq("id", client_id).execute()
+        helper = await self.admin_client.table("helpers").select("phone").eq("id", helper_id).execute()
         if not client.data or not helper.data:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
         await self.smser.send_invitation_notification(InvitationNotification(client_name=client.data[0]["first_name"] + " " + client.data[0]["last_name"], helper_phone=helper.data[0]["phone"], task_title=task_title, task_id=task_id, pay=pay))
@@ -284,7 +291,7 @@ class ApplicationService:
 # from app.services.task_service import TaskService, TaskResponse
 # from app.services.helper_service import HelperService
 # from fastapi import HTTPException, status
-# from typing import List
+# from typing import List, Optional
 # import asyncio
 
 
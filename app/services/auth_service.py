@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import HTTPException
 from supabase import Client
 
@@ -15,15 +17,22 @@ from app.schemas.auth import (
     HelperEmailVerificationResponse,
     LogoutResponse,
 )
+from app.services.helper_search_cache import HelperSearchCache
 from app.utils.validators import normalize_phone_number, validate_phone_number
 
 
 class AuthService:
     """Service for handling authentication operations"""
 
-    def __init__(self, public_client: Client, admin_client: Client):
+    def __init__(self, public_client: Client, admin_client: Client, helper_search_cache: Optional[HelperSearchCache] = None):
         self.public_client = public_client
         self.admin_client = admin_client
+        self.helper_search_cache = helper_search_cache
+
+    def _helper_signed_up(self) -> None:
+        # A new helper can match any search
+        if self.helper_search_cache is not None:
+            self.helper_search_cache.invalidate_all()
 
     def _normalize_phone(self, phone: str) -> str:
         """Normalize phone number for consistent processing"""
@@ -373,6 +382,7 @@ class AuthService:
                             status_code=500,
                             detail="Failed to create helper testing acconut",
                         )
+                    self._helper_signed_up()
 
                 return HelperProfileResponse(
                     success=True,
@@ -483,6 +493,7 @@ class AuthService:
                     "venmo": payload.venmo,
                 }
             ).execute()
+            self._helper_signed_up()
 
             return HelperProfileResponse(
                 success=True,
@@ -0,0 +1,182 @@
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from supabase import AClient
+
+from app.schemas.sms import BulkChunkResult, BulkNotificationRequest, BulkNotificationResponse
+from app.utils.sms import SMSUtils, summarize_bulk_results
+
+logger = logging.getLogger(__name__)
+
+# PostgREST returns at most this many rows per request
+PAGE_SIZE = 1000
+# Chunks claimed per round trip; also the most a crashed run can leave in "sending"
+CLAIM_BATCH = 100
+
+
+class BulkSMSService:
+    """Resumable bulk SMS campaigns.
+
+    Recipients are split into provider-sized chunks that are stored in
+    sms_campaign_chunks before anything is sent. Chunks are claimed
+    (pending -> sending) by the claim_sms_campaign_chunks RPC a batch at a
+    time, sent concurrently by SMSUtils under the OpenPhone client's rate
+    limit, and each row is updated as soon as its request finishes. Only
+    pending chunks are claimed, so a run sends each chunk at most once and
+    concurrent resumes split the work instead of sending it twice. Resuming
+    a campaign puts its failed chunks back to pending first. A chunk
+    OpenPhone may have accepted (a 5xx or a timeout) is marked unknown and
+    is never resent.
+    """
+
+    def __init__(self, admin_client: AClient, smser: Optional[SMSUtils] = None):
+        self.admin_client = admin_client
+        self.smser = smser or SMSUtils()
+
+    async def send(self, request: BulkNotificationRequest) -> BulkNotificationResponse:
+        """Start a campaign, or resume the one named by ``request.campaign_id``"""
+        if request.campaign_id:
+            return await self.resume(request.campaign_id)
+
+        chunks = self.smser.chunk_recipients(request.phone_numbers)
+        if not chunks:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No recipients given")
+
+        try:
+            campaign = await (
+                self.admin_client.table("sms_campaigns")
+                .insert({"content": request.content, "user_id": request.user_id})
+                .execute()
+            )
+            campaign_id = campaign.data[0]["id"]
+            rows = [
+                {"campaign_id": campaign_id, "chunk_index": index, "recipients": recipients}
+                for index, recipients in enumerate(chunks)
+            ]
+            for start in range(0, len(rows), PAGE_SIZE):
+                await self.admin_client.table("sms_campaign_chunks").insert(rows[start:start + PAGE_SIZE]).execute()
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to create SMS campaign: {str(e)}",
+            )
+
+        return await self._run(campaign_id, request.content, request.user_id)
+
+    async def resume(self, campaign_id: str) -> BulkNotificationResponse:
+        """Send the chunks of a campaign that are pending or failed"""
+        try:
+            campaign = await (
+                self.admin_client.table("sms_campaigns")
+                .select("id, content, user_id")
+                .eq("id", campaign_id)
+                .execute()
+            )
+            if campaign.data:
+                await (
+                    self.admin_client.table("sms_campaign_chunks")
+                    .update({"status": "pending"})
+                    .eq("campaign_id", campaign_id)
+                    .eq("status", "failed")
+                    .execute()
+                )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to load SMS campaign: {str(e)}",
+            )
+        if not campaign.data:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="SMS campaign not found")
+
+        return await self._run(campaign_id, campaign.data[0]["content"], campaign.data[0]["user_id"])
+
+    async def _claim(self, campaign_id: str) -> List[Dict]:
+        claimed = await self.admin_client.rpc(
+            "claim_sms_campaign_chunks", {"campaign": campaign_id, "batch_size": CLAIM_BATCH}
+        ).execute()
+        return claimed.data or []
+
+    async def _load_chunks(self, campaign_id: str) -> List[Dict]:
+        rows: List[Dict] = []
+        while True:
+            page = await (
+                self.admin_client.table("sms_campaign_chunks")
+                .select("chunk_index, recipients, status, message_id, error, attempts")
+                .eq("campaign_id", campaign_id)
+                .order("chunk_index")
+                .range(len(rows), len(rows) + PAGE_SIZE - 1)
+                .execute()
+            )
+            rows.extend(page.data or [])
+            if len(page.data or []) < PAGE_SIZE:
+                return rows
+
+    async def _run(self, campaign_id: str, content: str, user_id: Optional[str]) -> BulkNotificationResponse:
+        attempts: Dict[int, int] = {}
+
+        async def record(result: BulkChunkResult) -> None:
+            result.attempts = attempts[result.index]
+            if result.success:
+                chunk_status = "sent"
+            else:
+                chunk_status = "unknown" if result.uncertain else "failed"
+            try:
+                await (
+                    self.admin_client.table("sms_campaign_chunks")
+                    .update({
+                        "status": chunk_status,
+                        "message_id": result.message_id,
+                        "error": result.error,
+                        "updated_at": datetime.now(timezone.utc).isoformat(),
+                    })
+                    .eq("campaign_id", campaign_id)
+                    .eq("chunk_index", result.index)
+                    .execute()
+                )
+            except Exception as e:
+                # The chunk stays "sending", so a resume will not send it again
+                logger.error(f"Failed to record chunk {result.index} of SMS campaign {campaign_id}: {e}")
+
+        results: Dict[int, BulkChunkResult] = {}
+        try:
+            while True:
+                claimed = await self._claim(campaign_id)
+                if not claimed:
+                    break
+                attempts.update((row["chunk_index"], row["attempts"]) for row in claimed)
+                pending = {row["chunk_index"]: row["recipients"] for row in claimed}
+                for result in await self.smser.send_chunks(pending, content, user_id, on_result=record):
+                    results[result.index] = result
+                if len(claimed) < CLAIM_BATCH:
+                    break
+            rows = await self._load_chunks(campaign_id)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to run SMS campaign {campaign_id}: {str(e)}",
+            )
+
+        # Chunks this run did not send are reported as they stand in the table
+        chunks = list(results.values()) + [
+            _chunk_result(row) for row in rows if row["chunk_index"] not in results
+        ]
+        return summarize_bulk_results(chunks, campaign_id=str(campaign_id))
+
+
+def _chunk_result(row: Dict) -> BulkChunkResult:
+    error = row.get("error")
+    if row["status"] == "sending":
+        error = "Being sent by another run, or its run was interrupted; not resent"
+    elif row["status"] == "pending":
+        error = "Not sent yet"
+    return BulkChunkResult(
+        index=row["chunk_index"],
+        recipients=row["recipients"],
+        success=row["status"] == "sent",
+        message_id=row.get("message_id"),
+        error=None if row["status"] == "sent" else error,
+        uncertain=row["status"] in ("sending", "unknown"),
+        attempts=row["attempts"],
+    )
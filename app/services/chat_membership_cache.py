@@ -0,0 +1,104 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from supabase import AClient
+
+
+class ChatMembershipCache:
+    """Process-wide cache of chat membership: chat_id -> {user_id: chat_user_id}.
+
+    Participants are fixed when a chat is created, so entries only need to be
+    replaced when create_chat writes a chat's chat_users rows. The TTL bounds
+    staleness if rows are removed some other way (e.g. an account deletion
+    cascading). Concurrent misses for the same chat share one query.
+    """
+
+    def __init__(self, admin_client: AClient, ttl_seconds: int = 300, max_size: int = 10_000):
+        self.admin_client = admin_client
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        # chat_id -> (expires_at monotonic, {user_id: chat_user_id})
+        self._members: "OrderedDict[str, Tuple[float, Dict[str, str]]]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Future] = {}
+
+    def put(self, chat_id, members: Dict[str, str]) -> None:
+        key = str(chat_id)
+        self._members[key] = (time.monotonic() + self.ttl_seconds, dict(members))
+        self._members.move_to_end(key)
+        while len(self._members) > self.max_size:
+            self._members.popitem(last=False)
+
+    def invalidate(self, chat_id) -> None:
+        self._members.pop(str(chat_id), None)
+
+    def _cached(self, key: str) -> Optional[Dict[str, str]]:
+        entry = self._members.get(key)
+        if entry is None:
+            return None
+        expires_at, members = entry
+        if expires_at <= time.monotonic():
+            del self._members[key]
+            return None
+        self._members.move_to_end(key)
+        return members
+
+    async def get(self, chat_id) -> Dict[str, str]:
+        """Members of a chat as {user_id: chat_user_id}; empty if the chat does not exist"""
+        key = str(chat_id)
+        members = self._cached(key)
+        if members is not None:
+            return members
+
+        loading = self._loading.get(key)
+        if loading is not None:
+            try:
+                return await asyncio.shield(loading)
+            except asyncio.CancelledError:
+                if not loading.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            # The caller running the query was cancelled (e.g. its socket closed); query again
+            return await self.get(chat_id)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            result = await (self.admin_client.table("chat_users")
+                .select("id,user_id")
+                .eq("chat_id", key)
+                .execute())
+            members = {row["user_id"]: row["id"] for row in (result.data or [])}
+            # Unknown chats are not cached; the id may belong to a chat being created
+            if members:
+                self.put(key, members)
+            future.set_result(members)
+            return members
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            # Cancelled mid-query: release the callers waiting on this one
+            if not future.done():
+                future.cancel()
+            del self._loading[key]
+
+    async def require_member(self, chat_id: UUID, user_id) -> Tuple[Dict[str, str], str]:
+        """Members of the chat and the user's chat_user id; 404/403 if the chat is missing or the user is not in it"""
+        members = await self.get(chat_id)
+        if not members:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Chat not found"
+            )
+        chat_user_id = members.get(str(user_id))
+        if chat_user_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this chat"
+            )
+        return members, chat_user_id
@@ -1,8 +1,8 @@
-from typing import Optional, List
+from typing import Dict, Iterable, Optional, List
 from datetime import datetime
 from uuid import UUID
 from fastapi import HTTPException, status
-from supabase import Client
+from supabase import AClient
 import asyncio
 
 from app.schemas.chat import (
@@ -13,18 +13,115 @@ from app.schemas.chat import (
     MessageListResponse,
     ChatMarkReadRequest,
     ChatWithParticipantsResponse,
-    ChatParticipantInfo
+    ChatParticipantInfo,
+    ChatInboxEntry,
+    ChatInboxResponse,
 )
 from app.schemas.sms import MessageNotification
+from app.services.chat_membership_cache import ChatMembershipCache
+from app.services.message_batcher import MessageBatcher
+from app.services.notification_queue import NotificationQueue
+from app.services.websocket_manager import WebSocketManager
 from app.utils.sms import SMSUtils
+from app.utils.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+class ParticipantLoader:
+    """Batches and memoizes participant lookups for a single request.
+
+    Every load() issued in the same event loop tick is answered by one
+    clients query, plus one helpers query for ids that are not clients.
+    Repeat loads of the same id share the first result. Create one per
+    request; the memo is never invalidated.
+    """
+
+    PARTICIPANT_FIELDS = "id, first_name, last_name, pfp_url, phone"
+
+    def __init__(self, admin_client: AClient):
+        self.admin_client = admin_client
+        self._results: Dict[str, asyncio.Future] = {}
+        self._pending: List[str] = []
+        self._dispatch_task: Optional[asyncio.Task] = None
+
+    def load(self, user_id) -> "asyncio.Future[ChatParticipantInfo]":
+        key = str(user_id)
+        future = self._results.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._results[key] = future
+            self._pending.append(key)
+            if len(self._pending) == 1:
+                loop.call_soon(self._schedule_dispatch)
+        return future
+
+    async def load_many(self, user_ids: Iterable) -> List[ChatParticipantInfo]:
+        return list(await asyncio.gather(*(self.load(user_id) for user_id in user_ids)))
+
+    def _schedule_dispatch(self) -> None:
+        self._dispatch_task = asyncio.create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        keys, self._pending = self._pending, []
+        try:
+            found = await self._fetch(keys)
+        except Exception:
+            found = {}
+        for key in keys:
+            future = self._results[key]
+            if future.done():
+                continue
+            try:
+                future.set_result(found.get(key) or self._unknown(key))
+            except Exception as e:
+                future.set_exception(e)
+
+    async def _fetch(self, keys: List[str]) -> Dict[str, ChatParticipantInfo]:
+        found: Dict[str, ChatParticipantInfo] = {}
+        # Try clients first, then helpers for whoever is left
+        for table in ("clients", "helpers"):
+            missing = [key for key in keys if key not in found]
+            if not missing:
+                break
+            result = await (self.admin_client.table(table)
+                .select(self.PARTICIPANT_FIELDS)
+                .in_("id", missing)
+                .execute())
+            for row in result.data or []:
+                found[str(row["id"])] = ChatParticipantInfo(**row)
+        return found
+
+    @staticmethod
+    def _unknown(user_id: str) -> ChatParticipantInfo:
+        # Fallback with minimal info
+        return ChatParticipantInfo(
+            id=UUID(user_id),
+            first_name="Unknown",
+            last_name="User",
+            pfp_url=None
+        )
 
 
 class ChatService:
     """Service for handling chat and messaging operations"""
 
-    def __init__(self, admin_client: Client):
+    def __init__(
+        self,
+        admin_client: AClient,
+        smser: Optional[SMSUtils] = None,
+        membership_cache: Optional[ChatMembershipCache] = None,
+        message_batcher: Optional[MessageBatcher] = None,
+        presence: Optional[WebSocketManager] = None,
+        jobs: Optional[NotificationQueue] = None,
+    ):
         self.admin_client = admin_client
-        self.smser = SMSUtils()
+        self.smser = smser or SMSUtils()
+        self.membership_cache = membership_cache or ChatMembershipCache(admin_client)
+        self.message_batcher = message_batcher or MessageBatcher(admin_client)
+        # Users with the chat open get the message over the socket instead of SMS
+        self.presence = presence
+        self.jobs = jobs or NotificationQueue(admin_client)
+        self.jobs.register("sms.chat_message", self.send_message_notification, provider="openphone")
         
     async def create_chat(self, user_id: UUID, participant_id: UUID) -> ChatResponse:
         """Create a new chat between two users"""
@@ -38,7 +135,7 @@ class ChatService:
             await self._verify_users_exist([user_id, participant_id])
 
             # Create new chat (no users array dependency)
-            result = self.admin_client.table("chats").insert({}).execute()
+            result = await self.admin_client.table("chats").insert({}).execute()
             
             if not result.data:
                 raise HTTPException(
@@ -48,12 +145,19 @@ class ChatService:
 
             chat = result.data[0]
             # Insert participants in chat_users (authoritative)
-            self.admin_client.table("chat_users").insert([
+            members_result = await self.admin_client.table("chat_users").insert([
                 {"chat_id": chat["id"], "user_id": str(user_id)},
                 {"chat_id": chat["id"], "user_id": str(participant_id)}
             ]).execute()
 
-            chat['users'] = [await self._get_participant_info(user_id), await self._get_participant_info(participant_id)]
+            # Replace anything cached for this chat with the rows just written
+            self.membership_cache.invalidate(chat["id"])
+            if members_result.data:
+                self.membership_cache.put(
+                    chat["id"], {row["user_id"]: row["id"] for row in members_result.data}
+                )
+
+            chat['users'] = await ParticipantLoader(self.admin_client).load_many([user_id, participant_id])
             return ChatResponse(**chat)
 
         except HTTPException:
@@ -67,7 +171,7 @@ class ChatService:
     async def get_user_chats(self, user_id: UUID) -> ChatListResponse:
         """Get all chats for a user in one query using chat_users join."""
         try:
-            result = (self.admin_client.table("chats")
+            result = await (self.admin_client.table("chats")
                 .select("id,created_at,updated_at, participants:chat_users(user_id), membership:chat_users!inner(user_id)")
                 .eq("membership.user_id", str(user_id))
                 .order("updated_at", desc=True)
@@ -76,13 +180,18 @@ class ChatService:
             if not result.data:
                 return ChatListResponse(chats=[], total=0)
 
+            # Resolve every participant across all chats in one batch
+            loader = ParticipantLoader(self.admin_client)
+            users_per_chat = await asyncio.gather(*(
+                loader.load_many(p["user_id"] for p in (row.get("participants") or []))
+                for row in result.data
+            ))
+
             chats = []
-            for row in result.data:
+            for row, users in zip(result.data, users_per_chat):
                 chat_data = {
                     'id': row['id'],
-                    'users': [ 
-                        await self._get_participant_info(p["user_id"]) for p in (row.get("participants") or [])
-                    ],
+                    'users': users,
                     'created_at': row['created_at'],
                     'updated_at': row['updated_at']
                 }
@@ -98,12 +207,47 @@ class ChatService:
                 detail=f"Failed to get chats: {str(e)}"
             )
 
+    async def get_inbox(self, user_id: UUID, limit: int = 20, cursor: Optional[str] = None) -> ChatInboxResponse:
+        """Get a page of the user's chats with previews and unread counts in one query"""
+        try:
+            params = {"inbox_user_id": str(user_id), "page_limit": limit}
+            if cursor:
+                try:
+                    key = decode_cursor(cursor, "inbox")
+                    params["cursor_activity_at"] = key["activity_at"]
+                    params["cursor_chat_id"] = key["id"]
+                except (InvalidCursorError, KeyError) as e:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Invalid cursor: {str(e)}"
+                    )
+
+            result = await self.admin_client.rpc("get_chat_inbox", params).execute()
+            rows = result.data or []
+
+            next_cursor = None
+            if len(rows) == limit:
+                next_cursor = encode_cursor("inbox", {"activity_at": rows[-1]["activity_at"], "id": rows[-1]["id"]})
+
+            return ChatInboxResponse(
+                chats=[ChatInboxEntry(**row) for row in rows],
+                next_cursor=next_cursor,
+            )
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get inbox: {str(e)}"
+            )
+
     async def get_chat_with_participants(self, chat_id: UUID, user_id: UUID) -> ChatWithParticipantsResponse:
         """Get chat with participant information"""
         try:
-            # Single query: fetch chat with embedded participants, verify membership locally
-            result = (self.admin_client.table("chats")
-                .select("id,created_at,updated_at, participants:chat_users(user_id)")
+            # Single query: fetch chat with its summary and embedded participants, verify membership locally
+            result = await (self.admin_client.table("chats")
+                .select("id,created_at,updated_at,last_message,last_message_at, participants:chat_users(user_id,unread_count)")
                 .eq("id", str(chat_id))
                 .limit(1)
                 .execute())
@@ -123,13 +267,13 @@ class ChatService:
                 )
 
             # Get participant information
-            participants = []
-            for participant_id in users:
-                participant_info = await self._get_participant_info(participant_id)
-                participants.append(participant_info)
+            participants = await ParticipantLoader(self.admin_client).load_many(users)
 
-            # Get last message and unread count
-            last_message_data = await self._get_last_message_and_unread_count(chat_id, user_id)
+            # Last message and unread count are kept current by triggers on messages
+            unread_count = next(
+                (p.get("unread_count") or 0 for p in (row.get("participants") or []) if p["user_id"] == str(user_id)),
+                0,
+            )
 
             return ChatWithParticipantsResponse(
                 id=row["id"],
@@ -137,9 +281,9 @@ class ChatService:
                 participants=participants,
                 created_at=row["created_at"],
                 updated_at=row["updated_at"],
-                last_message=last_message_data.get("last_message"),
-                last_message_at=last_message_data.get("last_message_at"),
-                unread_count=last_message_data.get("unread_count", 0)
+                last_message=row.get("last_message"),
+                last_message_at=row.get("last_message_at"),
+                unread_count=unread_count
             )
 
         except HTTPException:
@@ -153,61 +297,37 @@ class ChatService:
     async def send_message(self, chat_id: UUID, sender_id: UUID, request: MessageCreateRequest) -> MessageResponse:
         """Send a new message in a chat"""
         try:
-            # Verify user is participant in chat via chat_users and get sender chat_user id
-            cu_result = (self.admin_client.table("chat_users")
-                .select("id,user_id")
-                .eq("chat_id", str(chat_id))
-                .execute())
-            if not cu_result.data:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Chat not found"
-                )
-
-            # participant_user_ids = [UUID(row["user_id"]) for row in cu_result.data]
-            # if UUID(str(sender_id)) not in participant_user_ids:
+            # Verify user is participant in chat and get sender chat_user id
+            members, sender_chat_user_id = await self.membership_cache.require_member(chat_id, sender_id)
+            participant_user_ids = list(members)
 
-            participant_user_ids = [row["user_id"] for row in cu_result.data]
-            if sender_id not in participant_user_ids:
-
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Access denied to this chat"
-                )
-            sender_chat_user_id = None
-            for row in cu_result.data:
-                if row["user_id"] == str(sender_id):
-                    sender_chat_user_id = row["id"]
-                    break
-            if sender_chat_user_id is None:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Sender not in chat"
-                )
-
-            # Create message
-            result = self.admin_client.table("messages").insert({
+            # Create message; concurrent sends share one insert
+            message = await self.message_batcher.insert({
                 "chat_id": str(chat_id),
                 "sender_id": str(sender_chat_user_id),
                 "content": request.content
-            }).execute()
-            
-            if not result.data:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to send message"
-                )
+            })
 
-            message = result.data[0]
             # Normalize sender_id back to user_id for API response
             message["sender_id"] = str(sender_id)
-            
-            # Update chat updated_at timestamp
-            self.admin_client.table("chats").update({"updated_at": datetime.utcnow().isoformat()}).eq("id", str(chat_id)).execute()
+            # The chat's updated_at, preview and unread counts are maintained by
+            # the chat_summary_on_message_insert trigger
 
-            # Send SMS notification to the other participant
+            # Text the other participants; a burst of messages becomes one summary SMS
             if self.smser:
-                asyncio.create_task(self.send_message_notification(participant_user_ids, sender_id, chat_id, request))
+                for recipient_id in participant_user_ids:
+                    if str(recipient_id) == str(sender_id):
+                        continue
+                    await self.jobs.enqueue_coalesced(
+                        "sms.chat_message",
+                        f"sms.chat_message:{chat_id}:{recipient_id}",
+                        {
+                            "recipient_id": str(recipient_id),
+                            "sender_id": str(sender_id),
+                            "chat_id": str(chat_id),
+                            "content": request.content,
+                        },
+                    )
 
             return MessageResponse(**message)
 
@@ -222,27 +342,11 @@ class ChatService:
     async def get_chat_messages(self, chat_id: UUID, user_id: UUID, limit: int = 50, offset: int = 0) -> MessageListResponse:
         """Get messages for a specific chat"""
         try:
-            # Verify user is participant in chat via chat_users
-            cu_result = (self.admin_client.table("chat_users")
-                .select("id,user_id")
-                .eq("chat_id", str(chat_id))
-                .execute())
-            if not cu_result.data:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Chat not found"
-                )
-
-            participant_user_ids = [row["user_id"] for row in cu_result.data]
-            if user_id not in participant_user_ids:
-
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Access denied to this chat"
-                )
+            # Verify user is participant in chat
+            await self.membership_cache.require_member(chat_id, user_id)
 
             # Get messages with pagination, embed sender user_id, and return total count together
-            result = (self.admin_client.table("messages")
+            result = await (self.admin_client.table("messages")
                 .select("id,chat_id,content,read_at,created_at,updated_at,sender:chat_users(user_id)", count="exact")
                 .eq("chat_id", str(chat_id))
                 .order("created_at", desc=True)
@@ -283,39 +387,12 @@ class ChatService:
         """Mark messages as read"""
         try:
 
-            print(chat_id, user_id, request)
-            # Verify user is participant in chat via chat_users
-            cu_result = (self.admin_client.table("chat_users")
-                .select("id,user_id")
-                .eq("chat_id", chat_id)
-                .execute())
-            print(cu_result)
-            if not cu_result.data:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Chat not found"
-                )
-            participant_user_ids = [row["user_id"] for row in cu_result.data]
-            if user_id not in participant_user_ids:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Access denied to this chat"
-                )
+            # Verify user is participant in chat, and get their chat_user id to avoid marking own messages
+            _, current_cu_id = await self.membership_cache.require_member(chat_id, user_id)
 
             # Mark messages as read
             now = datetime.utcnow().isoformat()
-            # Determine current user's chat_user id to avoid marking own messages
-            current_cu_id = None
-            for row in cu_result.data:
-                if row["user_id"] == str(user_id):
-                    current_cu_id = row["id"]
-                    break
-            if current_cu_id is None:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="User not in chat"
-                )
-            (self.admin_client.table("messages")
+            await (self.admin_client.table("messages")
                 .update({"read_at": now})
                 .in_("id", [str(msg_id) for msg_id in request.message_ids])
                 .eq("chat_id", str(chat_id))
@@ -340,7 +417,7 @@ class ChatService:
         """Get existing chat between two users with a single join on chat_users twice."""
         try:
             # Join chat_users twice (aliases u1, u2) and pull all participants in one call
-            result = (self.admin_client.table("chats")
+            result = await (self.admin_client.table("chats")
                 .select("id,created_at,updated_at, participants:chat_users(user_id), u1:chat_users!inner(user_id), u2:chat_users!inner(user_id)")
                 .eq("u1.user_id", str(user_id))
                 .eq("u2.user_id", str(participant_id))
@@ -349,7 +426,9 @@ class ChatService:
             if not result.data:
                 return None
             chat = result.data[0]
-            chat['users'] = [await self._get_participant_info(p["user_id"]) for p in (chat.get("participants") or [])]
+            chat['users'] = await ParticipantLoader(self.admin_client).load_many(
+                p["user_id"] for p in (chat.get("participants") or [])
+            )
             return ChatResponse(**chat)
 
         except Exception:
@@ -361,53 +440,20 @@ class ChatService:
 
     async def _get_participant_info(self, user_id: str) -> ChatParticipantInfo:
         """Get basic participant information"""
-        try:
-            # Try to get from clients table first
-            result = (self.admin_client.table("clients")
-                .select("id, first_name, last_name, pfp_url, phone")
-                .eq("id", user_id)
-                .execute())
-
-            if result.data:
-                user_data = result.data[0]
-                return ChatParticipantInfo(**user_data)
-
-            # If not found in clients, try helpers table
-            result = (self.admin_client.table("helpers")
-                .select("id, first_name, last_name, pfp_url, phone")
-                .eq("id", user_id)
-                .execute())
-
-            if result.data:
-                user_data = result.data[0]
-                return ChatParticipantInfo(**user_data)
-
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"User {user_id} not found"
-            )
-            
-        except Exception:
-            # Fallback with minimal info
-            return ChatParticipantInfo(
-                id=UUID(user_id),
-                first_name="Unknown",
-                last_name="User",
-                pfp_url=None
-            )
+        return await ParticipantLoader(self.admin_client).load(user_id)
 
     async def _verify_users_exist(self, user_ids: List[UUID]) -> None:
         """Verify that all users exist"""
         try:
             # Check all users exist in either clients or helpers table
             for user_id in user_ids:
-                client_exists = (self.admin_client
+                client_exists = await (self.admin_client
                     .table("clients")
                     .select("id")
                     .eq("id", str(user_id))
                     .execute())
                 
-                helper_exists = (self.admin_client
+                helper_exists = await (self.admin_client
                     .table("helpers")
                     .select("id")
                     .eq("id", str(user_id))
@@ -427,74 +473,24 @@ class ChatService:
                 detail=f"Failed to verify users: {str(e)}"
             )
 
-    async def _get_last_message_and_unread_count(self, chat_id: UUID, user_id: UUID) -> dict:
-        """Get last message and unread count for a chat"""
-        try:
-            # Get last message
-            last_message_result = (self.admin_client.table("messages")
-                .select("content, created_at")
-                .eq("chat_id", str(chat_id))
-                .order("created_at", desc=True)
-                .limit(1)
-                .execute())
-
-            last_message = None
-            last_message_at = None
-            if last_message_result.data:
-                last_message = last_message_result.data[0]["content"]
-                last_message_at = last_message_result.data[0]["created_at"]
+    async def send_message_notification(self, recipient_id: UUID, sender_id: UUID, chat_id: UUID, content: str, count: int = 1) -> None:
+        """Text a recipient about new messages from the sender, unless they have the chat open"""
+        if self.presence and self.presence.is_online(chat_id, recipient_id):
+            return
 
-            # Get current user's chat_user id
-            current_cu = (self.admin_client.table("chat_users")
-                .select("id")
-                .eq("chat_id", str(chat_id))
-                .eq("user_id", str(user_id))
-                .limit(1)
-                .execute())
-            current_cu_id = current_cu.data[0]["id"] if current_cu.data else None
-
-            # Get unread count excluding current user's messages
-            if current_cu_id is not None:
-                unread_result = (self.admin_client.table("messages")
-                    .select("id", count="exact")
-                    .eq("chat_id", str(chat_id))
-                    .is_("read_at", "null")
-                    .neq("sender_id", str(current_cu_id))
-                    .execute())
-                unread_count = unread_result.count or 0
-            else:
-                unread_count = 0
-
-            return {
-                "last_message": last_message,
-                "last_message_at": last_message_at,
-                "unread_count": unread_count
-            }
-
-        except Exception:
-            return {
-                "last_message": None,
-                "last_message_at": None,
-                "unread_count": 0
-            }
-
-    async def send_message_notification(self, participant_user_ids: List[UUID], sender_id: UUID, chat_id: UUID, request: MessageCreateRequest) -> None:
-        """Send message notification"""
-            # Get the other participant's ID
-        other_participant_id = next(uid for uid in participant_user_ids if uid != sender_id)
-        
         # Get participant info for the notification
-        other_participant_info = await self._get_participant_info(str(other_participant_id))
-        sender_info = await self._get_participant_info(str(sender_id))
+        recipient_info, sender_info = await ParticipantLoader(self.admin_client).load_many(
+            [recipient_id, sender_id]
+        )
         
         # Send SMS notification
-        if other_participant_info.phone:
-            print(other_participant_info.phone, sender_info.first_name, sender_info.last_name, chat_id, request.content)	
+        if recipient_info.phone:
             notification = MessageNotification(
-                recipient_phone=other_participant_info.phone,
+                recipient_phone=recipient_info.phone,
                 sender_name=f"{sender_info.first_name} {sender_info.last_name}",
                 chat_id=str(chat_id),
-                message_preview=request.content
+                message_preview=content,
+                message_count=count
             )
             await self.smser.send_message_notification(notification)
         
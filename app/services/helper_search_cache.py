@@ -0,0 +1,159 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from app.schemas.helper import HelperListResponse, HelperResponse, HelperSearchRequest
+
+# Helper columns search_helpers matches on; a change can move a helper into or
+# out of any cached result
+MATCH_FIELDS = frozenset({"first_name", "last_name", "bio", "college", "graduation_year", "zip_code"})
+# Every other returned column (profile picture, contact details, counters);
+# only pages containing the helper go stale
+DISPLAY_FIELDS = frozenset(HelperResponse.model_fields) - MATCH_FIELDS - {"id"}
+
+SearchKey = Tuple
+
+
+def normalize_search(request: HelperSearchRequest) -> HelperSearchRequest:
+    """Canonical form of a search: trimmed, case-folded text and blank filters dropped.
+
+    Text search and the college filter are case-insensitive, so requests that
+    differ only in case or spacing return the same page and share an entry.
+    """
+    query = " ".join((request.search_query or "").lower().split()) or None
+    college = " ".join((request.search_college or "").lower().split()) or None
+    zip_code = (request.search_zip_code or "").strip() or None
+    return request.model_copy(update={
+        "search_query": query,
+        "search_college": college,
+        "search_zip_code": zip_code,
+    })
+
+
+class HelperSearchCache:
+    """Process-wide TTL + LRU cache of helper search pages, keyed by normalized request.
+
+    Profile updates and helper signups in this process invalidate entries as
+    they happen: a change to a searched field drops every entry, a change to a
+    displayed-only field (including the application counter) drops the pages
+    that contain that helper. The TTL bounds staleness for changes made in
+    other app processes. Concurrent misses for the same search share one
+    query.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_size: int = 1_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        # key -> (expires_at monotonic, page)
+        self._entries: "OrderedDict[SearchKey, Tuple[float, HelperListResponse]]" = OrderedDict()
+        self._loading: Dict[SearchKey, asyncio.Future] = {}
+        # Bumped on every invalidation so a query that started before it is not stored
+        self._generation = 0
+        self._counts = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    @staticmethod
+    def key(request: HelperSearchRequest) -> SearchKey:
+        return (
+            request.search_query,
+            request.search_college,
+            request.search_graduation_year,
+            request.search_zip_code,
+            request.limit,
+            request.offset,
+        )
+
+    def _cached(self, key: SearchKey) -> Optional[HelperListResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, page = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._counts["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return page
+
+    def _put(self, key: SearchKey, page: HelperListResponse) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, page)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._counts["evictions"] += 1
+
+    async def get_or_load(
+        self,
+        request: HelperSearchRequest,
+        load: Callable[[HelperSearchRequest], Awaitable[HelperListResponse]],
+    ) -> HelperListResponse:
+        """The cached page for ``request``, or ``load(normalized request)`` on a miss"""
+        request = normalize_search(request)
+        key = self.key(request)
+        page = self._cached(key)
+        if page is not None:
+            self._counts["hits"] += 1
+            return page
+
+        loading = self._loading.get(key)
+        if loading is not None:
+            self._counts["coalesced"] += 1
+            try:
+                return await asyncio.shield(loading)
+            except asyncio.CancelledError:
+                if not loading.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            # The caller running the search was cancelled; search again
+            return await self.get_or_load(request, load)
+
+        self._counts["misses"] += 1
+        generation = self._generation
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            page = await load(request)
+            if generation == self._generation:
+                self._put(key, page)
+            future.set_result(page)
+            return page
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            # Cancelled mid-search: release the callers waiting on this one
+            if not future.done():
+                future.cancel()
+            del self._loading[key]
+
+    def invalidate_all(self) -> None:
+        self._entries.clear()
+        self._generation += 1
+        self._counts["invalidations"] += 1
+
+    def invalidate_helper(self, helper_id: str, fields: Iterable[str]) -> None:
+        """Drop what a change to ``fields`` of one helper can make stale"""
+        fields = set(fields)
+        if fields & MATCH_FIELDS:
+            self.invalidate_all()
+        elif fields & DISPLAY_FIELDS:
+            helper_id = str(helper_id)
+            stale = [
+                key for key, (_, page) in self._entries.items()
+                if any(helper.id == helper_id for helper in page.helpers)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self._generation += 1
+            self._counts["invalidations"] += 1
+
+    def metrics(self) -> Dict:
+        lookups = self._counts["hits"] + self._counts["misses"] + self._counts["coalesced"]
+        return {
+            **self._counts,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hit_ratio": round((self._counts["hits"] + self._counts["coalesced"]) / lookups, 4) if lookups else None,
+        }
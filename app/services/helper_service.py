@@ -1,18 +1,25 @@
-from supabase import Client
+from typing import Optional
+from supabase import AClient
 from fastapi import HTTPException, status
 from app.schemas.helper import HelperResponse, HelperListResponse, HelperSearchRequest
+from app.services.helper_search_cache import HelperSearchCache
+from app.utils.projection import select_columns
+
+# Every HelperResponse field, so projected reads return what select("*") did
+HELPER_COLUMNS = select_columns(HelperResponse)
 
 class HelperService:
 
-    def __init__(self, admin_client: Client):
+    def __init__(self, admin_client: AClient, search_cache: Optional[HelperSearchCache] = None):
         self.admin_client = admin_client
+        self.search_cache = search_cache
         ## Keep these fields out of the response, but make sure this is synced with HelperResponse schema
         self.exclude_fields = ["phone_number", "email", "number_of_applications", "invited_count", "created_at", "updated_at"]
 
     async def get_helper(self, helper_id: str) -> HelperResponse:
         """Get a helper by id"""
         try:
-            helper_result = self.admin_client.table("helpers").select("*").eq("id", helper_id).execute()
+            helper_result = await self.admin_client.table("helpers").select(HELPER_COLUMNS).eq("id", helper_id).execute()
             if not helper_result.data:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Helper not found")
             
@@ -24,7 +31,7 @@ class HelperService:
 
     async def get_helpers(self, limit: int = 20, offset: int = 0) -> HelperListResponse:
         try:
-            helpers_result = self.admin_client.table("helpers").select("*").offset(offset).execute()
+            helpers_result = await self.admin_client.table("helpers").select(HELPER_COLUMNS).offset(offset).execute()
             if not helpers_result.data:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No helpers found")
  
@@ -33,41 +40,46 @@ class HelperService:
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+    def helper_changed(self, helper_id: str, fields) -> None:
+        """Drop cached search pages a change to these helper columns made stale"""
+        if self.search_cache is not None:
+            self.search_cache.invalidate_helper(helper_id, fields)
+
     async def search_helpers(self, search_request: HelperSearchRequest) -> HelperListResponse:
+        if self.search_cache is not None:
+            return await self.search_cache.get_or_load(search_request, self._search_helpers)
+        return await self._search_helpers(search_request)
+
+    async def _search_helpers(self, search_request: HelperSearchRequest) -> HelperListResponse:
         try:
             # Map parameters to match database function signature
-            count_params = {
-                "search_query": search_request.search_query,
-                "search_college": search_request.search_college,
-                "search_graduation_year": search_request.search_graduation_year,
-                "search_zip_code": search_request.search_zip_code,
-            }
-
-            count_result = self.admin_client.rpc(
-                "count_helpers_matching_criteria",
-                count_params
-            ).execute()
-            total_count = count_result.data if count_result.data else 0
-            
-            if total_count == 0:
-                return HelperListResponse(helpers=[], total_count=0, limit=search_request.limit, offset=search_request.offset)
-            
-            # Map parameters for the get function
             search_params = {
                 "search_query": search_request.search_query,
                 "search_college": search_request.search_college,
                 "search_graduation_year": search_request.search_graduation_year,
                 "search_zip_code": search_request.search_zip_code,
-                "search_limit": search_request.limit,
-                "search_offset": search_request.offset,
             }
-            
-            result = self.admin_client.rpc(
-                "get_helpers_matching_criteria",
-                search_params
+
+            # The page and the total match count (on every row) in one call
+            result = await self.admin_client.rpc(
+                "search_helpers",
+                {**search_params, "search_limit": search_request.limit, "search_offset": search_request.offset}
             ).execute()
-            
-            helpers = [HelperResponse(**helper) for helper in result.data]
+            rows = result.data or []
+
+            if rows:
+                total_count = rows[0]["total_count"]
+            elif search_request.offset:
+                # A page past the last match carries no count
+                count_result = await self.admin_client.rpc(
+                    "count_helpers_matching_criteria",
+                    search_params
+                ).execute()
+                total_count = count_result.data or 0
+            else:
+                total_count = 0
+
+            helpers = [HelperResponse(**helper) for helper in rows]
 
             return HelperListResponse(helpers=helpers, total_count=total_count, limit=search_request.limit, offset=search_request.offset)
         except Exception as e:
@@ -0,0 +1,83 @@
+import asyncio
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+from supabase import AClient
+
+
+class MessageBatcher:
+    """Group-commits message inserts.
+
+    Rows submitted while an insert is in flight are written together by the
+    next one, so under load a round trip carries up to ``max_batch`` messages
+    and an idle chat still gets its message written immediately. One insert
+    runs at a time, which keeps messages in submission order.
+
+    Rows get their id here, so stored rows are matched to callers by id
+    rather than by position in the response. If the database rejects a
+    batch, its rows are retried one at a time, so only the caller whose row
+    is at fault gets the error.
+    """
+
+    def __init__(self, admin_client: AClient, max_batch: int = 50):
+        self.admin_client = admin_client
+        self.max_batch = max_batch
+        self._pending: List[Tuple[Dict, asyncio.Future]] = []
+        self._flushing: Optional[asyncio.Task] = None
+        self._scheduled = False
+
+    async def insert(self, row: Dict) -> Dict:
+        """Insert one message row and return it as stored"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(({"id": str(uuid.uuid4()), **row}, future))
+        if not self._scheduled and self._flushing is None:
+            # Let the rest of this loop tick join the batch
+            self._scheduled = True
+            asyncio.get_running_loop().call_soon(self._start_flush)
+        return await future
+
+    def _start_flush(self) -> None:
+        self._scheduled = False
+        if self._flushing is not None or not self._pending:
+            return
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        self._flushing = asyncio.create_task(self._flush(batch))
+
+    async def _flush(self, batch: List[Tuple[Dict, asyncio.Future]]) -> None:
+        try:
+            try:
+                await self._insert(batch)
+            except APIError:
+                if len(batch) == 1:
+                    raise
+                # The statement was rejected, so nothing was written; keep one
+                # bad row from failing everyone else's message
+                for item in batch:
+                    try:
+                        await self._insert([item])
+                    except Exception as e:
+                        self._fail([item], e)
+        except Exception as e:
+            self._fail(batch, e)
+        finally:
+            self._flushing = None
+            self._start_flush()
+
+    async def _insert(self, batch: List[Tuple[Dict, asyncio.Future]]) -> None:
+        result = await self.admin_client.table("messages").insert(
+            [row for row, _ in batch]
+        ).execute()
+        stored = {str(row["id"]): row for row in (result.data or [])}
+        missing = [row["id"] for row, _ in batch if row["id"] not in stored]
+        if missing:
+            raise RuntimeError(f"Inserted {len(batch) - len(missing)} of {len(batch)} messages")
+        for row, future in batch:
+            if not future.done():
+                future.set_result(stored[row["id"]])
+
+    @staticmethod
+    def _fail(batch: List[Tuple[Dict, asyncio.Future]], error: Exception) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
@@ -0,0 +1,277 @@
+import asyncio
+import logging
+import random
+import statistics
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from supabase import AClient
+
+from app.services.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[..., Awaitable[object]]
+
+
+class NotificationQueue:
+    """Durable queue of outbound notification jobs backed by public.notification_jobs.
+
+    Services enqueue ``(kind, payload)`` rows; each app process runs a pool of
+    workers that claim due jobs with a lease (claim_notification_jobs), call
+    the handler registered for the kind with the payload as keyword
+    arguments and mark the row done. The lease is renewed from the claim
+    until the row is updated, so a job waiting for a worker or for its
+    provider's rate limit is not re-claimed by another process. A failing job
+    is retried with exponential backoff until ``max_attempts``, then left as
+    failed. Handlers belong to a provider whose calls are rate limited per
+    process.
+    """
+
+    def __init__(
+        self,
+        admin_client: AClient,
+        workers: int = 4,
+        poll_interval: float = 1.0,
+        lease_seconds: int = 60,
+        max_attempts: int = 5,
+        backoff_base: float = 2.0,
+        backoff_max: float = 600.0,
+        rate_limits: Optional[Dict[str, float]] = None,
+        coalesce_window: float = 30.0,
+    ):
+        self.admin_client = admin_client
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.coalesce_window = coalesce_window
+        self.worker_id = uuid.uuid4().hex
+        self._handlers: Dict[str, Tuple[JobHandler, Optional[str]]] = {}
+        self._limiters = {
+            provider: RateLimiter(rate) for provider, rate in (rate_limits or {}).items()
+        }
+        self._ready: Optional[asyncio.Queue] = None
+        self._leases: Dict[object, asyncio.Task] = {}
+        self._wake = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+        self._counts = {"enqueued": 0, "coalesced": 0, "succeeded": 0, "retried": 0, "failed": 0}
+        # Seconds from enqueue to completion, and handler run time, for recent jobs
+        self._latencies: Deque[float] = deque(maxlen=1000)
+        self._run_times: Deque[float] = deque(maxlen=1000)
+
+    def register(self, kind: str, handler: JobHandler, provider: Optional[str] = None) -> None:
+        """Run ``handler(**payload)`` for jobs of this kind"""
+        self._handlers[kind] = (handler, provider)
+
+    async def enqueue(self, kind: str, payload: Dict, delay: float = 0) -> None:
+        await self.enqueue_many([(kind, payload)], delay=delay)
+
+    async def enqueue_many(self, jobs: List[Tuple[str, Dict]], delay: float = 0) -> None:
+        """Persist several jobs in one insert"""
+        if not jobs:
+            return
+        run_at = (datetime.now(timezone.utc) + timedelta(seconds=delay)).isoformat()
+        await self.admin_client.table("notification_jobs").insert([
+            {"kind": kind, "payload": payload, "run_at": run_at, "max_attempts": self.max_attempts}
+            for kind, payload in jobs
+        ]).execute()
+        self._counts["enqueued"] += len(jobs)
+        # Local workers pick the jobs up now rather than at the next poll
+        self._wake.set()
+
+    async def enqueue_coalesced(self, kind: str, key: str, payload: Dict) -> None:
+        """Queue a job that merges with the pending job for the same key.
+
+        The first job for a key runs at once; jobs within ``coalesce_window``
+        seconds after it collapse into one that runs when the window ends.
+        The handler gets the latest payload plus ``count``, the number of
+        jobs merged into it.
+        """
+        result = await self.admin_client.rpc("enqueue_coalesced_notification_job", {
+            "job_kind": kind,
+            "job_coalesce_key": key,
+            "job_payload": payload,
+            "window_seconds": self.coalesce_window,
+            "job_max_attempts": self.max_attempts,
+        }).execute()
+        job = result.data[0] if isinstance(result.data, list) else result.data
+        if job and (job.get("payload") or {}).get("count", 1) > 1:
+            self._counts["coalesced"] += 1
+        else:
+            self._counts["enqueued"] += 1
+            self._wake.set()
+
+    def notify(self, count: int = 1) -> None:
+        """Record jobs inserted by a database function in the caller's transaction"""
+        self._counts["enqueued"] += count
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._ready = asyncio.Queue(maxsize=self.workers)
+        self._tasks = [asyncio.create_task(self._fetch_loop())]
+        self._tasks += [asyncio.create_task(self._work_loop()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        leases, self._leases = list(self._leases.values()), {}
+        for lease in leases:
+            lease.cancel()
+        await asyncio.gather(*leases, return_exceptions=True)
+        # Jobs claimed but not started go back to the table once their lease lapses
+
+    async def _fetch_loop(self) -> None:
+        last_prune = 0.0
+        while True:
+            room = self._ready.maxsize - self._ready.qsize()
+            jobs = []
+            if room > 0:
+                try:
+                    result = await self.admin_client.rpc("claim_notification_jobs", {
+                        "worker_id": self.worker_id,
+                        "batch_size": room,
+                        "lease_seconds": self.lease_seconds,
+                    }).execute()
+                    jobs = result.data or []
+                except Exception as e:
+                    logger.error(f"Failed to claim notification jobs: {e}")
+            for job in jobs:
+                self._leases[job["id"]] = asyncio.create_task(self._hold_lease(job))
+                await self._ready.put(job)
+
+            if time.monotonic() - last_prune > 3600:
+                last_prune = time.monotonic()
+                try:
+                    await self.admin_client.rpc("prune_notification_jobs", {}).execute()
+                except Exception as e:
+                    logger.error(f"Failed to prune notification jobs: {e}")
+
+            if room > 0 and len(jobs) == room:
+                # Probably more waiting; claim again as soon as a worker frees up
+                await self._ready.join()
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def _work_loop(self) -> None:
+        while True:
+            job = await self._ready.get()
+            try:
+                await self._run(job)
+            except Exception as e:
+                logger.error(f"Notification job {job.get('id')} crashed the worker: {e}")
+            finally:
+                lease = self._leases.pop(job.get("id"), None)
+                if lease is not None:
+                    lease.cancel()
+                self._ready.task_done()
+
+    async def _run(self, job: Dict) -> None:
+        handler, provider = self._handlers.get(job["kind"], (None, None))
+        if handler is None:
+            await self._finish(job, "failed", error=f"No handler for job kind {job['kind']}")
+            self._counts["failed"] += 1
+            return
+
+        limiter = self._limiters.get(provider)
+        if limiter is not None:
+            await limiter.acquire()
+
+        started = time.monotonic()
+        try:
+            # Not cancelled for running long: a send cut off mid-request and
+            # retried would go out twice. Clients bound each request instead.
+            await handler(**(job["payload"] or {}))
+        except Exception as e:
+            self._run_times.append(time.monotonic() - started)
+            error = str(e) or type(e).__name__
+            if job["attempts"] >= job.get("max_attempts", self.max_attempts):
+                logger.error(f"Notification job {job['id']} ({job['kind']}) failed for good: {error}")
+                await self._finish(job, "failed", error=error)
+                self._counts["failed"] += 1
+            else:
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (job["attempts"] - 1))
+                delay *= random.uniform(0.8, 1.2)
+                await self._finish(job, "pending", error=error, retry_in=delay)
+                self._counts["retried"] += 1
+            return
+
+        self._run_times.append(time.monotonic() - started)
+        await self._finish(job, "done")
+        self._counts["succeeded"] += 1
+        created_at = datetime.fromisoformat(job["created_at"])
+        self._latencies.append((datetime.now(timezone.utc) - created_at).total_seconds())
+
+    async def _hold_lease(self, job: Dict) -> None:
+        """Push the lease forward so no other worker re-claims a claimed job"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            locked_until = datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)
+            try:
+                await (self.admin_client.table("notification_jobs")
+                    .update({"locked_until": locked_until.isoformat()})
+                    .eq("id", job["id"])
+                    .eq("locked_by", self.worker_id)
+                    .execute())
+            except Exception as e:
+                logger.error(f"Failed to renew the lease on notification job {job['id']}: {e}")
+
+    async def _finish(self, job: Dict, status: str, error: Optional[str] = None, retry_in: float = 0) -> None:
+        now = datetime.now(timezone.utc)
+        update = {"status": status, "locked_by": None, "locked_until": None}
+        if error is not None:
+            update["last_error"] = error[:1000]
+        if status == "pending":
+            update["run_at"] = (now + timedelta(seconds=retry_in)).isoformat()
+        else:
+            update["finished_at"] = now.isoformat()
+        try:
+            # Only while this worker still holds the lease
+            await (self.admin_client.table("notification_jobs")
+                .update(update)
+                .eq("id", job["id"])
+                .eq("locked_by", self.worker_id)
+                .execute())
+        except Exception as e:
+            logger.error(f"Failed to record notification job {job['id']} as {status}: {e}")
+
+    def metrics(self) -> Dict:
+        """Counters and recent latencies for this process's workers"""
+
+        def percentiles(samples) -> Dict[str, Optional[float]]:
+            if not samples:
+                return {"p50": None, "p95": None}
+            ordered = sorted(samples)
+            return {
+                "p50": round(statistics.median(ordered), 4),
+                "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+            }
+
+        return {
+            **self._counts,
+            "in_memory": self._ready.qsize() if self._ready is not None else 0,
+            "latency_seconds": percentiles(self._latencies),
+            "run_seconds": percentiles(self._run_times),
+        }
+
+    async def stats(self) -> Dict:
+        """Queue depth across all workers: job counts per status and the oldest due job's wait"""
+        result = await self.admin_client.rpc("notification_job_stats", {}).execute()
+        return {
+            row["status"]: {"jobs": row["jobs"], "oldest_due_seconds": row["oldest_due_seconds"]}
+            for row in (result.data or [])
+        }
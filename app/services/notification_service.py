@@ -1,124 +1,58 @@
+import logging
+from typing import List, Optional
 from uuid import UUID
 from fastapi import HTTPException, status
-from supabase import Client
-from httpx import AsyncClient
-import jwt
-import time
-import asyncio
+from supabase import AClient
 
 
-from app.core.config import settings
+from app.services.apns_client import APNsClient, get_apns_client
+from app.services.chat_membership_cache import ChatMembershipCache
+from app.services.chat_service import ParticipantLoader
+from app.services.notification_queue import NotificationQueue
+from app.services.websocket_manager import WebSocketManager
 
+logger = logging.getLogger(__name__)
 
 class NotificationService:
     """Service for handling chat and messaging operations"""
 
-    def __init__(self, admin_client: Client):
+    def __init__(
+        self,
+        admin_client: AClient,
+        membership_cache: Optional[ChatMembershipCache] = None,
+        presence: Optional[WebSocketManager] = None,
+        apns: Optional[APNsClient] = None,
+        jobs: Optional[NotificationQueue] = None,
+    ):
         self.admin_client = admin_client
-        self.url = "https://api.sandbox.push.apple.com"
-
-    def _get_private_key(self):
-        return settings.PUSH_TOKEN_SECRET.replace("\\n", "\n")
-
-    def _create_auth_token(self):
-        return jwt.encode(
-            {
-                "iss": settings.APPLE_ID,
-                "iat": int(time.time()),
-            },
-            self._get_private_key(),
-            algorithm="ES256",
-            headers={"alg": "ES256", "kid": settings.HELPER_PUSH_NOTIFICATION_P8_ID},
-        )
-
-    async def _send_apns_notification(self, msg: dict):
-        async with AsyncClient(http2=True) as client:
-            response = await client.post(
-                f"{self.url}/3/device/{msg['device_token']}",
-                headers=msg["headers"],
-                json=msg["payload"],
-            )
-            return {
-                "device_token": msg["device_token"],
-                "status": response.status_code,
-                "body": response.text,
-            }
+        self.membership_cache = membership_cache or ChatMembershipCache(admin_client)
+        # Users with the chat open get the message over the socket instead
+        self.presence = presence
+        self.apns = apns or get_apns_client()
+        self.jobs = jobs or NotificationQueue(admin_client)
+        self.jobs.register("push.chat_message", self.send_push_notification, provider="apns")
 
     async def send_msg_notification(self, chat_id: UUID, sender_id: str, message: str):
+        """Queue a push for each offline participant; a burst of messages becomes one summary push"""
         try:
 
-            cu_result = (
-                self.admin_client.table("chat_users")
-                .select("id,user_id")
-                .eq("chat_id", str(chat_id))
-                .execute()
-            )
-            if not cu_result.data:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND, detail="Chat not found"
-                )
-            participant_user_ids = [UUID(row["user_id"]) for row in cu_result.data]
-            if UUID(str(sender_id)) not in participant_user_ids:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Access denied to this chat",
-                )
-            sender_chat_user_id = None
-            for row in cu_result.data:
-                if row["user_id"] == str(sender_id):
-                    sender_chat_user_id = row["id"]
-                    break
-            if sender_chat_user_id is None:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN, detail="Sender not in chat"
+            members, _ = await self.membership_cache.require_member(chat_id, sender_id)
+
+            online = self.presence.online_users(chat_id) if self.presence else set()
+            for recipient_id in members:
+                if recipient_id == str(sender_id) or recipient_id in online:
+                    continue
+                await self.jobs.enqueue_coalesced(
+                    "push.chat_message",
+                    f"push.chat_message:{chat_id}:{recipient_id}",
+                    {
+                        "recipient_id": recipient_id,
+                        "sender_id": str(sender_id),
+                        "chat_id": str(chat_id),
+                        "content": message,
+                    },
                 )
 
-            filtered_ids = [id for id in participant_user_ids if id != str(sender_id)]
-            native_push_tokens = set()
-
-            response = (
-                self.admin_client.table("helpers")
-                .select("id, push_notification_token")
-                .in_("id", filtered_ids)
-                .execute()
-            )
-            print(response)
-
-            msgs = []
-            if response.data:
-                print(response.data)
-                for token_data in response.data:
-                    tokens = token_data["push_notification_token"] or []
-                    for token in tokens:
-                        headers = {
-                            "authorization": f"bearer {self._create_auth_token()}",
-                            "apns-topic": settings.HELPER_MOBILE_APP_BUNDLE_ID,
-                        }
-                        payload = {
-                            "aps": {
-                                "alert": {
-                                    "title": "New Message",
-                                    "body": message,
-                                }
-                            }
-                        }
-                        if token in native_push_tokens:
-                            continue
-
-                        msgs.append(
-                            {
-                                "headers": headers,
-                                "payload": payload,
-                                "device_token": token,
-                            }
-                        )
-                        native_push_tokens.add(token)
-
-            tasks = [self._send_apns_notification(msg) for msg in msgs]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            print(results)
-
         except HTTPException:
             raise
         except Exception as e:
@@ -126,3 +60,83 @@ class NotificationService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to send message: {str(e)}",
             )
+
+    async def send_push_notification(
+        self,
+        recipient_id: str,
+        sender_id: str,
+        chat_id: str,
+        content: str,
+        count: int = 1,
+        device_tokens: Optional[List[str]] = None,
+    ) -> None:
+        """Push new messages to the recipient's devices, unless they have the chat open.
+
+        ``device_tokens`` limits a retry to the devices that did not get the
+        push the first time.
+        """
+        if self.presence and self.presence.is_online(chat_id, recipient_id):
+            return
+
+        if device_tokens is None:
+            device_tokens = await self._device_tokens(recipient_id)
+        if not device_tokens:
+            return
+
+        body = content
+        if count > 1:
+            sender = await ParticipantLoader(self.admin_client).load(sender_id)
+            body = f"{count} new messages from {sender.first_name} {sender.last_name}"
+        payload = {
+            "aps": {
+                "alert": {
+                    "title": "New Message",
+                    "body": body,
+                }
+            }
+        }
+        results = await self.apns.send_many(device_tokens, payload)
+
+        retry = [token for token, result in zip(device_tokens, results) if isinstance(result, Exception)]
+        sent = [result for result in results if not isinstance(result, Exception)]
+        dead = [result["device_token"] for result in sent if self.apns.is_dead_token(result)]
+        for result in sent:
+            if result["status"] != 200 and result["device_token"] not in dead:
+                logger.error(f"APNs rejected a push to {recipient_id}: {result['status']} {result['reason']}")
+        if dead:
+            await self._remove_device_tokens(recipient_id, dead)
+
+        if retry:
+            if not any(result["status"] == 200 for result in sent):
+                # Nothing was delivered; let the job retry
+                raise next(result for result in results if isinstance(result, Exception))
+            # Retry only the devices that missed it, so the others are not pushed twice
+            await self.jobs.enqueue("push.chat_message", {
+                "recipient_id": recipient_id,
+                "sender_id": sender_id,
+                "chat_id": chat_id,
+                "content": content,
+                "count": count,
+                "device_tokens": retry,
+            })
+
+    async def _device_tokens(self, recipient_id: str) -> List[str]:
+        response = await (
+            self.admin_client.table("helpers")
+            .select("id, push_notification_token")
+            .eq("id", recipient_id)
+            .execute()
+        )
+        device_tokens = []
+        for token_data in response.data or []:
+            for token in token_data["push_notification_token"] or []:
+                if token not in device_tokens:
+                    device_tokens.append(token)
+        return device_tokens
+
+    async def _remove_device_tokens(self, recipient_id: str, dead_tokens: List[str]) -> None:
+        """Forget tokens APNs reported as unregistered or invalid, in one UPDATE so none registered meanwhile is lost"""
+        await self.admin_client.rpc("remove_helper_push_tokens", {
+            "token_helper_id": recipient_id,
+            "dead_tokens": dead_tokens,
+        }).execute()
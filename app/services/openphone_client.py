@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import random
+from functools import lru_cache
+from typing import Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.services.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Only failures where OpenPhone cannot have accepted the message are retried
+# here; a 5xx or a timeout after the request was sent may still have been
+# delivered, so those go back to the caller (the job queue decides)
+RETRY_STATUSES = {429}
+RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class OpenPhoneClient:
+    """Async OpenPhone API client over a pooled keep-alive connection set.
+
+    At most ``max_concurrency`` requests are in flight per process. With
+    ``rate_limit`` set, every attempt (retries included) first takes a token
+    from one bucket, so queue workers and bulk sends together stay under the
+    account limit. Throttled (429) responses and errors raised before the
+    request was sent are retried up to ``max_retries`` times with jittered
+    exponential backoff; a Retry-After header from OpenPhone takes precedence
+    over the computed delay. Nothing that may have sent a message is retried.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        max_concurrency: int = 10,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        timeout: float = 30.0,
+        rate_limit: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            # OpenPhone takes the API key without a "Bearer" prefix
+            headers={"Authorization": api_key},
+            timeout=timeout,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=max_concurrency, max_keepalive_connections=max_concurrency
+            ),
+        )
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._limiter = RateLimiter(rate_limit) if rate_limit else None
+
+    async def send_message(self, payload: Dict) -> httpx.Response:
+        """POST /messages, retrying throttled and unsent requests; returns the last response"""
+        attempt = 0
+        while True:
+            if self._limiter:
+                await self._limiter.acquire()
+            try:
+                async with self._slots:
+                    response = await self._client.post("/messages", json=payload)
+            except RETRY_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                logger.warning(f"OpenPhone request failed, retrying: {e}")
+                response = None
+
+            if response is not None and (
+                response.status_code not in RETRY_STATUSES or attempt >= self.max_retries
+            ):
+                return response
+
+            attempt += 1
+            # Sleep outside the semaphore so waiting retries do not hold a slot
+            await asyncio.sleep(self._retry_delay(attempt, response))
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(self.backoff_max, float(retry_after))
+            except ValueError:
+                pass
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return delay * random.uniform(0.8, 1.2)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+@lru_cache(maxsize=1)
+def get_openphone_client() -> OpenPhoneClient:
+    return OpenPhoneClient(
+        settings.OPENPHONE_URL,
+        settings.OPENPHONE_API_KEY,
+        max_concurrency=settings.OPENPHONE_MAX_CONCURRENCY,
+        max_retries=settings.OPENPHONE_MAX_RETRIES,
+        rate_limit=settings.OPENPHONE_RATE_LIMIT_PER_SECOND,
+    )
+
+
+async def close_openphone_client() -> None:
+    """Close the shared OpenPhone connections, if any were opened"""
+    if get_openphone_client.cache_info().currsize:
+        await get_openphone_client().aclose()
+        get_openphone_client.cache_clear()
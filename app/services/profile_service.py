@@ -1,5 +1,5 @@
 from typing import Optional
-from supabase import Client
+from supabase import AClient
 from fastapi import HTTPException
 
 from app.schemas.profile import (
@@ -9,27 +9,33 @@ from app.schemas.profile import (
     HelperProfileData,
     ProfileUpdateData,
 )
+from app.services.helper_search_cache import HelperSearchCache
+from app.utils.projection import select_columns
+
+CLIENT_PROFILE_COLUMNS = select_columns(ClientProfileData)
+HELPER_PROFILE_COLUMNS = select_columns(HelperProfileData)
 
 
 class ProfileService:
     """Service for handling user profile operations"""
 
-    def __init__(self, admin_client: Client):
+    def __init__(self, admin_client: AClient, helper_search_cache: Optional[HelperSearchCache] = None):
         self.admin_client = admin_client
+        self.helper_search_cache = helper_search_cache
 
     async def get_user_profile_status(self, user_id: str) -> UserProfileStatusResponse:
         """Get user's profile completion status"""
         try:
             # Check if user is client or helper
-            client_result = (
+            client_result = await (
                 self.admin_client.table("clients")
-                .select("*")
+                .select(CLIENT_PROFILE_COLUMNS)
                 .eq("id", user_id)
                 .execute()
             )
-            helper_result = (
+            helper_result = await (
                 self.admin_client.table("helpers")
-                .select("*")
+                .select(HELPER_PROFILE_COLUMNS)
                 .eq("id", user_id)
                 .execute()
             )
@@ -95,9 +101,9 @@ class ProfileService:
     async def get_client_profile(self, user_id: str) -> Optional[ClientProfileData]:
         """Get client profile by user ID"""
         try:
-            result = (
+            result = await (
                 self.admin_client.table("clients")
-                .select("*")
+                .select(CLIENT_PROFILE_COLUMNS)
                 .eq("id", user_id)
                 .execute()
             )
@@ -112,9 +118,9 @@ class ProfileService:
     async def get_helper_profile(self, user_id: str) -> Optional[HelperProfileData]:
         """Get helper profile by user ID"""
         try:
-            result = (
+            result = await (
                 self.admin_client.table("helpers")
-                .select("*")
+                .select(HELPER_PROFILE_COLUMNS)
                 .eq("id", user_id)
                 .execute()
             )
@@ -133,7 +139,7 @@ class ProfileService:
         try:
             # Convert Pydantic model to dict, excluding None values
             update_data = profile_data.model_dump(exclude_unset=True)
-            result = (
+            result = await (
                 self.admin_client.table("clients")
                 .update(update_data)
                 .eq("id", user_id)
@@ -163,7 +169,7 @@ class ProfileService:
         try:
             # Convert Pydantic model to dict, excluding None values
             update_data = profile_data.model_dump(exclude_unset=True)
-            result = (
+            result = await (
                 self.admin_client.table("helpers")
                 .update(update_data)
                 .eq("id", user_id)
@@ -171,6 +177,8 @@ class ProfileService:
             )
 
             if result.data:
+                if self.helper_search_cache is not None:
+                    self.helper_search_cache.invalidate_helper(user_id, update_data)
                 updated_profile = HelperProfileData(**result.data[0])
                 return ProfileUpdateResponse(
                     success=True,
@@ -188,7 +196,10 @@ class ProfileService:
 
     async def delete_profile(self, user_id: str):
         try:
-            result = self.admin_client.auth.admin.delete_user(user_id)
+            result = await self.admin_client.auth.admin.delete_user(user_id)
+            # A deleted helper drops out of every search
+            if self.helper_search_cache is not None:
+                self.helper_search_cache.invalidate_all()
         except Exception as exc:
             raise HTTPException(
                 status_code=500, detail=f"Failed to update helper profile: {str(exc)}"
@@ -197,9 +208,9 @@ class ProfileService:
     async def register_device(self, user_id: str, expo_token: str):
 
         try:
-            client_result = (
+            client_result = await (
                 self.admin_client.table("clients")
-                .select("*")
+                .select("id, push_notification_token")
                 .eq("id", user_id)
                 .execute()
             )
@@ -208,12 +219,12 @@ class ProfileService:
                 tokens = client_result.data[0].get("push_notification_token") or []
                 if expo_token not in tokens:
                     updated_tokens = tokens + [expo_token]
-                    self.admin_client.table("clients").update(
+                    await self.admin_client.table("clients").update(
                         {"push_notification_token": updated_tokens}
                     ).eq("id", user_id).execute()
                 return
 
-            helper_result = (
+            helper_result = await (
                 self.admin_client.table("helpers")
                 .select("id, push_notification_token")
                 .eq("id", user_id)
@@ -224,7 +235,7 @@ class ProfileService:
                 tokens = helper_result.data[0].get("push_notification_token") or []
                 if expo_token not in tokens:
                     updated_tokens = tokens + [expo_token]
-                    self.admin_client.table("helpers").update(
+                    await self.admin_client.table("helpers").update(
                         {"push_notification_token": updated_tokens}
                     ).eq("id", user_id).execute()
                 return
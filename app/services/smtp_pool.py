@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import ssl
+import time
+from email.message import Message
+from functools import lru_cache
+from typing import List, Optional, Set
+
+import aiosmtplib
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _Session:
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPPool:
+    """A small pool of authenticated aiosmtplib sessions.
+
+    Up to ``max_connections`` sessions are open at once; a send waits for a
+    free one instead of connecting, upgrading to TLS and logging in again.
+    Sessions are retired with QUIT after ``max_messages_per_connection``
+    messages or ``idle_timeout`` seconds unused, before the server drops
+    them. A send that finds its reused session dead is retried once on a
+    fresh connection. Errors use the aiosmtplib exception types.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = True,
+        use_tls: bool = False,
+        max_connections: int = 2,
+        max_messages_per_connection: int = 100,
+        idle_timeout: float = 60.0,
+        timeout: float = 30.0,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.use_tls = use_tls
+        self.max_connections = max_connections
+        self.max_messages_per_connection = max_messages_per_connection
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle: List[_Session] = []
+        self._closing: Set[asyncio.Task] = set()
+        self.connections_opened = 0
+
+    async def send_message(self, message: Message, sender: str, recipients: List[str]) -> None:
+        """Send one message; raises the aiosmtplib exception if it is refused"""
+        async with self._slots:
+            session = self._take_idle()
+            if session is not None:
+                try:
+                    return await self._send_on(session, message, sender, recipients)
+                except aiosmtplib.SMTPServerDisconnected as e:
+                    logger.info(f"Pooled SMTP session failed, reconnecting: {e}")
+            session = await self._open()
+            await self._send_on(session, message, sender, recipients)
+
+    async def _open(self) -> _Session:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            username=self.username or None,
+            password=(self.password or "") if self.username else None,
+            use_tls=self.use_tls,
+            start_tls=self.starttls and not self.use_tls,
+            tls_context=self.ssl_context,
+            timeout=self.timeout,
+        )
+        await smtp.connect()
+        self.connections_opened += 1
+        return _Session(smtp)
+
+    async def _send_on(self, session: _Session, message: Message, sender: str, recipients: List[str]) -> None:
+        try:
+            await session.smtp.send_message(message, sender=sender, recipients=recipients)
+            session.sent += 1
+        except (aiosmtplib.SMTPRecipientsRefused, aiosmtplib.SMTPResponseException):
+            # The server refused this message and the envelope was reset
+            self._release(session)
+            raise
+        except BaseException:
+            session.smtp.close()
+            raise
+        self._release(session)
+
+    def _take_idle(self) -> Optional[_Session]:
+        while self._idle:
+            session = self._idle.pop()
+            if session.smtp.is_connected and time.monotonic() - session.last_used < self.idle_timeout:
+                return session
+            self._retire(session)
+        return None
+
+    def _release(self, session: _Session) -> None:
+        if not session.smtp.is_connected:
+            session.smtp.close()
+        elif session.sent >= self.max_messages_per_connection:
+            self._retire(session)
+        else:
+            session.last_used = time.monotonic()
+            self._idle.append(session)
+
+    def _retire(self, session: _Session) -> None:
+        """QUIT in the background; aclose() waits for it"""
+        task = asyncio.create_task(self._quit(session))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _quit(session: _Session) -> None:
+        try:
+            if session.smtp.is_connected:
+                await asyncio.wait_for(session.smtp.quit(), 5)
+        except Exception:
+            pass
+        session.smtp.close()
+
+    async def aclose(self) -> None:
+        idle, self._idle = self._idle, []
+        for session in idle:
+            self._retire(session)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+
+@lru_cache(maxsize=1)
+def get_smtp_pool() -> SMTPPool:
+    return SMTPPool(
+        settings.SMTP_SERVER,
+        settings.SMTP_PORT,
+        username=settings.EMAIL_SENDER,
+        password=settings.EMAIL_PASSWORD,
+        starttls=settings.SMTP_STARTTLS,
+        # Port 465 speaks TLS from the start; others upgrade with STARTTLS
+        use_tls=settings.SMTP_PORT == 465,
+        max_connections=settings.SMTP_MAX_CONNECTIONS,
+        max_messages_per_connection=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+        idle_timeout=settings.SMTP_IDLE_TIMEOUT_SECONDS,
+    )
+
+
+async def close_smtp_pool() -> None:
+    """Close the shared SMTP sessions, if any were opened"""
+    if get_smtp_pool.cache_info().currsize:
+        await get_smtp_pool().aclose()
+        get_smtp_pool.cache_clear()
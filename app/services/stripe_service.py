@@ -1,7 +1,7 @@
 import stripe
 import json
 from app.core.config import settings
-from supabase import Client
+from supabase import AClient
 from fastapi import HTTPException
 from datetime import datetime
 from typing import Optional
@@ -17,7 +17,7 @@ stripe.api_key = settings.STRIPE_SECRET_KEY
 
 
 class StripeService:
-    def __init__(self, admin_client: Client):
+    def __init__(self, admin_client: AClient):
         self.admin_client = admin_client
 
     def _convert_timestamp_to_iso(self, timestamp) -> str:
@@ -41,7 +41,7 @@ class StripeService:
             )
             
             # Store customer ID in Supabase
-            self.admin_client.table("subscriptions").upsert({
+            await self.admin_client.table("subscriptions").upsert({
                 "user_id": user_id,
                 "stripe_customer_id": customer.id,
                 "plan": "free",
@@ -56,7 +56,7 @@ class StripeService:
         """Create a Stripe Checkout session for subscription"""
         try:
             # Get user's Stripe customer ID
-            result = self.admin_client.table("subscriptions").select("stripe_customer_id").eq("user_id", user_id).execute()
+            result = await self.admin_client.table("subscriptions").select("stripe_customer_id").eq("user_id", user_id).execute()
             
             if not result.data:
                 # This should not happen as the endpoint creates the customer first
@@ -94,7 +94,7 @@ class StripeService:
         """Create a subscription for a user"""
         try:
             # Get user's Stripe customer ID
-            result = self.admin_client.table("subscriptions").select("stripe_customer_id").eq("user_id", user_id).execute()
+            result = await self.admin_client.table("subscriptions").select("stripe_customer_id").eq("user_id", user_id).execute()
             
             if not result.data:
                 raise HTTPException(status_code=404, detail="User not found in subscriptions table")
@@ -122,7 +122,7 @@ class StripeService:
             period_start_iso = self._convert_timestamp_to_iso(subscription.current_period_start)
             period_end_iso = self._convert_timestamp_to_iso(subscription.current_period_end)
             
-            self.admin_client.table("subscriptions").upsert({
+            await self.admin_client.table("subscriptions").upsert({
                 "user_id": user_id,
                 "stripe_subscription_id": subscription.id,
                 "stripe_customer_id": customer_id,
@@ -146,7 +146,7 @@ class StripeService:
         """Create a Stripe customer portal session for subscription management"""
         try:
             # Get user's Stripe customer ID
-            result = self.admin_client.table("subscriptions").select("stripe_customer_id").eq("user_id", user_id).execute()
+            result = await self.admin_client.table("subscriptions").select("stripe_customer_id").eq("user_id", user_id).execute()
             
             if not result.data or not result.data[0]["stripe_customer_id"]:
                 raise HTTPException(status_code=404, detail="No Stripe customer found")
@@ -170,7 +170,7 @@ class StripeService:
         """Cancel a user's subscription"""
         try:
             # Get subscription ID
-            result = self.admin_client.table("subscriptions").select("stripe_subscription_id").eq("user_id", user_id).execute()
+            result = await self.admin_client.table("subscriptions").select("stripe_subscription_id").eq("user_id", user_id).execute()
             
             if not result.data or not result.data[0]["stripe_subscription_id"]:
                 raise HTTPException(status_code=404, detail="No active subscription found")
@@ -184,7 +184,7 @@ class StripeService:
             )
             
             # Update in Supabase
-            self.admin_client.table("subscriptions").update({
+            await self.admin_client.table("subscriptions").update({
                 "cancel_at_period_end": True
             }).eq("user_id", user_id).execute()
             
@@ -199,7 +199,7 @@ class StripeService:
         try:
             client_post_count = await self.get_client_post_count(user_id)
             client_posts_remaining = await self.get_client_posts_remaining(user_id)
-            result = self.admin_client.table("subscriptions").select("*").eq("user_id", user_id).execute()
+            result = await self.admin_client.table("subscriptions").select("*").eq("user_id", user_id).execute()
             if not result.data:
                 return SubscriptionStatus(
                     plan="free",
@@ -225,7 +225,7 @@ class StripeService:
     async def get_client_post_count(self, user_id: str) -> int:
         """Get client post count for a user"""
         try:
-            result = self.admin_client.table("clients").select("number_of_posts").eq("id", user_id).execute()
+            result = await self.admin_client.table("clients").select("number_of_posts").eq("id", user_id).execute()
             return result.data[0]["number_of_posts"] if result.data else 0
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to get client post count: {str(e)}")
@@ -234,7 +234,7 @@ class StripeService:
         """Get client posts remaining for a user"""
         try:
             client_post_count = await self.get_client_post_count(user_id)
-            plan = self.admin_client.table("subscriptions").select("plan").eq("user_id", user_id).execute()
+            plan = await self.admin_client.table("subscriptions").select("plan").eq("user_id", user_id).execute()
             if plan.data and plan.data[0]["plan"] == "premium":
                 return -1 # Unlimited posts for premium users
             return 1 - client_post_count
@@ -244,7 +244,7 @@ class StripeService:
     async def user_exists_in_subscriptions(self, user_id: str) -> bool:
         """Check if user exists in subscriptions table"""
         try:
-            result = self.admin_client.table("subscriptions").select("user_id").eq("user_id", user_id).execute()
+            result = await self.admin_client.table("subscriptions").select("user_id").eq("user_id", user_id).execute()
             return len(result.data) > 0
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to check user subscription: {str(e)}")
@@ -258,7 +258,7 @@ class StripeService:
             )
             
             # Store event in database
-            self.admin_client.table("subscription_events").insert({
+            await self.admin_client.table("subscription_events").insert({
                 "stripe_event_id": event.id,
                 "event_type": event.type,
                 "data": event.data.object
@@ -304,7 +304,7 @@ class StripeService:
             period_end_iso = self._convert_timestamp_to_iso(subscription_data.current_period_end)
             
             # Update subscription in Supabase
-            self.admin_client.table("subscriptions").update({
+            await self.admin_client.table("subscriptions").update({
                 "status": subscription_data.status,
                 "current_period_start": period_start_iso,
                 "current_period_end": period_end_iso,
@@ -317,7 +317,7 @@ class StripeService:
         """Handle subscription deletion events"""
         try:
             # Update subscription status in Supabase
-            self.admin_client.table("subscriptions").update({
+            await self.admin_client.table("subscriptions").update({
                 "plan": "free"
             }).eq("stripe_subscription_id", subscription_data.id).execute()
         except Exception as e:
@@ -342,7 +342,7 @@ class StripeService:
             period_start_iso = self._convert_timestamp_to_iso(subscription.current_period_start)
             period_end_iso = self._convert_timestamp_to_iso(subscription.current_period_end)
             
-            self.admin_client.table("subscriptions").update({
+            await self.admin_client.table("subscriptions").update({
                 "stripe_subscription_id": subscription.id,
                 "plan": "premium",
                 "status": 'active',
@@ -362,7 +362,7 @@ class StripeService:
             customer_id = subscription_data.customer
             
             # Find user by customer ID
-            result = self.admin_client.table("subscriptions").select("user_id").eq("stripe_customer_id", customer_id).execute()
+            result = await self.admin_client.table("subscriptions").select("user_id").eq("stripe_customer_id", customer_id).execute()
             if not result.data:
                 print(f"No user found for customer {customer_id}")
                 return
@@ -373,7 +373,7 @@ class StripeService:
             period_start_iso = self._convert_timestamp_to_iso(subscription_data.current_period_start)
             period_end_iso = self._convert_timestamp_to_iso(subscription_data.current_period_end)
             
-            self.admin_client.table("subscriptions").update({
+            await self.admin_client.table("subscriptions").update({
                 "stripe_subscription_id": subscription_data.id,
                 "plan": "premium",
                 "status": "active",
@@ -394,7 +394,7 @@ class StripeService:
                 return
             
             # Update subscription status to active
-            self.admin_client.table("subscriptions").update({
+            await self.admin_client.table("subscriptions").update({
                 "status": "active"
             }).eq("stripe_subscription_id", subscription_id).execute()
             
@@ -410,7 +410,7 @@ class StripeService:
                 return
             
             # Update subscription status to past_due
-            self.admin_client.table("subscriptions").update({
+            await self.admin_client.table("subscriptions").update({
                 "status": "past_due"
             }).eq("stripe_subscription_id", subscription_id).execute()
             
@@ -424,7 +424,7 @@ class StripeService:
             if not task_data:
                 raise HTTPException(status_code=400, detail="Task data is required")
             # Get user's Stripe customer ID
-            result = self.admin_client.table("subscriptions").select("stripe_customer_id").eq("user_id", user_id).execute()
+            result = await self.admin_client.table("subscriptions").select("stripe_customer_id").eq("user_id", user_id).execute()
             
             if not result.data:
                 raise HTTPException(status_code=404, detail="User not found in subscriptions table")
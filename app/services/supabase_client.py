@@ -1,11 +1,57 @@
+
 from functools import lru_cache
-from supabase import create_client, Client
+from typing import Dict, Union
+
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_TIMEOUT
+from supabase import create_client, Client, AClient
 
 
 
 from app.core.config import settings
 
 
+class PooledPostgrestClient(AsyncPostgrestClient):
+    """PostgREST client whose session is a bounded, keep-alive HTTP/2 pool"""
+
+    def create_session(
+        self,
+        base_url: str,
+        headers: Dict[str, str],
+        timeout: Union[int, float, httpx.Timeout],
+        verify: bool = True,
+    ) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            follow_redirects=True,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=settings.SUPABASE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SUPABASE_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.SUPABASE_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+
+class PooledAsyncClient(AClient):
+    """Supabase async client that routes table/rpc calls through PooledPostgrestClient"""
+
+    @staticmethod
+    def _init_postgrest_client(
+        rest_url: str,
+        headers: Dict[str, str],
+        schema: str,
+        timeout: Union[int, float, httpx.Timeout] = DEFAULT_POSTGREST_CLIENT_TIMEOUT,
+    ) -> AsyncPostgrestClient:
+        return PooledPostgrestClient(
+            rest_url, headers=headers, schema=schema, timeout=timeout
+        )
+
+
 @lru_cache(maxsize=1)
 def get_public_supabase() -> Client:
     return create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
@@ -13,4 +59,19 @@ def get_public_supabase() -> Client:
 
 @lru_cache(maxsize=1)
 def get_admin_supabase() -> Client:
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY) 
\ No newline at end of file
+    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+
+
+@lru_cache(maxsize=1)
+def get_admin_supabase_async() -> AClient:
+    """Shared non-blocking admin client; every awaited query reuses the same connection pool"""
+    return PooledAsyncClient(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+
+
+async def close_supabase_pools() -> None:
+    """Close pooled connections held by the async admin client"""
+    if get_admin_supabase_async.cache_info().currsize:
+        client = get_admin_supabase_async()
+        if client._postgrest is not None:
+            await client.postgrest.aclose()
+        get_admin_supabase_async.cache_clear()
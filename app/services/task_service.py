@@ -1,9 +1,9 @@
 from typing import Optional
-from supabase import Client
+from supabase import AClient
 from fastapi import HTTPException
 import json
+from datetime import datetime, timezone
 
-import asyncio
 from app.schemas.task import (
     TaskCreate,
     TaskResponse,
@@ -24,27 +24,58 @@ import stripe
 
 
 from app.schemas.sms import TaskCreationNotification
+from app.services.notification_queue import NotificationQueue
 from app.services.stripe_service import StripeService
+from app.services.zip_code_index import ZipCodeIndex
 from app.utils.emailer import EmailUtils
 from app.utils.sms import SMSUtils
+from app.utils.pagination import (
+    InvalidCursorError,
+    task_search_cursor,
+    task_search_cursor_params,
+)
+from app.utils.projection import select_columns
 from app.core.config import settings
 
+# The client row as ClientInfo and the task created jobs read it
+CLIENT_COLUMNS = select_columns(ClientInfo)
+TASK_COLUMNS = select_columns(TaskResponse, exclude=["client"])
+TASK_WITH_CLIENT_COLUMNS = select_columns(TaskResponse, relations={"client": "client_id"})
+
 class TaskService:
     """Service for handling task operations and business logic"""
 
     ENUM_LOCATION_TYPE = ["remote", "in_person"]
-
-    def __init__(self, admin_client: Client, stripe_service: StripeService):
+    SEARCH_RPCS = {
+        "post_date": "get_tasks_by_post_date",
+        "distance": "get_tasks_with_distance",
+        "relevance": "get_tasks_by_relevance",
+    }
+
+    def __init__(
+        self,
+        admin_client: AClient,
+        stripe_service: StripeService,
+        emailer: Optional[EmailUtils] = None,
+        smser: Optional[SMSUtils] = None,
+        zip_code_index: Optional[ZipCodeIndex] = None,
+        jobs: Optional[NotificationQueue] = None,
+    ):
         self.admin_client = admin_client
         self.stripe_service = stripe_service
-        self.emailer = EmailUtils()
-        self.smser = SMSUtils()
+        self.emailer = emailer or EmailUtils()
+        self.smser = smser or SMSUtils()
+        self.zip_code_index = zip_code_index or ZipCodeIndex()
+        self.jobs = jobs or NotificationQueue(admin_client)
+        self.jobs.register("task.client_post_count", self.update_client_post_count)
+        self.jobs.register("email.task_notification", self.send_task_notification_email, provider="email")
+        self.jobs.register("sms.task_created", self.send_task_creation_notification, provider="openphone")
 
     async def create_task(self, client_id: str, request: TaskCreate) -> TaskResponse:
         """Create a new task with validation"""
         try:
             # Check if user is a client            
-            client = self.admin_client.table("clients").select("*").eq("id", client_id).execute()
+            client = await self.admin_client.table("clients").select(CLIENT_COLUMNS).eq("id", client_id).execute()
             if not client.data:
                 raise HTTPException(status_code=404, detail="Client not found")
 
@@ -63,17 +94,14 @@ class TaskService:
                 raise HTTPException(status_code=400, detail="Invalid location type, location type must be one of the following: " + ", ".join(self.ENUM_LOCATION_TYPE))
             
         
-            result = self.admin_client.table("tasks").insert(task_payload).execute()
+            result = await self.admin_client.table("tasks").insert(task_payload).execute()
             
 
             if not result.data:
                 raise HTTPException(status_code=500, detail="Failed to create task")
 
-            # Update client's post count (fire and forget) and notify people
-            asyncio.create_task(self.update_client_post_count(client_id))
-            asyncio.create_task(self.emailer.send_task_notification_email(client.data[0]["email"], client.data[0]["first_name"], result.data[0]["title"], "task_created", result.data[0]["description"]))
-            asyncio.create_task(self.emailer.send_task_notification_email(settings.EMAIL_SENDER, client.data[0]["first_name"], result.data[0]["title"], "task_created", result.data[0]["description"]))
-            asyncio.create_task(self.smser.send_task_creation_notification(TaskCreationNotification(task_id=result.data[0]["id"], client_phone=client.data[0]["phone"], task_title=result.data[0]["title"], task_description=result.data[0]["description"])))
+            # Update client's post count and notify people in the background
+            await self._enqueue_task_created(client.data[0], result.data[0])
             # Return the created task
             created_task = result.data[0]
             return TaskResponse(**created_task)
@@ -89,7 +117,7 @@ class TaskService:
         """Get a single task by ID"""
         try:
             # create join with clients table
-            result = self.admin_client.table("tasks").select("*, client:client_id (*)").eq("id", task_id).execute()
+            result = await self.admin_client.table("tasks").select(TASK_WITH_CLIENT_COLUMNS).eq("id", task_id).execute()
             if not result.data:
                 return None
 
@@ -119,7 +147,7 @@ class TaskService:
                 )
 
             # Update the task
-            result = self.admin_client.table("tasks").update(request.model_dump()).eq("id", task_id).execute()
+            result = await self.admin_client.table("tasks").update(request.model_dump()).eq("id", task_id).execute()
             if not result.data:
                 raise HTTPException(status_code=500, detail="Failed to update task")
 
@@ -154,7 +182,7 @@ class TaskService:
                 )
 
             # Delete the task
-            result = self.admin_client.table("tasks").delete().eq("id", task_id).execute()
+            result = await self.admin_client.table("tasks").delete().eq("id", task_id).execute()
             if not result.data:
                 raise HTTPException(status_code=500, detail="Failed to delete task")
 
@@ -174,7 +202,7 @@ class TaskService:
         try:
             # Get total count
 
-            count_result = (
+            count_result = await (
                 self.admin_client.table("tasks")
                 .select("id", count="exact")
                 .eq("client_id", user_id)
@@ -183,9 +211,9 @@ class TaskService:
             total_count = count_result.count if hasattr(count_result, "count") else 0
 
             # Get paginated tasks
-            result = (
+            result = await (
                 self.admin_client.table("tasks")
-                .select("*")
+                .select(TASK_COLUMNS)
                 .eq("client_id", user_id)
                 .order("created_at", desc=True)
                 .range(offset, offset + limit - 1)
@@ -211,20 +239,24 @@ class TaskService:
         """Search tasks with filters using efficient count and data queries"""
         try:
             search_request_dict = search_request.model_dump()
-            print(search_request_dict)
-            sort_by = search_request_dict.pop("sort_by", "post_date")
-            print(sort_by)
+            sort_by = search_request_dict.pop("sort_by", None) or "post_date"
+            cursor = search_request_dict.pop("cursor", None)
+            if sort_by not in self.SEARCH_RPCS:
+                sort_by = "post_date"
+            if cursor:
+                try:
+                    search_request_dict.update(task_search_cursor_params(sort_by, cursor))
+                except InvalidCursorError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+            elif sort_by == "relevance":
+                # Pin the recency reference so later pages rank against the same instant
+                search_request_dict["rank_reference_time"] = datetime.now(timezone.utc).isoformat()
+
             # Route to the correct SQL function based on sort_by
-            if sort_by == "distance":
-                result = self.admin_client.rpc(
-                    "get_tasks_with_distance",
-                    search_request_dict
-                    ).execute()
-            else:
-                result = self.admin_client.rpc(
-                    "get_tasks_by_post_date",
-                    search_request_dict
-                ).execute()
+            result = await self.admin_client.rpc(
+                self.SEARCH_RPCS[sort_by],
+                search_request_dict
+            ).execute()
 
             if not result.data:
                 return TaskSearchListResponse(
@@ -237,12 +269,22 @@ class TaskService:
             # Convert to TaskSearchResponse objects
             tasks = [TaskSearchResponse(**task_data) for task_data in result.data]
 
+            # A full page may have more behind it; a short page is the last one
+            next_cursor = None
+            if len(result.data) == search_request.search_limit:
+                next_cursor = task_search_cursor(
+                    sort_by, result.data[-1], search_request_dict.get("rank_reference_time")
+                )
+
             return TaskSearchListResponse(
                 tasks=tasks,
                 limit=search_request.search_limit,
                 offset=search_request.search_offset,
+                next_cursor=next_cursor,
             )
 
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=500, detail=f"Failed to search tasks: {str(e)}"
@@ -265,7 +307,7 @@ class TaskService:
                 raise HTTPException(status_code=400, detail="Task already completed")
 
             # Update task status
-            result = self.admin_client.table("tasks").update({
+            result = await self.admin_client.table("tasks").update({
                 "completed_at": "now()",
             }).eq("id", task_id).execute()
             
@@ -283,27 +325,44 @@ class TaskService:
                 status_code=500, detail=f"Failed to complete task: {str(e)}"
             )
 
+    async def _enqueue_task_created(self, client: dict, task: dict) -> None:
+        """Queue the post count update and the task created email and SMS"""
+        email = {
+            "client_name": client["first_name"],
+            "task_title": task["title"],
+            "task_description": task["description"],
+        }
+        await self.jobs.enqueue_many([
+            ("task.client_post_count", {"client_id": client["id"]}),
+            ("email.task_notification", {"to_email": client["email"], **email}),
+            ("email.task_notification", {"to_email": settings.EMAIL_SENDER, **email}),
+            ("sms.task_created", {
+                "task_id": str(task["id"]),
+                "client_phone": client["phone"],
+                "task_title": task["title"],
+                "task_description": task["description"],
+            }),
+        ])
+
+    async def send_task_notification_email(self, to_email: str, client_name: str, task_title: str, task_description: str) -> None:
+        """Send a task created email; raises so the job is retried"""
+        sent = await self.emailer.send_task_notification_email(to_email, client_name, task_title, "task_created", task_description)
+        if not sent:
+            raise RuntimeError(f"Failed to send task notification email to {to_email}")
+
+    async def send_task_creation_notification(self, task_id: str, client_phone: str, task_title: str, task_description: str) -> None:
+        """Send the task created SMS to the client"""
+        await self.smser.send_task_creation_notification(TaskCreationNotification(
+            task_id=task_id, client_phone=client_phone, task_title=task_title, task_description=task_description
+        ))
+
     async def update_client_post_count(self, client_id: str) -> None:
         """Update client's post count"""
         try:
-            # First get the current count
-            current_result = self.admin_client.table("clients").select("number_of_posts").eq("id", client_id).execute()
-            
-            if not current_result.data:
-                raise HTTPException(status_code=404, detail="Client not found")
-            
-            current_count = current_result.data[0].get("number_of_posts", 0)
-            new_count = current_count + 1
-            
-            # Update client's post count
-            result = self.admin_client.table("clients").update({
-                "number_of_posts": new_count
-            }).eq("id", client_id).execute()
-            
+            # One atomic increment; a read then write loses or repeats counts when jobs race or retry
+            result = await self.admin_client.rpc("increment_post_count", {"user_uuid": client_id}).execute()
             if not result.data:
-                raise HTTPException(
-                    status_code=500, detail="Failed to update client post count"
-                )
+                raise HTTPException(status_code=404, detail="Client not found")
 
             return True
 
@@ -317,7 +376,7 @@ class TaskService:
     async def get_available_tasks(self) -> Optional[PublicTaskResponse]:
         try:
             # query non sensitive information from tasks table
-            result = (
+            result = await (
                 self.admin_client.table("tasks")
                 .select(
                     "id, title, description, location_type, zip_code, hourly_rate, created_at, dates"
@@ -354,16 +413,27 @@ class TaskService:
 
     async def get_zip_codes(self, zip_codes: GetZipCodesRequest) -> Optional[PublicTaskZipCodeResponse]:
         try:
-            # batch query all zip codes from request
-            result = self.admin_client.table("zip_codes").select("*").in_("zip_code", zip_codes.zip_codes).execute()
-            if not result.data:
+            # Serve from the in-memory table; only zips it does not know go to the database.
+            # Each zip is answered once, however often it was requested.
+            rows = []
+            missing = []
+            for zip_code in dict.fromkeys(zip_codes.zip_codes):
+                row = self.zip_code_index.get(zip_code)
+                if row is None:
+                    missing.append(zip_code)
+                else:
+                    rows.append(row)
+            if missing:
+                result = await self.admin_client.table("zip_codes").select("*").in_("zip_code", missing).execute()
+                rows.extend(result.data or [])
+            if not rows:
                 return PublicTaskZipCodeResponse(
                     result=[],
                     limit=len(zip_codes.zip_codes),
                     total_count=0,
                 )
 
-            zip_codes = [PublicTaskZipCode(**zip_code) for zip_code in result.data]
+            zip_codes = [PublicTaskZipCode(**zip_code) for zip_code in rows]
             response = PublicTaskZipCodeResponse(result=zip_codes)
 
             return response
@@ -387,16 +457,17 @@ class TaskService:
             task_payload = json.loads(event.data.object.metadata.task_data)
             task_payload["client_id"] = client_id
   
-            result = self.admin_client.table("tasks").insert(task_payload).execute()
+            result = await self.admin_client.table("tasks").insert(task_payload).execute()
         
             if not result.data:
                 raise HTTPException(status_code=500, detail="Failed to create task")
 
-            # Update client's post count (fire and forget)
-            asyncio.create_task(self.update_client_post_count(client_id))
-            asyncio.create_task(self.emailer.send_task_notification_email(client.data[0]["email"], client.data[0]["first_name"], result.data[0]["title"], "task_created", result.data[0]["description"]))
-            asyncio.create_task(self.emailer.send_task_notification_email(settings.EMAIL_SENDER, client.data[0]["first_name"], result.data[0]["title"], "task_created", result.data[0]["description"]))
-            asyncio.create_task(self.smser.send_task_creation_notification(TaskCreationNotification(task_id=result.data[0]["id"], client_phone=client.data[0]["phone"], task_title=result.data[0]["title"], task_description=result.data[0]["description"])))
+            client = await self.admin_client.table("clients").select(CLIENT_COLUMNS).eq("id", client_id).execute()
+            if not client.data:
+                raise HTTPException(status_code=404, detail="Client not found")
+
+            # Update client's post count and notify people in the background
+            await self._enqueue_task_created(client.data[0], result.data[0])
             # Return the created task
             created_task = result.data[0]
             return TaskResponse(**created_task)
@@ -0,0 +1,191 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import httpx
+import jwt
+
+from app.core.config import settings
+from app.schemas.auth import CurrentUser
+
+logger = logging.getLogger(__name__)
+
+
+class TokenVerificationError(Exception):
+    """Raised when a token is present but invalid, expired or signed with an unknown key"""
+
+
+class LocalVerificationUnavailable(Exception):
+    """Raised when no key material is configured for the token's algorithm"""
+
+
+class TokenVerifier:
+    """Verifies Supabase access tokens locally and caches the decoded users.
+
+    HS256 tokens are checked against SUPABASE_JWT_SECRET; asymmetric tokens
+    (ES256/RS256) are checked against the project's JWKS, which is cached and
+    refreshed in the background.
+    """
+
+    AUDIENCE = "authenticated"
+    ASYMMETRIC_ALGORITHMS = ("ES256", "RS256")
+
+    def __init__(
+        self,
+        supabase_url: str,
+        jwt_secret: Optional[str] = None,
+        jwks_refresh_seconds: int = 600,
+        user_cache_ttl_seconds: int = 60,
+        user_cache_size: int = 10_000,
+    ):
+        self.issuer = f"{supabase_url.rstrip('/')}/auth/v1"
+        self.jwks_url = f"{self.issuer}/.well-known/jwks.json"
+        self.jwt_secret = jwt_secret
+        self.jwks_refresh_seconds = jwks_refresh_seconds
+        self.user_cache_ttl_seconds = user_cache_ttl_seconds
+        self.user_cache_size = user_cache_size
+
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._keys_fetched_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        # token sha256 -> (expires_at monotonic, user)
+        self._users: "OrderedDict[str, Tuple[float, CurrentUser]]" = OrderedDict()
+
+    @staticmethod
+    def _token_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get_cached_user(self, token: str) -> Optional[CurrentUser]:
+        """Return a cached user for this token if it has not expired"""
+        key = self._token_key(token)
+        entry = self._users.get(key)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del self._users[key]
+            return None
+        self._users.move_to_end(key)
+        return user
+
+    def cache_user(self, token: str, user: CurrentUser, token_exp: Optional[float] = None) -> None:
+        """Cache a user for the configured TTL, never past the token's own expiry"""
+        ttl = self.user_cache_ttl_seconds
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+        if ttl <= 0:
+            return
+        key = self._token_key(token)
+        self._users[key] = (time.monotonic() + ttl, user)
+        self._users.move_to_end(key)
+        while len(self._users) > self.user_cache_size:
+            self._users.popitem(last=False)
+
+    async def refresh_jwks(self) -> None:
+        """Fetch the project's signing keys"""
+        async with self._refresh_lock:
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.get(
+                    self.jwks_url, headers={"apikey": settings.SUPABASE_ANON_KEY}
+                )
+                response.raise_for_status()
+            keys = {}
+            for jwk in response.json().get("keys", []):
+                try:
+                    keys[jwk["kid"]] = jwt.PyJWK(jwk)
+                except (KeyError, jwt.PyJWTError) as e:
+                    logger.warning(f"Skipping unusable JWK: {e}")
+            self._keys = keys
+            self._keys_fetched_at = time.monotonic()
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            try:
+                await self.refresh_jwks()
+            except Exception as e:
+                logger.error(f"Failed to refresh JWKS: {e}")
+            await asyncio.sleep(self.jwks_refresh_seconds)
+
+    def start(self) -> None:
+        """Start refreshing the JWKS in the background"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_forever())
+
+    async def stop(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _signing_key(self, header: dict):
+        alg = header.get("alg")
+        if alg == "HS256":
+            if not self.jwt_secret:
+                raise LocalVerificationUnavailable("SUPABASE_JWT_SECRET is not configured")
+            return self.jwt_secret
+        if alg not in self.ASYMMETRIC_ALGORITHMS:
+            raise TokenVerificationError(f"Unsupported token algorithm: {alg}")
+
+        kid = header.get("kid")
+        key = self._keys.get(kid)
+        # An unknown kid usually means the keys rotated; refetch at most once a minute
+        if key is None and time.monotonic() - self._keys_fetched_at > 60:
+            try:
+                await self.refresh_jwks()
+            except Exception as e:
+                raise LocalVerificationUnavailable(f"JWKS unavailable: {e}")
+            key = self._keys.get(kid)
+        if key is None:
+            raise TokenVerificationError("Token signed with an unknown key")
+        return key.key
+
+    async def verify(self, token: str) -> CurrentUser:
+        """Verify a token locally, serving repeat tokens from the user cache"""
+        cached = self.get_cached_user(token)
+        if cached is not None:
+            return cached
+
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(str(e))
+
+        key = await self._signing_key(header)
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[header["alg"]],
+                audience=self.AUDIENCE,
+                issuer=self.issuer,
+                options={"require": ["exp", "sub"]},
+            )
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(str(e))
+
+        # Confirmation and creation timestamps are not carried in access tokens
+        user = CurrentUser(
+            id=claims["sub"],
+            email=claims.get("email") or None,
+            phone=claims.get("phone") or None,
+        )
+        self.cache_user(token, user, claims["exp"])
+        return user
+
+
+@lru_cache(maxsize=1)
+def get_token_verifier() -> TokenVerifier:
+    return TokenVerifier(
+        settings.SUPABASE_URL,
+        jwt_secret=settings.SUPABASE_JWT_SECRET,
+        jwks_refresh_seconds=settings.SUPABASE_JWKS_REFRESH_SECONDS,
+        user_cache_ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+    )
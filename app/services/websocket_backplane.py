@@ -0,0 +1,241 @@
+import asyncio
+import json
+import logging
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Called with (chat_id, frame) for every event published by another node
+Deliver = Callable[[str, str], Awaitable[None]]
+
+
+class Backplane:
+    """Carries WebSocket broadcasts between app processes.
+
+    Each WebSocketManager delivers to its own sockets directly and publishes
+    the same frame here; the backplane hands it to every other node, which
+    delivers it to the sockets it holds for that chat.
+    """
+
+    def __init__(self):
+        self.node_id = uuid.uuid4().hex
+        self._seq = 0
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+    async def publish(self, chat_id, frame: str) -> None:
+        raise NotImplementedError
+
+    async def publish_many(self, events: List[Tuple[object, str]]) -> None:
+        """Publish (chat_id, frame) pairs in order; backends may batch them"""
+        for chat_id, frame in events:
+            await self.publish(chat_id, frame)
+
+    def _encode(self, chat_id, frame: str) -> str:
+        # The sequence number keeps identical frames distinct (NOTIFY folds duplicates)
+        self._seq += 1
+        return json.dumps(
+            {"origin": self.node_id, "seq": self._seq, "chat_id": str(chat_id), "frame": frame}
+        )
+
+    async def _receive(self, raw: str) -> None:
+        try:
+            event = json.loads(raw)
+            if event["origin"] == self.node_id or self._deliver is None:
+                return
+            await self._deliver(event["chat_id"], event["frame"])
+        except Exception as e:
+            logger.error(f"Dropped backplane event: {e}")
+
+
+class InMemoryBackplane(Backplane):
+    """Backplane between managers in one process.
+
+    With a single manager (the default, one worker) publishing is a no-op.
+    Managers built with the same ``peers`` list see each other's broadcasts.
+    """
+
+    def __init__(self, peers: Optional[List["InMemoryBackplane"]] = None):
+        super().__init__()
+        self._peers = peers if peers is not None else []
+
+    async def start(self, deliver: Deliver) -> None:
+        await super().start(deliver)
+        if self not in self._peers:
+            self._peers.append(self)
+
+    async def stop(self) -> None:
+        if self in self._peers:
+            self._peers.remove(self)
+        await super().stop()
+
+    async def publish(self, chat_id, frame: str) -> None:
+        raw = self._encode(chat_id, frame)
+        for peer in list(self._peers):
+            if peer is not self:
+                await peer._receive(raw)
+
+
+class PostgresBackplane(Backplane):
+    """Backplane over Postgres LISTEN/NOTIFY.
+
+    Needs a direct (or session-mode pooled) connection string; transaction-mode
+    poolers do not deliver notifications. NOTIFY rejects payloads of 8000 bytes
+    or more, which a long chat message or a large read receipt can reach; such
+    events are split into parts that subscribers reassemble, and published in
+    a statement of their own so a failure cannot take the rest of a batch down.
+    """
+
+    # Postgres' limit is payloads shorter than 8000 bytes
+    MAX_PAYLOAD_BYTES = 7999
+    # Incomplete split events kept per listener; older ones are dropped
+    MAX_PENDING_PARTS = 256
+
+    def __init__(self, dsn: str, channel: str = "chat_events", reconnect_seconds: float = 1.0):
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_seconds = reconnect_seconds
+        self._publisher = None
+        self._publish_lock = asyncio.Lock()
+        self._listener: Optional[asyncio.Task] = None
+        self.listening = asyncio.Event()
+        # (origin, seq) -> parts received so far, for events split across notifications
+        self._pending: "OrderedDict[Tuple[str, int], Dict[int, str]]" = OrderedDict()
+
+    async def start(self, deliver: Deliver) -> None:
+        await super().start(deliver)
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._publisher is not None:
+            await self._publisher.close()
+            self._publisher = None
+        await super().stop()
+
+    async def _listen(self) -> None:
+        import psycopg
+        from psycopg import sql
+
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self.dsn, autocommit=True) as conn:
+                    await conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+                    self.listening.set()
+                    async for notify in conn.notifies():
+                        await self._receive(notify.payload)
+                        # Buffered notifications arrive without suspending; let socket writers run
+                        await asyncio.sleep(0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Backplane listener disconnected: {e}")
+            self.listening.clear()
+            # Parts still missing were lost with the connection
+            self._pending.clear()
+            await asyncio.sleep(self.reconnect_seconds)
+
+    def _split(self, raw: str) -> List[str]:
+        """``raw`` as NOTIFY payloads, each under MAX_PAYLOAD_BYTES"""
+        if len(raw.encode()) <= self.MAX_PAYLOAD_BYTES:
+            return [raw]
+        event = json.loads(raw)
+        header = {"origin": event["origin"], "seq": event["seq"], "part": 0, "parts": 0}
+        # json.dumps output is ASCII, and re-encoding a slice of it at most
+        # doubles it (only quotes and backslashes are escaped again)
+        overhead = len(json.dumps({**header, "data": ""})) + 16
+        size = (self.MAX_PAYLOAD_BYTES - overhead) // 2
+        slices = [raw[i:i + size] for i in range(0, len(raw), size)]
+        return [
+            json.dumps({**header, "part": n, "parts": len(slices), "data": data})
+            for n, data in enumerate(slices)
+        ]
+
+    async def _receive(self, raw: str) -> None:
+        try:
+            event = json.loads(raw)
+            if "parts" not in event:
+                await super()._receive(raw)
+                return
+            if event["origin"] == self.node_id:
+                return
+            key = (event["origin"], event["seq"])
+            parts = self._pending.setdefault(key, {})
+            parts[event["part"]] = event["data"]
+            if len(parts) < event["parts"]:
+                while len(self._pending) > self.MAX_PENDING_PARTS:
+                    self._pending.popitem(last=False)
+                return
+            del self._pending[key]
+            raw = "".join(parts[n] for n in range(event["parts"]))
+        except Exception as e:
+            logger.error(f"Dropped backplane event part: {e}")
+            return
+        await super()._receive(raw)
+
+    async def publish(self, chat_id, frame: str) -> None:
+        await self.publish_many([(chat_id, frame)])
+
+    async def publish_many(self, events: List[Tuple[object, str]]) -> None:
+        """One round trip for the batch, plus one per event too large for a single NOTIFY.
+
+        Events keep their order. A split event that fails to publish is logged
+        and skipped so the events after it still go out.
+        """
+        batch: List[str] = []
+        async with self._publish_lock:
+            for chat_id, frame in events:
+                payloads = self._split(self._encode(chat_id, frame))
+                if len(payloads) == 1:
+                    batch.extend(payloads)
+                    continue
+                if batch:
+                    await self._notify(batch)
+                    batch = []
+                try:
+                    await self._notify(payloads)
+                except Exception as e:
+                    logger.error(f"Dropped oversized backplane event for chat {chat_id}: {e}")
+            if batch:
+                await self._notify(batch)
+
+    async def _notify(self, payloads: List[str]) -> None:
+        import psycopg
+
+        if self._publisher is None or self._publisher.closed:
+            self._publisher = await psycopg.AsyncConnection.connect(self.dsn, autocommit=True)
+        try:
+            # One statement, so the parts of a split event are delivered together and in order
+            await self._publisher.execute(
+                "SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) WITH ORDINALITY AS p(payload, n)"
+                " ORDER BY n",
+                (self.channel, payloads),
+            )
+        except psycopg.OperationalError:
+            # Reconnect on the next publish
+            await self._publisher.close()
+            raise
+
+
+def create_backplane(url: Optional[str]) -> Backplane:
+    """Backplane for a WEBSOCKET_BACKPLANE_URL setting; in-process when unset"""
+    if not url:
+        return InMemoryBackplane()
+    if url.startswith(("postgres://", "postgresql://")):
+        return PostgresBackplane(url)
+    raise ValueError(f"Unsupported WebSocket backplane URL scheme: {url.split(':', 1)[0]}")
@@ -1,86 +1,278 @@
-from typing import Dict, Set
+import asyncio
+import json
+import time
+from typing import Dict, Optional, Set, Tuple
 from uuid import UUID
-from fastapi import WebSocket
+from fastapi import WebSocket, status
 from app.schemas.chat import WebSocketChatMessage, WebSocketReadReceipt
+from app.services.websocket_backplane import Backplane, InMemoryBackplane
+
+
+# Backplane key for presence events; chat keys are UUIDs, so it cannot clash
+PRESENCE_KEY = "presence"
+
+
+class _Outbox:
+    """Bounded queue of frames for one socket and the task writing them out"""
+
+    def __init__(self, chat_id: UUID, max_size: int, user_id: Optional[str] = None):
+        self.chat_id = chat_id
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.writer: Optional[asyncio.Task] = None
 
 
 class WebSocketManager:
-    """Manages WebSocket connections for real-time chat communication"""
-    
-    def __init__(self):
+    """Manages WebSocket connections for real-time chat communication
+
+    Broadcasts never wait on a socket: each connection has a bounded outbox
+    drained by its own writer task, and a connection whose outbox overflows or
+    whose send stalls past ``send_timeout`` is closed so the client reconnects.
+
+    Authenticated connections also count toward presence: which users have a
+    chat open on any node. Nodes announce joins and leaves over the backplane
+    and heartbeat every ``presence_heartbeat`` seconds; a node that misses
+    three heartbeats is treated as gone, so a crash cannot leave users
+    looking online.
+    """
+
+    def __init__(
+        self,
+        backplane: Optional[Backplane] = None,
+        send_queue_size: int = 100,
+        send_timeout: float = 10.0,
+        presence_heartbeat: float = 15.0,
+    ):
         # Map chat_id to set of connected WebSocket connections
         self.chat_connections: Dict[UUID, Set[WebSocket]] = {}
-    
-    async def connect(self, websocket: WebSocket, chat_id: UUID):
-        """Connect a WebSocket to a specific chat"""
+        # Fans broadcasts out to managers in other workers / nodes
+        self.backplane = backplane or InMemoryBackplane()
+        self.send_queue_size = send_queue_size
+        self.send_timeout = send_timeout
+        self._outboxes: Dict[WebSocket, _Outbox] = {}
+        self._publish_queue: asyncio.Queue = asyncio.Queue(maxsize=send_queue_size * 10)
+        self._publisher: Optional[asyncio.Task] = None
+        self._closing: Set[asyncio.Task] = set()
+        self.presence_heartbeat = presence_heartbeat
+        # chat_id -> {user_id: open sockets on this node}
+        self._presence: Dict[UUID, Dict[str, int]] = {}
+        # node_id -> (expires_at monotonic, {(chat_id, user_id)}) for other nodes
+        self._remote_presence: Dict[str, Tuple[float, Set[Tuple[str, str]]]] = {}
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    async def start(self):
+        await self.backplane.start(self._deliver_remote)
+        self._publisher = asyncio.create_task(self._publish_loop())
+        self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+        # Ask the other nodes to re-announce who they hold
+        self._publish_presence("hello")
+
+    async def stop(self):
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        if self._publisher is not None:
+            self._publisher.cancel()
+            self._publisher = None
+            try:
+                await self.backplane.publish(PRESENCE_KEY, self._presence_event("bye"))
+            except Exception as e:
+                print(f"Failed to announce WebSocket node shutdown: {str(e)}")
+        for outbox in self._outboxes.values():
+            outbox.writer.cancel()
+        self._outboxes.clear()
+        self.chat_connections.clear()
+        self._presence.clear()
+        self._remote_presence.clear()
+        await self.backplane.stop()
+
+    async def connect(self, websocket: WebSocket, chat_id: UUID, user_id: Optional[str] = None):
+        """Connect a WebSocket to a specific chat; with a user_id it counts toward presence"""
         if chat_id not in self.chat_connections:
             self.chat_connections[chat_id] = set()
-        
+
         self.chat_connections[chat_id].add(websocket)
+        outbox = _Outbox(chat_id, self.send_queue_size, str(user_id) if user_id else None)
+        outbox.writer = asyncio.create_task(self._write(websocket, outbox))
+        self._outboxes[websocket] = outbox
+        if outbox.user_id:
+            users = self._presence.setdefault(chat_id, {})
+            users[outbox.user_id] = users.get(outbox.user_id, 0) + 1
+            if users[outbox.user_id] == 1:
+                self._publish_presence("join", chat_id, outbox.user_id)
         print(f"WebSocket connected to chat {chat_id}. Total connections: {len(self.chat_connections[chat_id])}")
-    
+
     async def disconnect(self, websocket: WebSocket, chat_id: UUID):
         """Disconnect a WebSocket from a chat"""
+        self._remove(websocket, chat_id)
+
+    def _remove(self, websocket: WebSocket, chat_id: UUID):
+        outbox = self._outboxes.pop(websocket, None)
+        if outbox is not None and outbox.writer is not asyncio.current_task():
+            outbox.writer.cancel()
+        if outbox is not None and outbox.user_id:
+            users = self._presence.get(chat_id, {})
+            users[outbox.user_id] = users.get(outbox.user_id, 1) - 1
+            if users[outbox.user_id] <= 0:
+                del users[outbox.user_id]
+                self._publish_presence("leave", chat_id, outbox.user_id)
+            if not users:
+                self._presence.pop(chat_id, None)
+
         if chat_id in self.chat_connections:
             self.chat_connections[chat_id].discard(websocket)
-            
+
             # Remove empty chat connections
             if not self.chat_connections[chat_id]:
                 del self.chat_connections[chat_id]
-            
+
             print(f"WebSocket disconnected from chat {chat_id}")
-    
-    async def broadcast_chat_message(self, chat_id: UUID, message: WebSocketChatMessage):
-        """Broadcast a chat message to all connected WebSocket clients in a chat"""
-        if chat_id not in self.chat_connections:
-            return
-        
-        # Convert message to JSON string
-        message_json = message.model_dump_json()
-        
-        # Send to all connected clients in this chat
-        disconnected_websockets = set()
-        
-        for websocket in self.chat_connections[chat_id]:
+
+    def _evict(self, websocket: WebSocket, chat_id: UUID, reason: str):
+        """Drop a connection that cannot keep up and close it in the background"""
+        print(f"Evicting WebSocket from chat {chat_id}: {reason}")
+        self._remove(websocket, chat_id)
+        task = asyncio.create_task(self._close(websocket, reason))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close(self, websocket: WebSocket, reason: str):
+        try:
+            await asyncio.wait_for(
+                websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason=reason),
+                self.send_timeout,
+            )
+        except Exception:
+            # Already closed or the transport is gone
+            pass
+
+    async def _write(self, websocket: WebSocket, outbox: _Outbox):
+        while True:
+            frame = await outbox.queue.get()
             try:
-                await websocket.send_text(message_json)
+                async with asyncio.timeout(self.send_timeout):
+                    await websocket.send_text(frame)
+            except asyncio.TimeoutError:
+                self._evict(websocket, outbox.chat_id, "send timed out")
+                return
             except Exception as e:
-                print(f"Failed to send message to WebSocket: {str(e)}")
-                disconnected_websockets.add(websocket)
-        
-        # Clean up disconnected WebSockets
-        for websocket in disconnected_websockets:
-            await self.disconnect(websocket, chat_id)
-    
+                print(f"Failed to send to WebSocket: {str(e)}")
+                self._remove(websocket, outbox.chat_id)
+                return
+
+    async def broadcast_chat_message(self, chat_id: UUID, message: WebSocketChatMessage):
+        """Broadcast a chat message to all connected WebSocket clients in a chat"""
+        self._broadcast(chat_id, message.model_dump_json())
+
     async def broadcast_read_receipt(self, chat_id: UUID, read_receipt: WebSocketReadReceipt):
         """Broadcast a read receipt to all connected WebSocket clients in a chat"""
-        if chat_id not in self.chat_connections:
+        self._broadcast(chat_id, read_receipt.model_dump_json())
+
+    def _broadcast(self, chat_id: UUID, frame: str):
+        """Queue for this process's sockets and for the other processes'; never waits"""
+        self._send_local(chat_id, frame)
+        if self._publisher is None:
             return
-        
-        # Convert read receipt to JSON string
-        receipt_json = read_receipt.model_dump_json()
-        
-        # Send to all connected clients in this chat
-        disconnected_websockets = set()
-        
-        for websocket in self.chat_connections[chat_id]:
+        try:
+            self._publish_queue.put_nowait((chat_id, frame))
+        except asyncio.QueueFull:
+            print(f"WebSocket backplane backlog full, dropped frame for chat {chat_id}")
+
+    async def _publish_loop(self):
+        while True:
+            # Publish whatever queued up behind the previous round trip as one batch
+            events = [await self._publish_queue.get()]
+            while len(events) < self.send_queue_size and not self._publish_queue.empty():
+                events.append(self._publish_queue.get_nowait())
             try:
-                await websocket.send_text(receipt_json)
+                await self.backplane.publish_many(events)
             except Exception as e:
-                print(f"Failed to send read receipt to WebSocket: {str(e)}")
-                disconnected_websockets.add(websocket)
-        
-        # Clean up disconnected WebSockets
-        for websocket in disconnected_websockets:
-            await self.disconnect(websocket, chat_id)
-    
+                print(f"Failed to publish {len(events)} frames to WebSocket backplane: {str(e)}")
+
+    async def _deliver_remote(self, chat_id: str, frame: str):
+        if chat_id == PRESENCE_KEY:
+            self._apply_presence(json.loads(frame))
+            return
+        self._send_local(UUID(chat_id), frame)
+
+    def is_online(self, chat_id: UUID, user_id) -> bool:
+        """Whether the user has this chat open over a WebSocket on any node"""
+        return str(user_id) in self.online_users(chat_id)
+
+    def online_users(self, chat_id: UUID) -> Set[str]:
+        """Users with this chat open over a WebSocket on any node"""
+        users = set(self._presence.get(chat_id, ()))
+        now = time.monotonic()
+        key = str(chat_id)
+        for expires_at, entries in self._remote_presence.values():
+            if expires_at > now:
+                users.update(user_id for chat, user_id in entries if chat == key)
+        return users
+
+    def _presence_event(self, op: str, chat_id=None, user_id: Optional[str] = None) -> str:
+        return json.dumps({
+            "node": self.backplane.node_id,
+            "op": op,
+            "chat_id": str(chat_id) if chat_id else None,
+            "user_id": user_id,
+        })
+
+    def _publish_presence(self, op: str, chat_id=None, user_id: Optional[str] = None):
+        if self._publisher is None:
+            return
+        try:
+            self._publish_queue.put_nowait((PRESENCE_KEY, self._presence_event(op, chat_id, user_id)))
+        except asyncio.QueueFull:
+            print(f"WebSocket backplane backlog full, dropped presence {op}")
+
+    def _apply_presence(self, event: dict):
+        node, op = event["node"], event["op"]
+        if op == "bye":
+            self._remote_presence.pop(node, None)
+            return
+        if op == "hello":
+            for chat_id, users in self._presence.items():
+                for user_id in users:
+                    self._publish_presence("join", chat_id, user_id)
+            return
+
+        _, entries = self._remote_presence.get(node, (0.0, set()))
+        if op == "join":
+            entries.add((event["chat_id"], event["user_id"]))
+        elif op == "leave":
+            entries.discard((event["chat_id"], event["user_id"]))
+        self._remote_presence[node] = (time.monotonic() + self.presence_heartbeat * 3, entries)
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.presence_heartbeat)
+            self._publish_presence("alive")
+            now = time.monotonic()
+            for node, (expires_at, _) in list(self._remote_presence.items()):
+                if expires_at <= now:
+                    del self._remote_presence[node]
+
+    def _send_local(self, chat_id: UUID, frame: str):
+        for websocket in list(self.chat_connections.get(chat_id, ())):
+            self.send_to(websocket, frame)
+
+    def send_to(self, websocket: WebSocket, frame: str):
+        """Queue a frame for one connection, e.g. an ack; never waits"""
+        outbox = self._outboxes.get(websocket)
+        if outbox is None:
+            return
+        try:
+            outbox.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self._evict(websocket, outbox.chat_id, "too slow to keep up")
+
     def get_connection_count(self, chat_id: UUID = None) -> int:
         """Get the number of active connections for a chat or total"""
         if chat_id:
             return len(self.chat_connections.get(chat_id, set()))
         else:
             return sum(len(connections) for connections in self.chat_connections.values())
-    
+
     def get_active_chats(self) -> list:
         """Get list of active chat IDs"""
         return list(self.chat_connections.keys())
@@ -0,0 +1,86 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from supabase import AClient
+
+logger = logging.getLogger(__name__)
+
+# Same radius as public.calculate_distance, so distances agree with the database
+EARTH_RADIUS_MILES = 3959.0
+
+
+def haversine_miles(
+    origin_lat: float, origin_lng: float, lats: np.ndarray, lngs: np.ndarray
+) -> np.ndarray:
+    """Distances in miles from one point to arrays of points"""
+    lat1 = np.radians(origin_lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlng = np.radians(lngs) - np.radians(origin_lng)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class ZipCodeIndex:
+    """In-memory copy of the zip_codes table.
+
+    The table is static reference data, so it is loaded once at startup into
+    parallel arrays and looked up by position. Radius queries run over the
+    arrays instead of going to the database.
+    """
+
+    def __init__(self, rows: Iterable[dict] = ()):
+        self._replace(list(rows))
+
+    def _replace(self, rows: List[dict]) -> None:
+        self.zip_codes = np.array([row["zip_code"] for row in rows], dtype=object)
+        self.cities = [row["city"] for row in rows]
+        self.states = [row["state"] for row in rows]
+        self.lats = np.array([float(row["lat"]) for row in rows], dtype=np.float64)
+        self.lngs = np.array([float(row["lng"]) for row in rows], dtype=np.float64)
+        self._positions: Dict[str, int] = {zip_code: i for i, zip_code in enumerate(self.zip_codes)}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, zip_code: str) -> bool:
+        return zip_code in self._positions
+
+    async def load(self, admin_client: AClient, page_size: int = 1000) -> None:
+        """Replace the contents with the zip_codes table, read a page at a time"""
+        rows: List[dict] = []
+        start = 0
+        while True:
+            result = await admin_client.table("zip_codes").select(
+                "zip_code, city, state, lat, lng"
+            ).order("zip_code").range(start, start + page_size - 1).execute()
+            rows.extend(result.data)
+            if len(result.data) < page_size:
+                break
+            start += page_size
+        self._replace(rows)
+        logger.info(f"Loaded {len(rows)} zip codes")
+
+    def get(self, zip_code: str) -> Optional[dict]:
+        """The zip_codes row for a zip, or None if it is unknown"""
+        i = self._positions.get(zip_code)
+        if i is None:
+            return None
+        return {
+            "zip_code": zip_code,
+            "city": self.cities[i],
+            "state": self.states[i],
+            "lat": float(self.lats[i]),
+            "lng": float(self.lngs[i]),
+        }
+
+    def within_radius(self, origin_zip: str, radius_miles: float) -> List[Tuple[str, float]]:
+        """(zip, miles) for every zip within radius_miles of origin_zip, nearest first"""
+        origin = self._positions.get(origin_zip)
+        if origin is None:
+            return []
+        distances = haversine_miles(self.lats[origin], self.lngs[origin], self.lats, self.lngs)
+        nearby = np.flatnonzero(distances <= radius_miles)
+        nearby = nearby[np.argsort(distances[nearby], kind="stable")]
+        return [(self.zip_codes[i], float(distances[i])) for i in nearby]
@@ -1,5 +1,5 @@
 
-import smtplib
+import asyncio
 import logging
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -7,6 +7,7 @@ from email.mime.base import MIMEBase
 from email import encoders
 from typing import Optional, List
 from app.core.config import settings
+from app.services.smtp_pool import SMTPPool, get_smtp_pool
 
 logger = logging.getLogger(__name__)
 
@@ -14,14 +15,12 @@ logger = logging.getLogger(__name__)
 class EmailUtils:
     """Service for sending emails"""
     
-    def __init__(self):
+    def __init__(self, pool: Optional[SMTPPool] = None):
         self.sender = settings.EMAIL_SENDER
-        self.password = settings.EMAIL_PASSWORD
-        self.server = settings.SMTP_SERVER
-        self.port = settings.SMTP_PORT
+        self.pool = pool or get_smtp_pool()
     
 
-    def send_email(
+    async def send_email(
         self,
         to_email: str, 
         subject: str, 
@@ -32,7 +31,7 @@ class EmailUtils:
         attachments: Optional[List[str]] = None
     ) -> bool:
         """
-        Send email via Gmail SMTP
+        Send email via Gmail SMTP over a pooled, authenticated session
         
         Args:
             to_email: Recipient email address
@@ -83,11 +82,6 @@ class EmailUtils:
                         logger.error(f"Failed to attach file {file_path}: {e}")
                         continue
             
-            # Create SMTP session
-            server = smtplib.SMTP(self.server, self.port)
-            server.starttls()  # Enable security
-            server.login(self.sender, self.password)
-            
             # Prepare recipient list
             recipients = [to_email]
             if cc_emails:
@@ -96,9 +90,7 @@ class EmailUtils:
                 recipients.extend(bcc_emails)
             
             # Send email
-            text = msg.as_string()
-            server.sendmail(self.sender, recipients, text)
-            server.quit()
+            await self.pool.send_message(msg, self.sender, recipients)
             
             logger.info(f"Email sent successfully to {to_email}")
             return True
@@ -147,13 +139,6 @@ class EmailUtils:
     This email was sent from the HelperU contact form.
             """
             
-            # Send to team
-            team_success = self.send_email(
-                to_email=self.sender,
-                subject=team_subject,
-                body=team_body.strip()
-            )
-            
             # Confirmation email to user
             user_subject = "Thank you for contacting HelperU"
             user_body = f"""
@@ -174,11 +159,18 @@ class EmailUtils:
     This is an automated response. Please do not reply to this email.
             """
             
-            # Send confirmation to user
-            user_success = self.send_email(
-                to_email=email,
-                subject=user_subject,
-                body=user_body.strip()
+            # Send to team and confirmation to user over the pooled sessions
+            team_success, user_success = await asyncio.gather(
+                self.send_email(
+                    to_email=self.sender,
+                    subject=team_subject,
+                    body=team_body.strip()
+                ),
+                self.send_email(
+                    to_email=email,
+                    subject=user_subject,
+                    body=user_body.strip()
+                ),
             )
             
             return team_success and user_success
@@ -238,7 +230,7 @@ class EmailUtils:
     The HelperU Team
                 """
             
-            return self.send_email(
+            return await self.send_email(
                 to_email=email,
                 subject=subject,
                 body=body.strip()
@@ -331,7 +323,7 @@ Best regards,
 The HelperU Team"""
                 
             
-            return self.send_email(
+            return await self.send_email(
                 to_email=email,
                 subject=subject,
                 body=body.strip()
@@ -0,0 +1,73 @@
+import base64
+import json
+from typing import Any, Dict, Optional
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor is malformed or was issued for another sort mode"""
+
+
+def encode_cursor(sort_by: str, key: Dict[str, Any]) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    payload = json.dumps({"s": sort_by, "k": key}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str) -> Dict[str, Any]:
+    """Decode a cursor produced by encode_cursor for the same sort mode"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key = payload["k"]
+        cursor_sort = payload["s"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}")
+    if cursor_sort != sort_by or not isinstance(key, dict):
+        raise InvalidCursorError("Cursor does not match the requested sort order")
+    return key
+
+
+def task_distance_bucket(task: Dict[str, Any]) -> int:
+    """Mirror of the sort_bucket used by get_tasks_with_distance"""
+    if task.get("location_type") == "remote" or task.get("zip_code") is None:
+        return 0
+    if task.get("distance") is not None:
+        return 1
+    return 2
+
+
+def task_search_cursor(
+    sort_by: str, last_task: Dict[str, Any], reference_time: Optional[str] = None
+) -> Optional[str]:
+    """Build the cursor that resumes a task search after last_task"""
+    if sort_by == "relevance":
+        key = {
+            "relevance": last_task["relevance"],
+            "id": last_task["id"],
+            "reference_time": reference_time,
+        }
+        return encode_cursor(sort_by, key)
+    key = {"created_at": last_task["created_at"], "id": last_task["id"]}
+    if sort_by == "distance":
+        key["bucket"] = task_distance_bucket(last_task)
+        key["distance"] = last_task.get("distance")
+    return encode_cursor(sort_by, key)
+
+
+def task_search_cursor_params(sort_by: str, cursor: str) -> Dict[str, Any]:
+    """Translate a task search cursor into the RPC's cursor_* arguments"""
+    key = decode_cursor(cursor, sort_by)
+    try:
+        if sort_by == "relevance":
+            return {
+                "cursor_relevance": key["relevance"],
+                "cursor_id": key["id"],
+                "rank_reference_time": key["reference_time"],
+            }
+        params = {"cursor_created_at": key["created_at"], "cursor_id": key["id"]}
+        if sort_by == "distance":
+            params["cursor_bucket"] = int(key["bucket"])
+            params["cursor_distance"] = key.get("distance")
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}")
+    return params
@@ -0,0 +1,54 @@
+import types
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+
+def _nested_model(annotation) -> Optional[Type[BaseModel]]:
+    """The model inside ``Model``, ``Optional[Model]`` or ``List[Model]``, if any"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    if get_origin(annotation) in (Union, types.UnionType, list, tuple):
+        for arg in get_args(annotation):
+            model = _nested_model(arg)
+            if model is not None:
+                return model
+    return None
+
+
+@lru_cache(maxsize=None)
+def _select(model: Type[BaseModel], exclude: frozenset, relations: Tuple[Tuple[str, str], ...]) -> str:
+    targets = dict(relations)
+    columns = []
+    for name, field in model.model_fields.items():
+        column = field.alias or name
+        if name in exclude or column in exclude:
+            continue
+        nested = _nested_model(field.annotation)
+        if nested is None:
+            columns.append(column)
+            continue
+        # Dotted keys ("client.subscription") configure relations of the embedded model
+        inner = tuple((key.split(".", 1)[1], target) for key, target in relations if key.startswith(f"{name}."))
+        target = targets.get(name, column)
+        embed = f"{column}:{target}" if target != column else column
+        columns.append(f"{embed}({_select(nested, frozenset(), inner)})")
+    return ",".join(columns)
+
+
+def select_columns(
+    model: Type[BaseModel],
+    exclude: Iterable[str] = (),
+    relations: Optional[Dict[str, str]] = None,
+) -> str:
+    """PostgREST select list for the fields ``model`` reads, instead of ``*``.
+
+    Fields holding another model (or an optional/list of one) become embedded
+    resources with their own column list. ``relations`` maps such a field to
+    what PostgREST should embed, usually the foreign key column, e.g.
+    ``select_columns(TaskResponse, relations={"client": "client_id"})`` gives
+    ``id,...,client:client_id(id,first_name,...)``. Without a mapping the
+    field name is used as the table. Every other field must be a column.
+    """
+    return _select(model, frozenset(exclude), tuple(sorted((relations or {}).items())))
@@ -1,8 +1,10 @@
-import requests
+import asyncio
+import httpx
 import logging
-from typing import List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional
 from fastapi import HTTPException, status
 from app.core.config import settings
+from app.services.openphone_client import RETRY_ERRORS, OpenPhoneClient, get_openphone_client
 from app.schemas.sms import (
     OpenPhoneMessageResponse,
     OpenPhoneMessageStatus,
@@ -17,20 +19,27 @@ from app.schemas.sms import (
     WelcomeMessageNotification,
     BulkNotificationRequest,
     BulkNotificationResponse,
+    BulkChunkResult,
     InvitationNotification
 )
 
 logger = logging.getLogger(__name__)
 
+
+class SMSDeliveryUnknown(HTTPException):
+    """A send that failed after OpenPhone may already have accepted the message (5xx, timeout)"""
+
+
 class SMSUtils:
     """Service for sending SMS notifications"""
     
-    def __init__(self):
+    def __init__(self, client: Optional[OpenPhoneClient] = None):
         self.from_number = settings.OPENPHONE_FROM_NUMBER
-        self.api_key = settings.OPENPHONE_API_KEY
-        self.base_url = "https://api.openphone.com/v1"
         if not self.from_number:
             raise ValueError("OPENPHONE_FROM_NUMBER is required")
+        self.client = client or get_openphone_client()
+        self.bulk_chunk_size = settings.OPENPHONE_BULK_CHUNK_SIZE
+        self.bulk_concurrency = settings.OPENPHONE_BULK_CONCURRENCY
     
     def _format_phone_number(self, phone: str) -> str:
         """Format phone number for OpenPhone API"""
@@ -43,7 +52,7 @@ class SMSUtils:
             
         return cleaned
     
-    def _send_sms(self, to_numbers: List[str], content: str, user_id: Optional[str] = None) -> OpenPhoneMessageResponse:
+    async def _send_sms(self, to_numbers: List[str], content: str, user_id: Optional[str] = None) -> OpenPhoneMessageResponse:
         """Send SMS via OpenPhone API"""
         try:
             # Format phone numbers
@@ -60,15 +69,7 @@ class SMSUtils:
                 payload["userId"] = user_id
             
             # Send request
-            response = requests.post(
-                f"{self.base_url}/messages",
-                headers={
-                    "Authorization": self.api_key,  # No "Bearer" prefix
-                    "Content-Type": "application/json"
-                },
-                json=payload,
-                timeout=30
-            )
+            response = await self.client.send_message(payload)
             
             if response.status_code in [200, 201, 202]:
                 result = response.json().get("data")
@@ -80,20 +81,25 @@ class SMSUtils:
                 )
             else:
                 logger.error(f"OpenPhone API error: {response.status_code} - {response.text}")
-                raise HTTPException(
+                error = SMSDeliveryUnknown if response.status_code >= 500 else HTTPException
+                raise error(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail=f"Failed to send SMS: {response.text}"
                 )
                 
-        except requests.exceptions.RequestException as e:
+        except HTTPException:
+            raise
+        except httpx.HTTPError as e:
             logger.error(f"OpenPhone API request failed: {str(e)}")
-            raise HTTPException(
+            # Errors other than these were raised after the request went out
+            error = HTTPException if isinstance(e, RETRY_ERRORS) else SMSDeliveryUnknown
+            raise error(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"SMS service unavailable: {str(e)}"
             )
         except Exception as e:
             logger.error(f"Unexpected error sending SMS: {str(e)}")
-            raise HTTPException(
+            raise SMSDeliveryUnknown(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to send SMS: {str(e)}"
             )
@@ -112,7 +118,7 @@ You'll be notified by text message when helpers apply to your task. You can also
 
 View details in the HelperU app or website."""
 
-        return self._send_sms([notification.client_phone], content)
+        return await self._send_sms([notification.client_phone], content)
     
     async def send_application_received_notification(
         self, 
@@ -131,7 +137,7 @@ To view the Helpers contact information, visit the HelperU website, go to my pos
         #     content += f"\nView it here: https://helperu.com/tasks/browse/{notification.task_id}"
 
 
-        return self._send_sms([notification.client_phone], content)
+        return await self._send_sms([notification.client_phone], content)
     
     
 
@@ -140,14 +146,22 @@ To view the Helpers contact information, visit the HelperU website, go to my pos
         self, 
         notification: MessageNotification
     ) -> OpenPhoneMessageResponse:
-        """Send notification when a new message is received"""
-        content = f"""💬 New Message from {notification.sender_name}
+        """Send notification when a new message is received, or a summary of several"""
+        preview = f"{notification.message_preview[:50]}{'...' if len(notification.message_preview) > 50 else ''}"
+        if notification.message_count > 1:
+            content = f"""💬 {notification.message_count} new messages from {notification.sender_name}
+
+Latest: "{preview}"
+
+Reply in the HelperU app to continue the conversation."""
+        else:
+            content = f"""💬 New Message from {notification.sender_name}
 
-"{notification.message_preview[:50]}{'...' if len(notification.message_preview) > 50 else ''}"
+"{preview}"
 
 Reply in the HelperU app to continue the conversation."""
 
-        return self._send_sms([notification.recipient_phone], content)
+        return await self._send_sms([notification.recipient_phone], content)
     
     async def send_invitation_notification(
         self, 
@@ -164,7 +178,7 @@ Visit HelperU or open the app to go view the post they invited you to.
         """
         # if notification.task_id:
         #     content += f"\nView it here: https://helperu.com/tasks/browse/{notification.task_id}"
-        return self._send_sms([notification.helper_phone], content)
+        return await self._send_sms([notification.helper_phone], content)
     
     async def send_welcome_message(
         self, 
@@ -182,36 +196,84 @@ Get started by:
 
 Welcome to the HelperU community! 🚀"""
 
-        return self._send_sms([notification.phone], content)
+        return await self._send_sms([notification.phone], content)
     
+    def chunk_recipients(self, phone_numbers: List[str]) -> List[List[str]]:
+        """Format and de-duplicate numbers, then split them into provider-sized chunks"""
+        recipients = list(dict.fromkeys(self._format_phone_number(phone) for phone in phone_numbers))
+        size = self.bulk_chunk_size
+        return [recipients[i:i + size] for i in range(0, len(recipients), size)]
+
+    async def send_chunk(
+        self, index: int, recipients: List[str], content: str, user_id: Optional[str] = None
+    ) -> BulkChunkResult:
+        """Send one chunk, reporting failure in the result instead of raising"""
+        try:
+            result = await self._send_sms(recipients, content, user_id)
+            return BulkChunkResult(index=index, recipients=recipients, success=True, message_id=result.message_id)
+        except Exception as e:
+            error = e.detail if isinstance(e, HTTPException) else str(e)
+            logger.error(f"Bulk SMS chunk {index} failed: {error}")
+            return BulkChunkResult(
+                index=index,
+                recipients=recipients,
+                success=False,
+                error=error,
+                uncertain=not isinstance(e, HTTPException) or isinstance(e, SMSDeliveryUnknown),
+            )
+
+    async def send_chunks(
+        self,
+        chunks: Dict[int, List[str]],
+        content: str,
+        user_id: Optional[str] = None,
+        on_result: Optional[Callable[[BulkChunkResult], Awaitable[None]]] = None,
+    ) -> List[BulkChunkResult]:
+        """Send {index: recipients} chunks, ``bulk_concurrency`` at a time, in index order.
+
+        The OpenPhone client's rate limit applies to every request, so a large
+        fan-out cannot starve other SMS traffic of more than its share.
+        ``on_result`` is awaited as each chunk finishes.
+        """
+        pending = iter(sorted(chunks.items()))
+        results: List[BulkChunkResult] = []
+
+        async def worker():
+            for index, recipients in pending:
+                result = await self.send_chunk(index, recipients, content, user_id)
+                if on_result is not None:
+                    await on_result(result)
+                results.append(result)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.bulk_concurrency, len(chunks)))))
+        return sorted(results, key=lambda result: result.index)
+
     async def send_bulk_notification(
         self, 
         request: BulkNotificationRequest
     ) -> BulkNotificationResponse:
-        """Send bulk SMS notification to multiple recipients"""
-        if len(request.phone_numbers) > 100:  # OpenPhone limit
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot send to more than 100 recipients at once"
-            )
-        
-        try:
-            # Send SMS to all recipients
-            result = self._send_sms(request.phone_numbers, request.content, request.user_id)
-            
-            return BulkNotificationResponse(
-                total_recipients=len(request.phone_numbers),
-                successful_sends=len(request.phone_numbers),
-                failed_sends=0,
-                message_ids=[result.message_id] if result.message_id else [],
-                errors=[]
-            )
-        except Exception as e:
-            return BulkNotificationResponse(
-                total_recipients=len(request.phone_numbers),
-                successful_sends=0,
-                failed_sends=len(request.phone_numbers),
-                message_ids=[],
-                errors=[str(e)]
-            )
-    
\ No newline at end of file
+        """Send bulk SMS notification to any number of recipients, one request per chunk.
+
+        Campaigns that need to be resumable go through BulkSMSService, which
+        records each chunk's outcome.
+        """
+        chunks = self.chunk_recipients(request.phone_numbers)
+        results = await self.send_chunks(dict(enumerate(chunks)), request.content, request.user_id)
+        return summarize_bulk_results(results)
+
+
+def summarize_bulk_results(chunks: List[BulkChunkResult], campaign_id: Optional[str] = None) -> BulkNotificationResponse:
+    """Roll per-chunk outcomes up into a BulkNotificationResponse"""
+    chunks = sorted(chunks, key=lambda chunk: chunk.index)
+    sent = [chunk for chunk in chunks if chunk.success]
+    failed = [chunk for chunk in chunks if not chunk.success]
+    return BulkNotificationResponse(
+        success=not failed,
+        total_recipients=sum(len(chunk.recipients) for chunk in chunks),
+        successful_sends=sum(len(chunk.recipients) for chunk in sent),
+        failed_sends=sum(len(chunk.recipients) for chunk in failed),
+        message_ids=[chunk.message_id for chunk in sent if chunk.message_id],
+        errors=[f"Chunk {chunk.index}: {chunk.error}" for chunk in failed],
+        campaign_id=campaign_id,
+        chunks=chunks,
+    )
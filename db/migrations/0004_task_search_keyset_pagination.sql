@@ -0,0 +1,280 @@
+-- Migration: Keyset (cursor) pagination for task search
+-- Both search functions gain optional cursor arguments. When a cursor is
+-- supplied the page starts strictly after the cursor row, so deep pages no
+-- longer scan and discard every earlier row the way OFFSET does.
+BEGIN;
+
+-- Open tasks walked newest-first with id as the tiebreaker
+CREATE INDEX IF NOT EXISTS idx_tasks_open_created_at_id
+    ON public.tasks (created_at DESC, id DESC)
+    WHERE completed_at IS NULL;
+
+-- Adding parameters creates a new overload, so drop the old signatures first
+DROP FUNCTION IF EXISTS public.get_tasks_by_post_date(TEXT, TEXT, TEXT, DECIMAL, DECIMAL, INTEGER, INTEGER, DECIMAL);
+DROP FUNCTION IF EXISTS public.get_tasks_with_distance(TEXT, TEXT, TEXT, DECIMAL, DECIMAL, INTEGER, INTEGER, DECIMAL);
+
+CREATE OR REPLACE FUNCTION public.get_tasks_with_distance(
+    search_zip_code TEXT,
+    search_query TEXT DEFAULT NULL,
+    search_location_type TEXT DEFAULT NULL,
+    min_hourly_rate DECIMAL DEFAULT NULL,
+    max_hourly_rate DECIMAL DEFAULT NULL,
+    search_limit INTEGER DEFAULT 20,
+    search_offset INTEGER DEFAULT 0,
+    distance_radius DECIMAL DEFAULT 100,
+    -- Sort key of the last row on the previous page:
+    -- (bucket, distance, created_at, id), see ORDER BY below
+    cursor_bucket INTEGER DEFAULT NULL,
+    cursor_distance DECIMAL DEFAULT NULL,
+    cursor_created_at TIMESTAMPTZ DEFAULT NULL,
+    cursor_id UUID DEFAULT NULL
+)
+RETURNS TABLE(
+    id UUID,
+    client_id UUID,
+    hourly_rate REAL,
+    title TEXT,
+    dates JSONB,
+    location_type TEXT,
+    zip_code TEXT,
+    description TEXT,
+    tools_info TEXT,
+    public_transport_info TEXT,
+    completed_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ,
+    distance DECIMAL,
+    client JSON
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    search_lat DECIMAL;
+    search_lng DECIMAL;
+BEGIN
+    -- Get coordinates for the search zip code (optional distance filter)
+    SELECT lat, lng INTO search_lat, search_lng
+    FROM public.zip_codes AS zc
+    WHERE zc.zip_code = search_zip_code;
+
+    RETURN QUERY
+    SELECT
+        results.id,
+        results.client_id,
+        results.hourly_rate,
+        results.title,
+        results.dates,
+        results.location_type,
+        results.zip_code,
+        results.description,
+        results.tools_info,
+        results.public_transport_info,
+        results.completed_at,
+        results.created_at,
+        results.updated_at,
+        results.distance,
+        results.client
+    FROM (
+        SELECT
+            candidates.*,
+            -- 0: remote or no zip, 1: distance known, 2: distance unknown
+            CASE
+                WHEN candidates.location_type = 'remote' OR candidates.zip_code IS NULL THEN 0
+                WHEN candidates.distance IS NOT NULL THEN 1
+                ELSE 2
+            END AS sort_bucket
+        FROM (
+            SELECT
+                t.id,
+                t.client_id,
+                t.hourly_rate,
+                t.title,
+                t.dates,
+                t.location_type,
+                t.zip_code,
+                t.description,
+                t.tools_info,
+                t.public_transport_info,
+                t.completed_at,
+                t.created_at,
+                t.updated_at,
+                -- Rounded so the value round-trips exactly through a cursor
+                CASE
+                    WHEN search_lat IS NOT NULL AND search_lng IS NOT NULL
+                         AND zc.lat IS NOT NULL AND zc.lng IS NOT NULL
+                    THEN ROUND(public.calculate_distance(search_lat, search_lng, zc.lat, zc.lng), 6)
+                    ELSE NULL
+                END AS distance,
+                json_build_object(
+                    'id', c.id,
+                    'first_name', c.first_name,
+                    'last_name', c.last_name,
+                    'phone', c.phone,
+                    'email', c.email,
+                    'pfp_url', c.pfp_url
+                ) AS client
+            FROM public.tasks t
+            LEFT JOIN public.zip_codes zc ON t.zip_code = zc.zip_code
+            JOIN public.clients c ON t.client_id = c.id
+            WHERE
+                t.completed_at IS NULL
+                AND (
+                    search_query IS NULL
+                    OR t.title ILIKE '%' || search_query || '%'
+                    OR t.description ILIKE '%' || search_query || '%'
+                )
+                AND (
+                    search_location_type IS NULL
+                    OR t.location_type = search_location_type
+                )
+                AND (
+                    min_hourly_rate IS NULL
+                    OR t.hourly_rate >= min_hourly_rate
+                )
+                AND (
+                    max_hourly_rate IS NULL
+                    OR t.hourly_rate <= max_hourly_rate
+                )
+        ) AS candidates
+        WHERE
+            candidates.distance IS NULL OR candidates.distance <= distance_radius
+    ) AS results
+    WHERE
+        cursor_id IS NULL
+        OR results.sort_bucket > cursor_bucket
+        OR (
+            results.sort_bucket = cursor_bucket
+            AND (
+                COALESCE(results.distance, 0) > COALESCE(cursor_distance, 0)
+                OR (
+                    COALESCE(results.distance, 0) = COALESCE(cursor_distance, 0)
+                    AND (results.created_at, results.id) < (cursor_created_at, cursor_id)
+                )
+            )
+        )
+    ORDER BY
+        -- Remote tasks first, then tasks with a distance, then the rest
+        results.sort_bucket,
+        -- Nearest first
+        COALESCE(results.distance, 0) ASC,
+        -- Then newest, with id as a stable tiebreaker
+        results.created_at DESC,
+        results.id DESC
+    LIMIT search_limit
+    OFFSET CASE WHEN cursor_id IS NULL THEN search_offset ELSE 0 END;
+END;
+$$;
+
+-- Function to get tasks by post date
+CREATE OR REPLACE FUNCTION public.get_tasks_by_post_date(
+    search_zip_code TEXT,
+    search_query TEXT DEFAULT NULL,
+    search_location_type TEXT DEFAULT NULL,
+    min_hourly_rate DECIMAL DEFAULT NULL,
+    max_hourly_rate DECIMAL DEFAULT NULL,
+    search_limit INTEGER DEFAULT 20,
+    search_offset INTEGER DEFAULT 0,
+    distance_radius DECIMAL DEFAULT 100,
+    -- Sort key of the last row on the previous page
+    cursor_created_at TIMESTAMPTZ DEFAULT NULL,
+    cursor_id UUID DEFAULT NULL
+)
+RETURNS TABLE(
+    id UUID,
+    client_id UUID,
+    hourly_rate REAL,
+    title TEXT,
+    dates JSONB,
+    location_type TEXT,
+    zip_code TEXT,
+    description TEXT,
+    tools_info TEXT,
+    public_transport_info TEXT,
+    completed_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ,
+    distance DECIMAL,
+    client JSON
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    search_lat DECIMAL;
+    search_lng DECIMAL;
+BEGIN
+    -- Get coordinates for the search zip code
+    SELECT lat, lng INTO search_lat, search_lng
+    FROM public.zip_codes AS zc
+    WHERE zc.zip_code = search_zip_code;
+
+    RETURN QUERY
+    SELECT *
+    FROM (
+        SELECT
+            t.id,
+            t.client_id,
+            t.hourly_rate,
+            t.title,
+            t.dates,
+            t.location_type,
+            t.zip_code,
+            t.description,
+            t.tools_info,
+            t.public_transport_info,
+            t.completed_at,
+            t.created_at,
+            t.updated_at,
+            CASE
+                WHEN search_lat IS NOT NULL AND search_lng IS NOT NULL
+                     AND zc.lat IS NOT NULL AND zc.lng IS NOT NULL
+                THEN public.calculate_distance(search_lat, search_lng, zc.lat, zc.lng)
+                ELSE NULL
+            END AS distance,
+            json_build_object(
+                'id', c.id,
+                'first_name', c.first_name,
+                'last_name', c.last_name,
+                'phone', c.phone,
+                'email', c.email,
+                'pfp_url', c.pfp_url,
+                'number_of_posts', c.number_of_posts
+            ) AS client
+        FROM public.tasks t
+        LEFT JOIN public.zip_codes zc ON t.zip_code = zc.zip_code
+        JOIN public.clients c ON t.client_id = c.id
+        WHERE
+            t.completed_at IS NULL
+            -- Seek past the previous page using idx_tasks_open_created_at_id
+            AND (
+                cursor_id IS NULL
+                OR (t.created_at, t.id) < (cursor_created_at, cursor_id)
+            )
+            AND (
+                search_query IS NULL
+                OR t.title ILIKE '%' || search_query || '%'
+                OR t.description ILIKE '%' || search_query || '%'
+            )
+            AND (
+                search_location_type IS NULL
+                OR t.location_type = search_location_type
+            )
+            AND (
+                min_hourly_rate IS NULL
+                OR t.hourly_rate >= min_hourly_rate
+            )
+            AND (
+                max_hourly_rate IS NULL
+                OR t.hourly_rate <= max_hourly_rate
+            )
+    ) AS results
+    WHERE
+        results.distance IS NULL OR results.distance <= distance_radius
+    ORDER BY results.created_at DESC, results.id DESC
+    LIMIT search_limit
+    OFFSET CASE WHEN cursor_id IS NULL THEN search_offset ELSE 0 END;
+END;
+$$;
+
+COMMIT;
@@ -0,0 +1,205 @@
+-- Migration: Bounding-box prefilter for distance search
+-- get_tasks_with_distance used to run calculate_distance for every open task
+-- and then drop the ones outside distance_radius. Now the zip codes inside a
+-- lat/lng box around the search point are found through an index first, the
+-- exact distance is computed once per candidate zip, and only tasks in those
+-- zips (plus tasks without a zip, or with a zip missing from zip_codes) are
+-- read.
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_zip_codes_lat_lng ON public.zip_codes (lat, lng);
+
+-- Open tasks by zip, for the join from the candidate zips
+CREATE INDEX IF NOT EXISTS idx_tasks_open_zip_code
+    ON public.tasks (zip_code)
+    WHERE completed_at IS NULL;
+
+-- Zip codes within radius_miles of a point, with their distance
+CREATE OR REPLACE FUNCTION public.zip_codes_within_radius(
+    origin_lat DECIMAL,
+    origin_lng DECIMAL,
+    radius_miles DECIMAL
+)
+RETURNS TABLE(zip_code TEXT, distance DECIMAL)
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+    SELECT zc.zip_code, ROUND(public.calculate_distance(origin_lat, origin_lng, zc.lat, zc.lng), 6)
+    FROM public.zip_codes zc,
+    LATERAL (
+        SELECT
+            -- One degree of latitude is ~69.09 miles (3959 * pi / 180)
+            radius_miles / 69.09 AS lat_delta,
+            -- Longitude degrees shrink with cos(latitude); near the poles
+            -- or across the antimeridian the box covers every longitude
+            CASE
+                WHEN abs(origin_lat) + radius_miles / 69.09 >= 89 THEN 180
+                ELSE radius_miles / (69.09 * cos(radians(origin_lat)))
+            END AS lng_delta
+    ) AS box
+    WHERE
+        zc.lat BETWEEN origin_lat - box.lat_delta AND origin_lat + box.lat_delta
+        AND (
+            box.lng_delta >= 180
+            OR origin_lng - box.lng_delta < -180
+            OR origin_lng + box.lng_delta > 180
+            OR zc.lng BETWEEN origin_lng - box.lng_delta AND origin_lng + box.lng_delta
+        )
+        AND public.calculate_distance(origin_lat, origin_lng, zc.lat, zc.lng) <= radius_miles;
+$$;
+
+CREATE OR REPLACE FUNCTION public.get_tasks_with_distance(
+    search_zip_code TEXT,
+    search_query TEXT DEFAULT NULL,
+    search_location_type TEXT DEFAULT NULL,
+    min_hourly_rate DECIMAL DEFAULT NULL,
+    max_hourly_rate DECIMAL DEFAULT NULL,
+    search_limit INTEGER DEFAULT 20,
+    search_offset INTEGER DEFAULT 0,
+    distance_radius DECIMAL DEFAULT 100,
+    -- Sort key of the last row on the previous page:
+    -- (bucket, distance, created_at, id), see ORDER BY below
+    cursor_bucket INTEGER DEFAULT NULL,
+    cursor_distance DECIMAL DEFAULT NULL,
+    cursor_created_at TIMESTAMPTZ DEFAULT NULL,
+    cursor_id UUID DEFAULT NULL
+)
+RETURNS TABLE(
+    id UUID,
+    client_id UUID,
+    hourly_rate REAL,
+    title TEXT,
+    dates JSONB,
+    location_type TEXT,
+    zip_code TEXT,
+    description TEXT,
+    tools_info TEXT,
+    public_transport_info TEXT,
+    completed_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ,
+    distance DECIMAL,
+    client JSON
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    search_lat DECIMAL;
+    search_lng DECIMAL;
+BEGIN
+    -- Get coordinates for the search zip code (optional distance filter)
+    SELECT lat, lng INTO search_lat, search_lng
+    FROM public.zip_codes AS zc
+    WHERE zc.zip_code = search_zip_code;
+
+    RETURN QUERY
+    WITH nearby AS (
+        SELECT nz.zip_code, nz.distance
+        FROM public.zip_codes_within_radius(search_lat, search_lng, distance_radius) AS nz
+    ),
+    candidates AS (
+        -- Tasks in a zip inside the radius
+        SELECT t.*, nearby.distance
+        FROM nearby
+        JOIN public.tasks t ON t.zip_code = nearby.zip_code
+        WHERE t.completed_at IS NULL
+        UNION ALL
+        -- Tasks without a zip have no distance and are never filtered out
+        SELECT t.*, NULL::DECIMAL
+        FROM public.tasks t
+        WHERE t.completed_at IS NULL AND t.zip_code IS NULL AND search_lat IS NOT NULL
+        UNION ALL
+        -- Tasks whose zip is missing from zip_codes have no distance either
+        SELECT t.*, NULL::DECIMAL
+        FROM public.tasks t
+        WHERE t.completed_at IS NULL AND t.zip_code IS NOT NULL AND search_lat IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM public.zip_codes z WHERE z.zip_code = t.zip_code)
+        UNION ALL
+        -- Unknown search zip: nothing has a distance, so every task matches
+        SELECT t.*, NULL::DECIMAL
+        FROM public.tasks t
+        WHERE t.completed_at IS NULL AND search_lat IS NULL
+    )
+    SELECT
+        results.id,
+        results.client_id,
+        results.hourly_rate::REAL,
+        results.title,
+        results.dates,
+        results.location_type,
+        results.zip_code,
+        results.description,
+        results.tools_info,
+        results.public_transport_info,
+        results.completed_at,
+        results.created_at,
+        results.updated_at,
+        results.distance,
+        json_build_object(
+            'id', c.id,
+            'first_name', c.first_name,
+            'last_name', c.last_name,
+            'phone', c.phone,
+            'email', c.email,
+            'pfp_url', c.pfp_url
+        ) AS client
+    FROM (
+        SELECT
+            candidates.*,
+            -- 0: remote or no zip, 1: distance known, 2: distance unknown
+            CASE
+                WHEN candidates.location_type = 'remote' OR candidates.zip_code IS NULL THEN 0
+                WHEN candidates.distance IS NOT NULL THEN 1
+                ELSE 2
+            END AS sort_bucket
+        FROM candidates
+        WHERE
+            (
+                search_query IS NULL
+                OR candidates.title ILIKE '%' || search_query || '%'
+                OR candidates.description ILIKE '%' || search_query || '%'
+            )
+            AND (
+                search_location_type IS NULL
+                OR candidates.location_type = search_location_type
+            )
+            AND (
+                min_hourly_rate IS NULL
+                OR candidates.hourly_rate >= min_hourly_rate
+            )
+            AND (
+                max_hourly_rate IS NULL
+                OR candidates.hourly_rate <= max_hourly_rate
+            )
+    ) AS results
+    JOIN public.clients c ON results.client_id = c.id
+    WHERE
+        cursor_id IS NULL
+        OR results.sort_bucket > cursor_bucket
+        OR (
+            results.sort_bucket = cursor_bucket
+            AND (
+                COALESCE(results.distance, 0) > COALESCE(cursor_distance, 0)
+                OR (
+                    COALESCE(results.distance, 0) = COALESCE(cursor_distance, 0)
+                    AND (results.created_at, results.id) < (cursor_created_at, cursor_id)
+                )
+            )
+        )
+    ORDER BY
+        -- Remote tasks first, then tasks with a distance, then the rest
+        results.sort_bucket,
+        -- Nearest first
+        COALESCE(results.distance, 0) ASC,
+        -- Then newest, with id as a stable tiebreaker
+        results.created_at DESC,
+        results.id DESC
+    LIMIT search_limit
+    OFFSET CASE WHEN cursor_id IS NULL THEN search_offset ELSE 0 END;
+END;
+$$;
+
+COMMIT;
@@ -0,0 +1,506 @@
+-- Migration: Full-text search and relevance ranking for tasks
+-- The task RPCs filtered with title/description ILIKE '%q%', which no index
+-- can serve. Tasks now carry a stored, weighted tsvector with a GIN index and
+-- every search RPC matches against it. get_tasks_by_relevance ranks results
+-- by text match, recency and distance in a single query.
+BEGIN;
+
+ALTER TABLE public.tasks
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_search_vector ON public.tasks USING gin (search_vector);
+
+-- Turn free text into a prefix-matching tsquery ('math tut' -> 'math':* & 'tut':*)
+-- so partially typed words still match the way ILIKE did. Returns NULL when
+-- there is nothing searchable, which the RPCs treat as "no text filter".
+CREATE OR REPLACE FUNCTION public.task_search_tsquery(search_query TEXT)
+RETURNS tsquery
+LANGUAGE plpgsql
+IMMUTABLE
+AS $$
+DECLARE
+    query_text TEXT;
+    result tsquery;
+BEGIN
+    SELECT string_agg(quote_literal(word) || ':*', ' & ')
+    INTO query_text
+    FROM regexp_split_to_table(lower(coalesce(search_query, '')), '[^[:alnum:]]+') AS word
+    WHERE word <> '';
+
+    IF query_text IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    result := to_tsquery('english', query_text);
+    -- Only stop words, e.g. "the"
+    IF numnode(result) = 0 THEN
+        RETURN NULL;
+    END IF;
+    RETURN result;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.count_tasks_matching_criteria(
+    search_zip_code TEXT,
+    search_query TEXT DEFAULT NULL,
+    search_location_type TEXT DEFAULT NULL,
+    min_hourly_rate DECIMAL DEFAULT NULL,
+    max_hourly_rate DECIMAL DEFAULT NULL
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    task_count INTEGER;
+    text_query tsquery := public.task_search_tsquery(search_query);
+BEGIN
+    SELECT COUNT(*)
+    INTO task_count
+    FROM public.tasks t
+    WHERE
+        -- Only return tasks that are not completed (completed_at IS NULL)
+        t.completed_at IS NULL
+        -- Query filter
+        AND (
+            text_query IS NULL
+            OR t.search_vector @@ text_query
+        )
+        -- Location type filter
+        AND (
+            search_location_type IS NULL
+            OR t.location_type = search_location_type
+        )
+        -- Hourly rate filter
+        AND (
+            min_hourly_rate IS NULL
+            OR t.hourly_rate >= min_hourly_rate
+        )
+        AND (
+            max_hourly_rate IS NULL
+            OR t.hourly_rate <= max_hourly_rate
+        );
+
+    RETURN task_count;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.get_tasks_with_distance(
+    search_zip_code TEXT,
+    search_query TEXT DEFAULT NULL,
+    search_location_type TEXT DEFAULT NULL,
+    min_hourly_rate DECIMAL DEFAULT NULL,
+    max_hourly_rate DECIMAL DEFAULT NULL,
+    search_limit INTEGER DEFAULT 20,
+    search_offset INTEGER DEFAULT 0,
+    distance_radius DECIMAL DEFAULT 100,
+    -- Sort key of the last row on the previous page:
+    -- (bucket, distance, created_at, id), see ORDER BY below
+    cursor_bucket INTEGER DEFAULT NULL,
+    cursor_distance DECIMAL DEFAULT NULL,
+    cursor_created_at TIMESTAMPTZ DEFAULT NULL,
+    cursor_id UUID DEFAULT NULL
+)
+RETURNS TABLE(
+    id UUID,
+    client_id UUID,
+    hourly_rate REAL,
+    title TEXT,
+    dates JSONB,
+    location_type TEXT,
+    zip_code TEXT,
+    description TEXT,
+    tools_info TEXT,
+    public_transport_info TEXT,
+    completed_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ,
+    distance DECIMAL,
+    client JSON
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    search_lat DECIMAL;
+    search_lng DECIMAL;
+    text_query tsquery := public.task_search_tsquery(search_query);
+BEGIN
+    -- Get coordinates for the search zip code (optional distance filter)
+    SELECT lat, lng INTO search_lat, search_lng
+    FROM public.zip_codes AS zc
+    WHERE zc.zip_code = search_zip_code;
+
+    RETURN QUERY
+    WITH nearby AS (
+        SELECT nz.zip_code, nz.distance
+        FROM public.zip_codes_within_radius(search_lat, search_lng, distance_radius) AS nz
+    ),
+    candidates AS (
+        -- Tasks in a zip inside the radius
+        SELECT t.*, nearby.distance
+        FROM nearby
+        JOIN public.tasks t ON t.zip_code = nearby.zip_code
+        WHERE t.completed_at IS NULL
+        UNION ALL
+        -- Tasks without a zip have no distance and are never filtered out
+        SELECT t.*, NULL::DECIMAL
+        FROM public.tasks t
+        WHERE t.completed_at IS NULL AND t.zip_code IS NULL AND search_lat IS NOT NULL
+        UNION ALL
+        -- Tasks whose zip is missing from zip_codes have no distance either
+        SELECT t.*, NULL::DECIMAL
+        FROM public.tasks t
+        WHERE t.completed_at IS NULL AND t.zip_code IS NOT NULL AND search_lat IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM public.zip_codes z WHERE z.zip_code = t.zip_code)
+        UNION ALL
+        -- Unknown search zip: nothing has a distance, so every task matches
+        SELECT t.*, NULL::DECIMAL
+        FROM public.tasks t
+        WHERE t.completed_at IS NULL AND search_lat IS NULL
+    )
+    SELECT
+        results.id,
+        results.client_id,
+        results.hourly_rate::REAL,
+        results.title,
+        results.dates,
+        results.location_type,
+        results.zip_code,
+        results.description,
+        results.tools_info,
+        results.public_transport_info,
+        results.completed_at,
+        results.created_at,
+        results.updated_at,
+        results.distance,
+        json_build_object(
+            'id', c.id,
+            'first_name', c.first_name,
+            'last_name', c.last_name,
+            'phone', c.phone,
+            'email', c.email,
+            'pfp_url', c.pfp_url
+        ) AS client
+    FROM (
+        SELECT
+            candidates.*,
+            -- 0: remote or no zip, 1: distance known, 2: distance unknown
+            CASE
+                WHEN candidates.location_type = 'remote' OR candidates.zip_code IS NULL THEN 0
+                WHEN candidates.distance IS NOT NULL THEN 1
+                ELSE 2
+            END AS sort_bucket
+        FROM candidates
+        WHERE
+            (
+                text_query IS NULL
+                OR candidates.search_vector @@ text_query
+            )
+            AND (
+                search_location_type IS NULL
+                OR candidates.location_type = search_location_type
+            )
+            AND (
+                min_hourly_rate IS NULL
+                OR candidates.hourly_rate >= min_hourly_rate
+            )
+            AND (
+                max_hourly_rate IS NULL
+                OR candidates.hourly_rate <= max_hourly_rate
+            )
+    ) AS results
+    JOIN public.clients c ON results.client_id = c.id
+    WHERE
+        cursor_id IS NULL
+        OR results.sort_bucket > cursor_bucket
+        OR (
+            results.sort_bucket = cursor_bucket
+            AND (
+                COALESCE(results.distance, 0) > COALESCE(cursor_distance, 0)
+                OR (
+                    COALESCE(results.distance, 0) = COALESCE(cursor_distance, 0)
+                    AND (results.created_at, results.id) < (cursor_created_at, cursor_id)
+                )
+            )
+        )
+    ORDER BY
+        -- Remote tasks first, then tasks with a distance, then the rest
+        results.sort_bucket,
+        -- Nearest first
+        COALESCE(results.distance, 0) ASC,
+        -- Then newest, with id as a stable tiebreaker
+        results.created_at DESC,
+        results.id DESC
+    LIMIT search_limit
+    OFFSET CASE WHEN cursor_id IS NULL THEN search_offset ELSE 0 END;
+END;
+$$;
+
+-- Function to get tasks by post date
+CREATE OR REPLACE FUNCTION public.get_tasks_by_post_date(
+    search_zip_code TEXT,
+    search_query TEXT DEFAULT NULL,
+    search_location_type TEXT DEFAULT NULL,
+    min_hourly_rate DECIMAL DEFAULT NULL,
+    max_hourly_rate DECIMAL DEFAULT NULL,
+    search_limit INTEGER DEFAULT 20,
+    search_offset INTEGER DEFAULT 0,
+    distance_radius DECIMAL DEFAULT 100,
+    -- Sort key of the last row on the previous page
+    cursor_created_at TIMESTAMPTZ DEFAULT NULL,
+    cursor_id UUID DEFAULT NULL
+)
+RETURNS TABLE(
+    id UUID,
+    client_id UUID,
+    hourly_rate REAL,
+    title TEXT,
+    dates JSONB,
+    location_type TEXT,
+    zip_code TEXT,
+    description TEXT,
+    tools_info TEXT,
+    public_transport_info TEXT,
+    completed_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ,
+    distance DECIMAL,
+    client JSON
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    search_lat DECIMAL;
+    search_lng DECIMAL;
+    text_query tsquery := public.task_search_tsquery(search_query);
+BEGIN
+    -- Get coordinates for the search zip code
+    SELECT lat, lng INTO search_lat, search_lng
+    FROM public.zip_codes AS zc
+    WHERE zc.zip_code = search_zip_code;
+
+    RETURN QUERY
+    SELECT *
+    FROM (
+        SELECT
+            t.id,
+            t.client_id,
+            t.hourly_rate,
+            t.title,
+            t.dates,
+            t.location_type,
+            t.zip_code,
+            t.description,
+            t.tools_info,
+            t.public_transport_info,
+            t.completed_at,
+            t.created_at,
+            t.updated_at,
+            CASE
+                WHEN search_lat IS NOT NULL AND search_lng IS NOT NULL
+                     AND zc.lat IS NOT NULL AND zc.lng IS NOT NULL
+                THEN public.calculate_distance(search_lat, search_lng, zc.lat, zc.lng)
+                ELSE NULL
+            END AS distance,
+            json_build_object(
+                'id', c.id,
+                'first_name', c.first_name,
+                'last_name', c.last_name,
+                'phone', c.phone,
+                'email', c.email,
+                'pfp_url', c.pfp_url,
+                'number_of_posts', c.number_of_posts
+            ) AS client
+        FROM public.tasks t
+        LEFT JOIN public.zip_codes zc ON t.zip_code = zc.zip_code
+        JOIN public.clients c ON t.client_id = c.id
+        WHERE
+            t.completed_at IS NULL
+            -- Seek past the previous page using idx_tasks_open_created_at_id
+            AND (
+                cursor_id IS NULL
+                OR (t.created_at, t.id) < (cursor_created_at, cursor_id)
+            )
+            AND (
+                text_query IS NULL
+                OR t.search_vector @@ text_query
+            )
+            AND (
+                search_location_type IS NULL
+                OR t.location_type = search_location_type
+            )
+            AND (
+                min_hourly_rate IS NULL
+                OR t.hourly_rate >= min_hourly_rate
+            )
+            AND (
+                max_hourly_rate IS NULL
+                OR t.hourly_rate <= max_hourly_rate
+            )
+    ) AS results
+    WHERE
+        results.distance IS NULL OR results.distance <= distance_radius
+    ORDER BY results.created_at DESC, results.id DESC
+    LIMIT search_limit
+    OFFSET CASE WHEN cursor_id IS NULL THEN search_offset ELSE 0 END;
+END;
+$$;
+
+-- Function to get tasks ranked by relevance: a blend of text match, recency
+-- and distance. Candidate rows come from the same radius prefilter as
+-- get_tasks_with_distance.
+CREATE OR REPLACE FUNCTION public.get_tasks_by_relevance(
+    search_zip_code TEXT,
+    search_query TEXT DEFAULT NULL,
+    search_location_type TEXT DEFAULT NULL,
+    min_hourly_rate DECIMAL DEFAULT NULL,
+    max_hourly_rate DECIMAL DEFAULT NULL,
+    search_limit INTEGER DEFAULT 20,
+    search_offset INTEGER DEFAULT 0,
+    distance_radius DECIMAL DEFAULT 100,
+    -- Recency is measured from this instant so scores stay stable across pages
+    rank_reference_time TIMESTAMPTZ DEFAULT NULL,
+    -- Sort key of the last row on the previous page
+    cursor_relevance DECIMAL DEFAULT NULL,
+    cursor_id UUID DEFAULT NULL
+)
+RETURNS TABLE(
+    id UUID,
+    client_id UUID,
+    hourly_rate REAL,
+    title TEXT,
+    dates JSONB,
+    location_type TEXT,
+    zip_code TEXT,
+    description TEXT,
+    tools_info TEXT,
+    public_transport_info TEXT,
+    completed_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ,
+    distance DECIMAL,
+    relevance DECIMAL,
+    client JSON
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    search_lat DECIMAL;
+    search_lng DECIMAL;
+    text_query tsquery := public.task_search_tsquery(search_query);
+    reference_time TIMESTAMPTZ := COALESCE(rank_reference_time, now());
+BEGIN
+    -- Get coordinates for the search zip code (optional distance filter)
+    SELECT lat, lng INTO search_lat, search_lng
+    FROM public.zip_codes AS zc
+    WHERE zc.zip_code = search_zip_code;
+
+    RETURN QUERY
+    WITH nearby AS (
+        SELECT nz.zip_code, nz.distance
+        FROM public.zip_codes_within_radius(search_lat, search_lng, distance_radius) AS nz
+    ),
+    candidates AS (
+        SELECT t.*, nearby.distance
+        FROM nearby
+        JOIN public.tasks t ON t.zip_code = nearby.zip_code
+        WHERE t.completed_at IS NULL
+        UNION ALL
+        SELECT t.*, NULL::DECIMAL
+        FROM public.tasks t
+        WHERE t.completed_at IS NULL AND t.zip_code IS NULL AND search_lat IS NOT NULL
+        UNION ALL
+        SELECT t.*, NULL::DECIMAL
+        FROM public.tasks t
+        WHERE t.completed_at IS NULL AND t.zip_code IS NOT NULL AND search_lat IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM public.zip_codes z WHERE z.zip_code = t.zip_code)
+        UNION ALL
+        SELECT t.*, NULL::DECIMAL
+        FROM public.tasks t
+        WHERE t.completed_at IS NULL AND search_lat IS NULL
+    ),
+    scored AS (
+        SELECT
+            candidates.*,
+            ROUND((
+                -- Text match, normalised to 0..1
+                0.6 * CASE
+                    WHEN text_query IS NULL THEN 0
+                    ELSE ts_rank_cd(candidates.search_vector, text_query, 32)
+                END
+                -- Recency, decaying with a two week time constant
+                + 0.25 * exp(
+                    -GREATEST(EXTRACT(EPOCH FROM reference_time - candidates.created_at), 0)
+                    / (14 * 86400)
+                )
+                -- Proximity; remote tasks count as nearby, as in the distance sort
+                + 0.15 * CASE
+                    WHEN candidates.location_type = 'remote' OR candidates.zip_code IS NULL THEN 1
+                    WHEN candidates.distance IS NOT NULL THEN 1 / (1 + candidates.distance / 10)
+                    ELSE 0
+                END
+            )::numeric, 6) AS relevance
+        FROM candidates
+        WHERE
+            (
+                text_query IS NULL
+                OR candidates.search_vector @@ text_query
+            )
+            AND (
+                search_location_type IS NULL
+                OR candidates.location_type = search_location_type
+            )
+            AND (
+                min_hourly_rate IS NULL
+                OR candidates.hourly_rate >= min_hourly_rate
+            )
+            AND (
+                max_hourly_rate IS NULL
+                OR candidates.hourly_rate <= max_hourly_rate
+            )
+    )
+    SELECT
+        scored.id,
+        scored.client_id,
+        scored.hourly_rate::REAL,
+        scored.title,
+        scored.dates,
+        scored.location_type,
+        scored.zip_code,
+        scored.description,
+        scored.tools_info,
+        scored.public_transport_info,
+        scored.completed_at,
+        scored.created_at,
+        scored.updated_at,
+        scored.distance,
+        scored.relevance,
+        json_build_object(
+            'id', c.id,
+            'first_name', c.first_name,
+            'last_name', c.last_name,
+            'phone', c.phone,
+            'email', c.email,
+            'pfp_url', c.pfp_url
+        ) AS client
+    FROM scored
+    JOIN public.clients c ON scored.client_id = c.id
+    WHERE
+        cursor_id IS NULL
+        OR (scored.relevance, scored.id) < (cursor_relevance, cursor_id)
+    ORDER BY scored.relevance DESC, scored.id DESC
+    LIMIT search_limit
+    OFFSET CASE WHEN cursor_id IS NULL THEN search_offset ELSE 0 END;
+END;
+$$;
+
+COMMIT;
@@ -0,0 +1,165 @@
+-- Migration: Maintained chat inbox summaries
+-- Each chat keeps a preview of its latest message and each participant keeps
+-- an unread counter. Triggers on messages keep both current on every send and
+-- every read, so an inbox page is one query instead of three per chat.
+BEGIN;
+
+ALTER TABLE public.chats
+    ADD COLUMN IF NOT EXISTS last_message TEXT,
+    ADD COLUMN IF NOT EXISTS last_message_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS last_message_sender_id UUID;
+
+ALTER TABLE public.chat_users
+    ADD COLUMN IF NOT EXISTS unread_count INTEGER NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_chat_users_user_id ON public.chat_users (user_id);
+CREATE INDEX IF NOT EXISTS idx_chat_users_chat_id ON public.chat_users (chat_id);
+CREATE INDEX IF NOT EXISTS idx_messages_chat_id_created_at ON public.messages (chat_id, created_at DESC);
+
+-- New message: refresh the chat preview and bump everyone else's unread count
+CREATE OR REPLACE FUNCTION public.chat_summary_on_message_insert()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    UPDATE public.chats c
+    SET last_message = left(NEW.content, 200),
+        last_message_at = NEW.created_at,
+        last_message_sender_id = cu.user_id,
+        updated_at = NEW.created_at
+    FROM public.chat_users cu
+    WHERE c.id = NEW.chat_id
+      AND cu.id = NEW.sender_id
+      AND (c.last_message_at IS NULL OR c.last_message_at <= NEW.created_at);
+
+    UPDATE public.chat_users
+    SET unread_count = unread_count + 1
+    WHERE chat_id = NEW.chat_id
+      AND id <> NEW.sender_id;
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS chat_summary_on_message_insert ON public.messages;
+CREATE TRIGGER chat_summary_on_message_insert
+AFTER INSERT ON public.messages
+FOR EACH ROW EXECUTE FUNCTION public.chat_summary_on_message_insert();
+
+-- Messages marked read: take them off the other participants' unread counts.
+-- Statement level, so marking a whole page read is one update per chat.
+CREATE OR REPLACE FUNCTION public.chat_summary_on_messages_read()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    UPDATE public.chat_users cu
+    SET unread_count = GREATEST(cu.unread_count - newly_read.read_count, 0)
+    FROM (
+        SELECT n.chat_id, n.sender_id, COUNT(*) AS read_count
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id
+        WHERE o.read_at IS NULL AND n.read_at IS NOT NULL
+        GROUP BY n.chat_id, n.sender_id
+    ) AS newly_read
+    WHERE cu.chat_id = newly_read.chat_id
+      AND cu.id <> newly_read.sender_id;
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS chat_summary_on_messages_read ON public.messages;
+CREATE TRIGGER chat_summary_on_messages_read
+AFTER UPDATE ON public.messages
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.chat_summary_on_messages_read();
+
+-- Backfill from existing messages
+UPDATE public.chats c
+SET last_message = left(latest.content, 200),
+    last_message_at = latest.created_at,
+    last_message_sender_id = latest.user_id
+FROM (
+    SELECT DISTINCT ON (m.chat_id) m.chat_id, m.content, m.created_at, cu.user_id
+    FROM public.messages m
+    JOIN public.chat_users cu ON cu.id = m.sender_id
+    ORDER BY m.chat_id, m.created_at DESC
+) AS latest
+WHERE c.id = latest.chat_id;
+
+UPDATE public.chat_users cu
+SET unread_count = (
+    SELECT COUNT(*)
+    FROM public.messages m
+    WHERE m.chat_id = cu.chat_id
+      AND m.sender_id <> cu.id
+      AND m.read_at IS NULL
+);
+
+-- One page of a user's inbox, most recently active first
+CREATE OR REPLACE FUNCTION public.get_chat_inbox(
+    inbox_user_id UUID,
+    page_limit INTEGER DEFAULT 20,
+    -- Sort key of the last chat on the previous page
+    cursor_activity_at TIMESTAMPTZ DEFAULT NULL,
+    cursor_chat_id UUID DEFAULT NULL
+)
+RETURNS TABLE(
+    id UUID,
+    created_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ,
+    activity_at TIMESTAMPTZ,
+    last_message TEXT,
+    last_message_at TIMESTAMPTZ,
+    last_message_sender_id UUID,
+    unread_count INTEGER,
+    participants JSON
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT
+        c.id,
+        c.created_at,
+        c.updated_at,
+        COALESCE(c.last_message_at, c.created_at) AS activity_at,
+        c.last_message,
+        c.last_message_at,
+        c.last_message_sender_id,
+        me.unread_count,
+        (
+            SELECT json_agg(json_build_object(
+                'id', cu.user_id,
+                'first_name', COALESCE(cl.first_name, h.first_name, 'Unknown'),
+                'last_name', COALESCE(cl.last_name, h.last_name, 'User'),
+                'pfp_url', COALESCE(cl.pfp_url, h.pfp_url)
+            ) ORDER BY cu.created_at)
+            FROM public.chat_users cu
+            LEFT JOIN public.clients cl ON cl.id = cu.user_id
+            LEFT JOIN public.helpers h ON h.id = cu.user_id
+            WHERE cu.chat_id = c.id
+        ) AS participants
+    FROM public.chat_users me
+    JOIN public.chats c ON c.id = me.chat_id
+    WHERE me.user_id = inbox_user_id
+      AND (
+          cursor_chat_id IS NULL
+          OR (COALESCE(c.last_message_at, c.created_at), c.id) < (cursor_activity_at, cursor_chat_id)
+      )
+    ORDER BY COALESCE(c.last_message_at, c.created_at) DESC, c.id DESC
+    LIMIT page_limit;
+$$;
+
+-- The API passes the authenticated user's id as the service role; PostgREST
+-- would otherwise let the anon key read any user's messages
+REVOKE EXECUTE ON FUNCTION public.get_chat_inbox(UUID, INTEGER, TIMESTAMPTZ, UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.get_chat_inbox(UUID, INTEGER, TIMESTAMPTZ, UUID) TO service_role;
+
+COMMIT;
@@ -0,0 +1,12 @@
+-- Migration: Distinct timestamps for messages inserted together
+-- Chat sends are group-committed as multi-row inserts. now() is fixed for the
+-- whole transaction, so every message in a batch would share one created_at
+-- and their order would be arbitrary; clock_timestamp() advances per row and
+-- keeps the batch in submission order.
+BEGIN;
+
+ALTER TABLE public.messages
+    ALTER COLUMN created_at SET DEFAULT clock_timestamp(),
+    ALTER COLUMN updated_at SET DEFAULT clock_timestamp();
+
+COMMIT;
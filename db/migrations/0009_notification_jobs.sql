@@ -0,0 +1,105 @@
+-- Migration: Durable outbound notification jobs
+-- SMS, email and counter updates that used to run as bare asyncio tasks are
+-- written here instead and executed by the app's worker pool. Workers claim
+-- jobs with a lease; a job whose worker dies is picked up again once the
+-- lease lapses.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.notification_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    status TEXT NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'running', 'done', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    locked_by TEXT,
+    locked_until TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_notification_jobs_pending
+    ON public.notification_jobs (run_at, id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_notification_jobs_running
+    ON public.notification_jobs (locked_until) WHERE status = 'running';
+CREATE INDEX IF NOT EXISTS idx_notification_jobs_done
+    ON public.notification_jobs (finished_at) WHERE status = 'done';
+
+ALTER TABLE public.notification_jobs ENABLE ROW LEVEL SECURITY;
+
+-- Claim up to batch_size due jobs (or jobs whose lease lapsed) for one worker
+CREATE OR REPLACE FUNCTION public.claim_notification_jobs(
+    worker_id TEXT,
+    batch_size INTEGER DEFAULT 10,
+    lease_seconds INTEGER DEFAULT 60
+)
+RETURNS SETOF public.notification_jobs
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH picked AS (
+        SELECT id
+        FROM public.notification_jobs
+        WHERE (status = 'pending' AND run_at <= now())
+           OR (status = 'running' AND locked_until < now())
+        ORDER BY run_at, id
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE public.notification_jobs j
+    SET status = 'running',
+        attempts = j.attempts + 1,
+        locked_by = worker_id,
+        locked_until = now() + make_interval(secs => lease_seconds)
+    FROM picked
+    WHERE j.id = picked.id
+    RETURNING j.*;
+$$;
+
+-- Queue depth per status and how long the oldest due job has been waiting
+CREATE OR REPLACE FUNCTION public.notification_job_stats()
+RETURNS TABLE(status TEXT, jobs BIGINT, oldest_due_seconds DOUBLE PRECISION)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT
+        j.status,
+        COUNT(*) AS jobs,
+        EXTRACT(EPOCH FROM now() - MIN(j.run_at) FILTER (WHERE j.run_at <= now()))::DOUBLE PRECISION
+    FROM public.notification_jobs j
+    WHERE j.status IN ('pending', 'running')
+    GROUP BY j.status;
+$$;
+
+-- Delete completed jobs older than the retention window; failed jobs are kept
+CREATE OR REPLACE FUNCTION public.prune_notification_jobs(retention_hours INTEGER DEFAULT 168)
+RETURNS BIGINT
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH deleted AS (
+        DELETE FROM public.notification_jobs
+        WHERE status = 'done'
+          AND finished_at < now() - make_interval(hours => retention_hours)
+        RETURNING 1
+    )
+    SELECT COUNT(*) FROM deleted;
+$$;
+
+-- Only the app's service role runs the queue; PostgREST would otherwise expose
+-- these to anyone holding the anon key
+REVOKE EXECUTE ON FUNCTION public.claim_notification_jobs(TEXT, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.notification_job_stats() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.prune_notification_jobs(INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.claim_notification_jobs(TEXT, INTEGER, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION public.notification_job_stats() TO service_role;
+GRANT EXECUTE ON FUNCTION public.prune_notification_jobs(INTEGER) TO service_role;
+
+COMMIT;
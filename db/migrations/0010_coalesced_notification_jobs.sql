@@ -0,0 +1,60 @@
+-- Migration: Coalesce chat notifications per recipient
+-- Jobs enqueued with a coalesce_key merge into the pending job with the same
+-- key instead of adding a row, counting the merged messages in payload.count.
+-- The first notification for a key goes out at once; anything after it within
+-- the window waits for the window to end and is sent as one summary.
+BEGIN;
+
+ALTER TABLE public.notification_jobs ADD COLUMN IF NOT EXISTS coalesce_key TEXT;
+
+-- At most one pending job per key; later messages update it
+CREATE UNIQUE INDEX IF NOT EXISTS idx_notification_jobs_coalesce_pending
+    ON public.notification_jobs (coalesce_key)
+    WHERE status = 'pending' AND coalesce_key IS NOT NULL;
+-- When the key last went out
+CREATE INDEX IF NOT EXISTS idx_notification_jobs_coalesce_recent
+    ON public.notification_jobs (coalesce_key, run_at DESC)
+    WHERE coalesce_key IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION public.enqueue_coalesced_notification_job(
+    job_kind TEXT,
+    job_coalesce_key TEXT,
+    job_payload JSONB,
+    window_seconds DOUBLE PRECISION DEFAULT 30,
+    job_max_attempts INTEGER DEFAULT 5
+)
+RETURNS public.notification_jobs
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    last_run TIMESTAMPTZ;
+    due TIMESTAMPTZ := now();
+    job public.notification_jobs;
+BEGIN
+    SELECT max(j.run_at) INTO last_run
+    FROM public.notification_jobs j
+    WHERE j.coalesce_key = job_coalesce_key
+      AND j.status <> 'pending';
+    IF last_run IS NOT NULL AND last_run > now() - make_interval(secs => window_seconds) THEN
+        due := last_run + make_interval(secs => window_seconds);
+    END IF;
+
+    INSERT INTO public.notification_jobs AS j (kind, payload, run_at, max_attempts, coalesce_key)
+    VALUES (job_kind, job_payload || jsonb_build_object('count', 1), due, job_max_attempts, job_coalesce_key)
+    ON CONFLICT (coalesce_key) WHERE status = 'pending' AND coalesce_key IS NOT NULL
+    DO UPDATE SET payload = EXCLUDED.payload
+        || jsonb_build_object('count', COALESCE((j.payload->>'count')::INTEGER, 1) + 1)
+    RETURNING * INTO job;
+
+    RETURN job;
+END;
+$$;
+
+-- Only the app's service role runs the queue; PostgREST would otherwise expose
+-- these to anyone holding the anon key
+REVOKE EXECUTE ON FUNCTION public.enqueue_coalesced_notification_job(TEXT, TEXT, JSONB, DOUBLE PRECISION, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.enqueue_coalesced_notification_job(TEXT, TEXT, JSONB, DOUBLE PRECISION, INTEGER) TO service_role;
+
+COMMIT;
@@ -0,0 +1,67 @@
+-- Migration: Resumable bulk SMS campaigns
+-- A bulk send is split into provider-sized chunks, one row each. A run claims
+-- pending chunks (pending -> sending) before sending them and marks each one
+-- sent, failed or unknown as soon as its request finishes. Resuming a
+-- campaign first puts its failed chunks back to pending. Concurrent runs never
+-- send the same chunk twice, a run never retries a chunk it saw fail, and a
+-- chunk OpenPhone may already have accepted (unknown, or left in sending by a
+-- process that died) is not resent automatically.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.sms_campaigns (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    content TEXT NOT NULL,
+    user_id TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS public.sms_campaign_chunks (
+    campaign_id UUID NOT NULL REFERENCES public.sms_campaigns (id) ON DELETE CASCADE,
+    chunk_index INTEGER NOT NULL,
+    recipients TEXT[] NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'sending', 'sent', 'failed', 'unknown')),
+    message_id TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (campaign_id, chunk_index)
+);
+
+ALTER TABLE public.sms_campaigns ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.sms_campaign_chunks ENABLE ROW LEVEL SECURITY;
+
+-- Claim up to batch_size pending chunks of a campaign, in chunk order
+CREATE OR REPLACE FUNCTION public.claim_sms_campaign_chunks(
+    campaign UUID,
+    batch_size INTEGER DEFAULT 100
+)
+RETURNS SETOF public.sms_campaign_chunks
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH picked AS (
+        SELECT chunk_index
+        FROM public.sms_campaign_chunks
+        WHERE campaign_id = campaign
+          AND status = 'pending'
+        ORDER BY chunk_index
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE public.sms_campaign_chunks c
+    SET status = 'sending',
+        attempts = c.attempts + 1,
+        updated_at = now()
+    FROM picked
+    WHERE c.campaign_id = campaign
+      AND c.chunk_index = picked.chunk_index
+    RETURNING c.*;
+$$;
+
+-- Only the backend (service role) sends campaigns
+REVOKE EXECUTE ON FUNCTION public.claim_sms_campaign_chunks(UUID, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.claim_sms_campaign_chunks(UUID, INTEGER) TO service_role;
+
+COMMIT;
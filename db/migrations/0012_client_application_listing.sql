@@ -0,0 +1,10 @@
+-- Migration: Index the client application listing
+-- Applications for all of a client's tasks are read in one query joining
+-- tasks on client_id and applications on task_id, newest first.
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_client_id ON public.tasks (client_id);
+CREATE INDEX IF NOT EXISTS idx_applications_task_id_created_at
+    ON public.applications (task_id, created_at DESC);
+
+COMMIT;
@@ -0,0 +1,105 @@
+-- Migration: Constraint-backed, single round-trip application creation
+-- A helper can apply to a task once, enforced by a unique constraint rather
+-- than a select before the insert. create_application checks the task,
+-- inserts the application, bumps the helper's application count, queues the
+-- client's SMS and returns the joined rows, all in one call and transaction.
+BEGIN;
+
+-- Keep the earliest application where a helper applied twice
+DELETE FROM public.applications a
+USING public.applications b
+WHERE a.task_id = b.task_id
+  AND a.helper_id = b.helper_id
+  AND (a.created_at, a.id) > (b.created_at, b.id);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'applications_task_id_helper_id_key'
+    ) THEN
+        ALTER TABLE public.applications
+            ADD CONSTRAINT applications_task_id_helper_id_key UNIQUE (task_id, helper_id);
+    END IF;
+END;
+$$;
+
+-- Raises P0002 when the task or helper does not exist and 23505 when the
+-- helper has already applied; nothing is written in either case.
+CREATE OR REPLACE FUNCTION public.create_application(
+    application_task_id UUID,
+    application_helper_id UUID,
+    application_introduction_message TEXT,
+    application_supplements_url TEXT DEFAULT NULL,
+    job_max_attempts INTEGER DEFAULT 5
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    task_row public.tasks;
+    client_row public.clients;
+    helper_row public.helpers;
+    application_row public.applications;
+BEGIN
+    SELECT * INTO task_row FROM public.tasks WHERE id = application_task_id;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Task not found' USING ERRCODE = 'P0002';
+    END IF;
+
+    -- Rolled back with everything else if the insert conflicts
+    UPDATE public.helpers
+    SET number_of_applications = COALESCE(number_of_applications, 0) + 1,
+        updated_at = now()
+    WHERE id = application_helper_id
+    RETURNING * INTO helper_row;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Helper not found' USING ERRCODE = 'P0002';
+    END IF;
+
+    INSERT INTO public.applications (task_id, helper_id, introduction_message, supplements_url)
+    VALUES (
+        application_task_id,
+        application_helper_id,
+        application_introduction_message,
+        application_supplements_url
+    )
+    ON CONFLICT ON CONSTRAINT applications_task_id_helper_id_key DO NOTHING
+    RETURNING * INTO application_row;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'You have already applied to this task' USING ERRCODE = '23505';
+    END IF;
+
+    SELECT * INTO client_row FROM public.clients WHERE id = task_row.client_id;
+
+    IF client_row.id IS NOT NULL THEN
+        INSERT INTO public.notification_jobs (kind, payload, max_attempts)
+        VALUES (
+            'sms.application_received',
+            jsonb_build_object(
+                'client_id', client_row.id,
+                'client_phone', client_row.phone,
+                'helper_name', helper_row.first_name || ' ' || helper_row.last_name,
+                'task_title', task_row.title,
+                'task_id', task_row.id
+            ),
+            job_max_attempts
+        );
+    END IF;
+
+    RETURN jsonb_build_object(
+        'application', to_jsonb(application_row),
+        'helper', to_jsonb(helper_row),
+        'task', to_jsonb(task_row) || jsonb_build_object('client', to_jsonb(client_row))
+    );
+END;
+$$;
+
+-- Called by the API as the service role with an already authenticated helper
+-- id; PostgREST would otherwise let the anon key apply as any helper and read
+-- the client's contact details back
+REVOKE EXECUTE ON FUNCTION public.create_application(UUID, UUID, TEXT, TEXT, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.create_application(UUID, UUID, TEXT, TEXT, INTEGER) TO service_role;
+
+COMMIT;
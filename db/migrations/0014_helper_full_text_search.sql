@@ -0,0 +1,138 @@
+-- Migration: Stored tsvector and single-call helper search
+-- Helper search ran a count RPC and then a page RPC, and both rebuilt
+-- to_tsvector(first_name || last_name || bio || college) for every row, once
+-- more for ts_rank. Helpers now carry a stored tsvector with a GIN index, and
+-- search_helpers returns the page with the total match count (count(*) OVER ())
+-- on every row, so a search is one call.
+BEGIN;
+
+ALTER TABLE public.helpers
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        -- Unweighted, so ts_rank orders results as the old expression did
+        to_tsvector('english', first_name || ' ' || last_name || ' ' || bio || ' ' || college)
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_helpers_search_vector ON public.helpers USING gin (search_vector);
+-- Expression index the old RPCs matched against
+DROP INDEX IF EXISTS public.idx_helpers_text_search;
+
+-- Replaced by search_helpers
+DROP FUNCTION IF EXISTS public.get_helpers_matching_criteria(TEXT, TEXT, INTEGER, TEXT, INTEGER, INTEGER);
+
+CREATE OR REPLACE FUNCTION public.search_helpers(
+    search_query TEXT DEFAULT NULL,
+    search_college TEXT DEFAULT NULL,
+    search_graduation_year INTEGER DEFAULT NULL,
+    search_zip_code TEXT DEFAULT NULL,
+    search_limit INTEGER DEFAULT 20,
+    search_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE(
+    id UUID,
+    email TEXT,
+    phone TEXT,
+    first_name TEXT,
+    last_name TEXT,
+    pfp_url TEXT,
+    college TEXT,
+    bio TEXT,
+    graduation_year INTEGER,
+    zip_code TEXT,
+    number_of_applications INTEGER,
+    invited_count INTEGER,
+    created_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ,
+    total_count BIGINT
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    text_query tsquery := CASE
+        WHEN search_query IS NULL THEN NULL
+        ELSE plainto_tsquery('english', search_query)
+    END;
+BEGIN
+    -- The window counts every match in the subquery, over narrow rows; the
+    -- page is then a top-N sort, and only its rows are joined back to helpers.
+    RETURN QUERY
+    SELECT
+        h.id,
+        h.email,
+        h.phone,
+        h.first_name,
+        h.last_name,
+        h.pfp_url,
+        h.college,
+        h.bio,
+        h.graduation_year,
+        h.zip_code,
+        h.number_of_applications,
+        h.invited_count,
+        h.created_at,
+        h.updated_at,
+        page.total_count
+    FROM (
+        SELECT m.id, m.rank, m.created_at, m.total_count
+        FROM (
+            SELECT
+                s.id,
+                s.created_at,
+                CASE
+                    WHEN text_query IS NOT NULL THEN ts_rank(s.search_vector, text_query)
+                    ELSE 0
+                END AS rank,
+                -- Every match, before LIMIT/OFFSET
+                count(*) OVER () AS total_count
+            FROM public.helpers s
+            WHERE
+                -- Text search in name, bio, and college
+                (text_query IS NULL OR s.search_vector @@ text_query)
+                -- College filter
+                AND (search_college IS NULL OR s.college ILIKE '%' || search_college || '%')
+                -- Graduation year filter
+                AND (search_graduation_year IS NULL OR s.graduation_year = search_graduation_year)
+                -- Zip code filter
+                AND (search_zip_code IS NULL OR s.zip_code = search_zip_code)
+        ) m
+        -- Order by relevance (text search rank) then by creation date
+        ORDER BY m.rank DESC, m.created_at DESC, m.id
+        LIMIT search_limit
+        OFFSET search_offset
+    ) page
+    JOIN public.helpers h ON h.id = page.id
+    ORDER BY page.rank DESC, page.created_at DESC, page.id;
+END;
+$$;
+
+-- Still used when a page past the last match comes back empty
+CREATE OR REPLACE FUNCTION public.count_helpers_matching_criteria(
+    search_query TEXT DEFAULT NULL,
+    search_college TEXT DEFAULT NULL,
+    search_graduation_year INTEGER DEFAULT NULL,
+    search_zip_code TEXT DEFAULT NULL
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    helper_count INTEGER;
+BEGIN
+    SELECT COUNT(*)
+    INTO helper_count
+    FROM public.helpers h
+    WHERE
+        (search_query IS NULL OR h.search_vector @@ plainto_tsquery('english', search_query))
+        AND (search_college IS NULL OR h.college ILIKE '%' || search_college || '%')
+        AND (search_graduation_year IS NULL OR h.graduation_year = search_graduation_year)
+        AND (search_zip_code IS NULL OR h.zip_code = search_zip_code);
+
+    RETURN helper_count;
+END;
+$$;
+
+COMMIT;
@@ -0,0 +1,32 @@
+-- Migration: Remove dead push tokens in one statement
+-- Tokens APNs reports as unregistered were dropped by reading the helper's
+-- token array and writing a filtered copy back, which lost any token the
+-- helper registered in between. remove_helper_push_tokens filters the array
+-- inside a single UPDATE instead.
+BEGIN;
+
+-- Drops dead_tokens from the helper's push tokens, keeping the rest in order
+CREATE OR REPLACE FUNCTION public.remove_helper_push_tokens(
+    token_helper_id UUID,
+    dead_tokens TEXT[]
+)
+RETURNS VOID
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    UPDATE public.helpers h
+    SET push_notification_token = ARRAY(
+        SELECT kept.token
+        FROM unnest(h.push_notification_token) WITH ORDINALITY AS kept(token, position)
+        WHERE kept.token <> ALL (dead_tokens)
+        ORDER BY kept.position
+    )
+    WHERE h.id = token_helper_id
+      AND h.push_notification_token && dead_tokens;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.remove_helper_push_tokens(UUID, TEXT[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.remove_helper_push_tokens(UUID, TEXT[]) TO service_role;
+
+COMMIT;
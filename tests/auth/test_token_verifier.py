@@ -0,0 +1,92 @@
+"""
+Unit tests for local Supabase access-token verification
+"""
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from app.schemas.auth import CurrentUser
+from app.services.token_verifier import (
+    LocalVerificationUnavailable,
+    TokenVerificationError,
+    TokenVerifier,
+)
+
+SUPABASE_URL = "https://project.supabase.co"
+SECRET = "super-secret-jwt-token-with-at-least-32-characters"
+
+
+def make_claims(**overrides):
+    claims = {
+        "sub": "6f1c1a4e-0000-4000-8000-000000000001",
+        "email": "helper@tufts.edu",
+        "phone": "16175550100",
+        "aud": "authenticated",
+        "iss": f"{SUPABASE_URL}/auth/v1",
+        "exp": int(time.time()) + 3600,
+    }
+    claims.update(overrides)
+    return claims
+
+
+@pytest.mark.asyncio
+async def test_hs256_token_is_verified_and_cached():
+    verifier = TokenVerifier(SUPABASE_URL, jwt_secret=SECRET)
+    token = jwt.encode(make_claims(), SECRET, algorithm="HS256")
+
+    user = await verifier.verify(token)
+
+    assert user.id == "6f1c1a4e-0000-4000-8000-000000000001"
+    assert user.email == "helper@tufts.edu"
+    assert verifier.get_cached_user(token) is user
+
+
+@pytest.mark.asyncio
+async def test_expired_and_foreign_tokens_are_rejected():
+    verifier = TokenVerifier(SUPABASE_URL, jwt_secret=SECRET)
+    expired = jwt.encode(make_claims(exp=int(time.time()) - 60), SECRET, algorithm="HS256")
+    forged = jwt.encode(make_claims(), "another-secret-that-is-also-32-chars-long", algorithm="HS256")
+    wrong_issuer = jwt.encode(make_claims(iss="https://evil.example/auth/v1"), SECRET, algorithm="HS256")
+
+    for token in (expired, forged, wrong_issuer):
+        with pytest.raises(TokenVerificationError):
+            await verifier.verify(token)
+
+
+@pytest.mark.asyncio
+async def test_hs256_without_secret_defers_to_remote_check():
+    verifier = TokenVerifier(SUPABASE_URL)
+    token = jwt.encode(make_claims(), SECRET, algorithm="HS256")
+
+    with pytest.raises(LocalVerificationUnavailable):
+        await verifier.verify(token)
+
+
+@pytest.mark.asyncio
+async def test_es256_token_is_verified_against_cached_jwks():
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    jwk = jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    jwk.update({"kid": "key-1", "alg": "ES256"})
+
+    verifier = TokenVerifier(SUPABASE_URL)
+    verifier._keys = {"key-1": jwt.PyJWK(jwk)}
+    verifier._keys_fetched_at = time.monotonic()
+    token = jwt.encode(make_claims(), private_key, algorithm="ES256", headers={"kid": "key-1"})
+
+    user = await verifier.verify(token)
+
+    assert user.phone == "16175550100"
+
+
+def test_user_cache_is_bounded_and_respects_token_expiry():
+    verifier = TokenVerifier(SUPABASE_URL, user_cache_size=2)
+    user = CurrentUser(id=make_claims()["sub"])
+    for token in ("a", "b", "c"):
+        verifier.cache_user(token, user)
+    verifier.cache_user("expired", user, token_exp=time.time() - 1)
+
+    assert verifier.get_cached_user("a") is None
+    assert verifier.get_cached_user("c") is user
+    assert verifier.get_cached_user("expired") is None
@@ -0,0 +1,215 @@
+"""
+Shared helpers for the benchmark scripts in this directory.
+
+Benchmarks talk to local stand-in servers, so placeholder settings are enough
+to import the app modules.
+"""
+import multiprocessing
+import os
+import socket
+import time
+from contextlib import contextmanager
+
+_PLACEHOLDER_ENV = {
+    "SUPABASE_URL": "http://127.0.0.1:54321",
+    "SUPABASE_ANON_KEY": "bench.anon.key",
+    "SUPABASE_SERVICE_ROLE_KEY": "bench.service.key",
+    "STRIPE_SECRET_KEY": "sk_test_bench",
+    "STRIPE_PUBLISHABLE_KEY": "pk_test_bench",
+    "STRIPE_WEBHOOK_SECRET": "whsec_bench",
+    "STRIPE_PREMIUM_PRICE_ID": "price_bench",
+    "STRIPE_ONE_TIME_POST_PRICE_ID": "price_bench",
+    "FRONTEND_URL": "http://localhost:3000",
+    "OPENPHONE_API_KEY": "bench",
+    "OPENPHONE_FROM_NUMBER": "+15550000000",
+    "OPENAI_API_KEY": "bench",
+    "EMAIL_PASSWORD": "bench",
+    "HELPER_MOBILE_APP_BUNDLE_ID": "com.helperu.bench",
+    "HELPER_PUSH_NOTIFICATION_P8_ID": "BENCH",
+    "PUSH_TOKEN_SECRET": "bench",
+    "APPLE_ID": "BENCH",
+}
+
+
+def load_placeholder_env() -> None:
+    """Fill in any settings the app needs that are not already in the environment"""
+    for key, value in _PLACEHOLDER_ENV.items():
+        os.environ.setdefault(key, value)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def write_self_signed_cert(directory: str):
+    """Write a throwaway certificate and key for 127.0.0.1; returns their paths"""
+    import datetime
+    import ipaddress
+
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ))
+    return cert_path, key_path
+
+
+def _run_server(factory, args, port: int) -> None:
+    import uvicorn
+
+    uvicorn.run(factory(*args), host="127.0.0.1", port=port, log_level="warning")
+
+
+@contextmanager
+def serve_in_process(factory, *args, port: int = 0):
+    """Serve ``factory(*args)`` with uvicorn in a child process for the duration of the block
+
+    A separate process keeps the stand-in server from competing with the
+    benchmark client for the GIL.
+    """
+    port = port or free_port()
+    process = multiprocessing.Process(
+        target=_run_server, args=(factory, args, port), daemon=True
+    )
+    process.start()
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError("stand-in server did not start")
+            time.sleep(0.05)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        process.join()
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MIGRATIONS_DIR = os.path.join(REPO_ROOT, "db", "migrations")
+
+
+def read_migration(name: str) -> str:
+    with open(os.path.join(MIGRATIONS_DIR, name)) as f:
+        return f.read()
+
+
+@contextmanager
+def postgres_database():
+    """Yield a connection string for a scratch Postgres database
+
+    Uses BENCH_DATABASE_URL when set (the database is used as-is, so point it
+    at something disposable); otherwise starts a throwaway server with the
+    ``pgserver`` package.
+    """
+    url = os.environ.get("BENCH_DATABASE_URL")
+    if url:
+        yield url
+        return
+    try:
+        import pgserver
+    except ImportError:
+        raise RuntimeError(
+            "Set BENCH_DATABASE_URL or `pip install pgserver` to run database benchmarks"
+        )
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        server = pgserver.get_server(data_dir, cleanup_mode="stop")
+        try:
+            yield server.get_uri()
+        finally:
+            server.cleanup()
+
+
+# The tables the search RPCs read, as created by 0001 (minus auth triggers and
+# policies), so later migrations can be applied on a bare Postgres. tasks.hourly_rate
+# is REAL, which is what the search RPCs return.
+SEARCH_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS public.zip_codes (
+  zip_code TEXT PRIMARY KEY,
+  state TEXT NOT NULL,
+  city TEXT NOT NULL,
+  lat DECIMAL NOT NULL,
+  lng DECIMAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS public.clients (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  phone TEXT NOT NULL UNIQUE,
+  email TEXT NOT NULL UNIQUE,
+  first_name TEXT NOT NULL,
+  last_name TEXT NOT NULL,
+  pfp_url TEXT,
+  number_of_posts INTEGER NOT NULL DEFAULT 0,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE TABLE IF NOT EXISTS public.helpers (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  email TEXT NOT NULL UNIQUE,
+  phone TEXT NOT NULL UNIQUE,
+  first_name TEXT NOT NULL,
+  last_name TEXT NOT NULL,
+  pfp_url TEXT,
+  college TEXT NOT NULL,
+  bio TEXT NOT NULL,
+  graduation_year INTEGER NOT NULL,
+  zip_code TEXT NOT NULL REFERENCES public.zip_codes(zip_code) ON DELETE CASCADE,
+  number_of_applications INTEGER NOT NULL DEFAULT 0,
+  invited_count INTEGER NOT NULL DEFAULT 0,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE TABLE IF NOT EXISTS public.tasks (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  client_id UUID NOT NULL REFERENCES public.clients(id) ON DELETE CASCADE,
+  hourly_rate REAL NOT NULL,
+  title TEXT NOT NULL,
+  dates JSONB NOT NULL,
+  location_type TEXT NOT NULL,
+  zip_code TEXT REFERENCES public.zip_codes(zip_code) ON DELETE CASCADE,
+  description TEXT NOT NULL,
+  tools_info TEXT,
+  public_transport_info TEXT,
+  completed_at TIMESTAMPTZ,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE TABLE IF NOT EXISTS public.applications (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  task_id UUID NOT NULL REFERENCES public.tasks(id) ON DELETE CASCADE,
+  helper_id UUID NOT NULL REFERENCES public.helpers(id) ON DELETE CASCADE,
+  read_at TIMESTAMPTZ,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
@@ -0,0 +1,183 @@
+"""
+Sending one push to many devices: a client per token vs the shared APNsClient.
+
+A local HTTP/2-over-TLS stand-in for APNs answers every push with 200 after a
+fixed delay and counts the TLS connections it accepts. The "per-token" side
+reproduces the previous NotificationService path (sign an ES256 provider token
+and open a new httpx.AsyncClient for every device); the other side sends
+through one APNsClient, which reuses a single multiplexed connection and one
+cached provider token.
+
+Run from the repository root:
+
+    python -m tests.benchmarks.bench_apns --tokens 1000 --latency 0.02
+"""
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import ssl
+import tempfile
+import time
+import uuid
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from tests.benchmarks._support import free_port, load_placeholder_env, write_self_signed_cert
+
+load_placeholder_env()
+
+from app.services.apns_client import APNsClient  # noqa: E402
+
+TOPIC = "com.helperu.bench"
+
+
+def run_fake_apns(port: int, cert_path: str, key_path: str, latency: float, connections) -> None:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.exceptions
+    import h2.settings
+
+    class APNsProtocol(asyncio.Protocol):
+        def connection_made(self, transport):
+            with connections.get_lock():
+                connections.value += 1
+            self.transport = transport
+            self.conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False))
+            self.conn.initiate_connection()
+            # APNs advertises on the order of 1000 concurrent streams
+            self.conn.update_settings({h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: 1000})
+            transport.write(self.conn.data_to_send())
+
+        def data_received(self, data):
+            try:
+                events = self.conn.receive_data(data)
+            except h2.exceptions.ProtocolError:
+                self.transport.close()
+                return
+            for event in events:
+                if isinstance(event, h2.events.DataReceived):
+                    self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                elif isinstance(event, h2.events.StreamEnded):
+                    asyncio.get_running_loop().call_later(latency, self.respond, event.stream_id)
+            self.transport.write(self.conn.data_to_send())
+
+        def respond(self, stream_id):
+            try:
+                self.conn.send_headers(
+                    stream_id, [(":status", "200"), ("apns-id", str(uuid.uuid4()))], end_stream=True
+                )
+            except h2.exceptions.H2Error:
+                return
+            self.transport.write(self.conn.data_to_send())
+
+    async def serve():
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(cert_path, key_path)
+        context.set_alpn_protocols(["h2"])
+        server = await asyncio.get_running_loop().create_server(
+            APNsProtocol, "127.0.0.1", port, ssl=context, backlog=4096
+        )
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+async def send_per_token(url: str, tokens, payload, signing_key: str, verify) -> float:
+    """The previous path: a provider token and a new HTTP/2 client for every device"""
+
+    async def send(token):
+        provider_token = jwt.encode(
+            {"iss": "BENCHTEAM", "iat": int(time.time())},
+            signing_key,
+            algorithm="ES256",
+            headers={"alg": "ES256", "kid": "BENCHKEY"},
+        )
+        async with httpx.AsyncClient(http2=True, verify=verify) as client:
+            response = await client.post(
+                f"{url}/3/device/{token}",
+                headers={"authorization": f"bearer {provider_token}", "apns-topic": TOPIC},
+                json=payload,
+            )
+            return response.status_code
+
+    started = time.perf_counter()
+    statuses = await asyncio.gather(*(send(token) for token in tokens), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    assert all(status == 200 for status in statuses), {repr(s) for s in statuses if s != 200}
+    return elapsed
+
+
+async def send_shared(url: str, tokens, payload, signing_key: str, verify) -> float:
+    client = APNsClient(
+        url, topic=TOPIC, key_id="BENCHKEY", team_id="BENCHTEAM", private_key=signing_key, verify=verify
+    )
+    try:
+        started = time.perf_counter()
+        results = await client.send_many(tokens, payload)
+        elapsed = time.perf_counter() - started
+    finally:
+        await client.aclose()
+    assert all(isinstance(r, dict) and r["status"] == 200 for r in results), results[:3]
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.02, help="stand-in response delay in seconds")
+    args = parser.parse_args()
+
+    signing_key = ec.generate_private_key(ec.SECP256R1()).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    tokens = [uuid.uuid4().hex * 2 for _ in range(args.tokens)]
+    payload = {"aps": {"alert": {"title": "New Message", "body": "Benchmark push"}}}
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = write_self_signed_cert(directory)
+        verify = ssl.create_default_context(cafile=cert_path)
+        port = free_port()
+        connections = multiprocessing.Value("i", 0)
+        server = multiprocessing.Process(
+            target=run_fake_apns,
+            args=(port, cert_path, key_path, args.latency, connections),
+            daemon=True,
+        )
+        server.start()
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("stand-in APNs server did not start")
+                time.sleep(0.05)
+        url = f"https://127.0.0.1:{port}"
+
+        try:
+            results = []
+            for label, runner in (("client per token", send_per_token), ("shared APNsClient", send_shared)):
+                with connections.get_lock():
+                    connections.value = 0
+                elapsed = asyncio.run(runner(url, tokens, payload, signing_key, verify))
+                results.append((label, elapsed, connections.value))
+        finally:
+            server.terminate()
+            server.join()
+
+    print(f"{args.tokens} pushes, stand-in latency {args.latency * 1000:.0f}ms")
+    print(f"{'path':<20} {'seconds':>9} {'pushes/s':>10} {'TLS conns':>10}")
+    for label, elapsed, opened in results:
+        print(f"{label:<20} {elapsed:>9.2f} {args.tokens / elapsed:>10.0f} {opened:>10}")
+    print(f"speedup {results[0][1] / results[1][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Concurrent throughput of the blocking Supabase client vs the pooled async client.
+
+A local stand-in for PostgREST answers every request after a fixed delay. Each
+simulated API request runs one table query inside an ``async def`` handler, the
+same way the services do. With the blocking client the event loop stalls on
+every round trip, so requests are served one after another; with the pooled
+async client they overlap.
+
+Run from the repository root:
+
+    python -m tests.benchmarks.bench_async_data_layer --requests 200 --latency 0.02
+"""
+import argparse
+import asyncio
+import time
+
+from tests.benchmarks._support import load_placeholder_env, serve_in_process
+
+load_placeholder_env()
+
+from fastapi import FastAPI  # noqa: E402
+from supabase import create_client  # noqa: E402
+
+from app.services.supabase_client import PooledAsyncClient  # noqa: E402
+
+
+def build_fake_postgrest(latency: float) -> FastAPI:
+    fake = FastAPI()
+
+    @fake.get("/rest/v1/tasks")
+    async def tasks():
+        await asyncio.sleep(latency)
+        return [{"id": "00000000-0000-0000-0000-000000000000", "title": "bench"}]
+
+    return fake
+
+
+async def run_blocking(url: str, key: str, total: int) -> float:
+    client = create_client(url, key)
+
+    async def handler():
+        client.table("tasks").select("*").execute()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(total)))
+    return time.perf_counter() - start
+
+
+async def run_pooled(url: str, key: str, total: int) -> float:
+    client = PooledAsyncClient(url, key)
+
+    async def handler():
+        await client.table("tasks").select("*").execute()
+
+    # Warm the pool so the comparison measures steady state
+    await handler()
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    await client.postgrest.aclose()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per PostgREST call")
+    args = parser.parse_args()
+
+    key = "bench.service.key"
+    with serve_in_process(build_fake_postgrest, args.latency) as url:
+        blocking = asyncio.run(run_blocking(url, key, args.requests))
+        pooled = asyncio.run(run_pooled(url, key, args.requests))
+
+    print(f"{args.requests} concurrent requests, {args.latency * 1000:.0f} ms per query")
+    print(f"  blocking client : {blocking:7.3f}s  {args.requests / blocking:8.1f} req/s")
+    print(f"  pooled async    : {pooled:7.3f}s  {args.requests / pooled:8.1f} req/s")
+    print(f"  speedup         : {blocking / pooled:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Concurrent email sends: an smtplib session per message vs the pooled SMTPPool.
+
+A local SMTP sink (tests/benchmarks/smtp_sink.py) with STARTTLS and a fixed
+round-trip delay runs in a child process. The "per message" side reproduces
+the previous EmailUtils.send_email (connect, STARTTLS, login, send, quit,
+all blocking inside the coroutine); the other side is EmailUtils on an
+SMTPPool, which keeps a few authenticated aiosmtplib sessions open and
+reuses them. A ticker task records the worst event loop stall.
+
+Run from the repository root:
+
+    python -m tests.benchmarks.bench_email --messages 100 --latency 0.02
+"""
+import argparse
+import asyncio
+import multiprocessing
+import smtplib
+import socket
+import ssl
+import tempfile
+import time
+from email.mime.text import MIMEText
+
+from tests.benchmarks._support import free_port, load_placeholder_env, write_self_signed_cert
+from tests.benchmarks.smtp_sink import SMTPSink
+
+load_placeholder_env()
+
+from app.services.smtp_pool import SMTPPool  # noqa: E402
+from app.utils.emailer import EmailUtils  # noqa: E402
+
+SENDER = "info@helperu.com"
+PASSWORD = "bench"
+
+
+def run_sink(port: int, latency: float, cert_path: str, key_path: str) -> None:
+    async def serve():
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(cert_path, key_path)
+        sink = SMTPSink(latency, ssl_context=context, username=SENDER, password=PASSWORD)
+        server = await sink.start(port=port)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+async def measure(send_all) -> tuple:
+    """Run ``send_all`` while sampling event loop lag; returns (seconds, worst stall)"""
+    worst = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal worst
+        while not done.is_set():
+            before = time.perf_counter()
+            await asyncio.sleep(0.01)
+            worst = max(worst, time.perf_counter() - before - 0.01)
+
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await send_all()
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick
+    return elapsed, worst
+
+
+async def run_per_message(port: int, total: int, context: ssl.SSLContext) -> tuple:
+    async def send(i):
+        # The previous transport: a fresh blocking session for every message
+        message = MIMEText(f"Benchmark message {i}")
+        message["From"], message["To"], message["Subject"] = SENDER, f"user{i}@example.com", "Bench"
+        server = smtplib.SMTP("127.0.0.1", port)
+        server.starttls(context=context)
+        server.login(SENDER, PASSWORD)
+        server.sendmail(SENDER, [f"user{i}@example.com"], message.as_string())
+        server.quit()
+
+    async def send_all():
+        await asyncio.gather(*(send(i) for i in range(total)))
+
+    return await measure(send_all) + (total,)
+
+
+async def run_pooled(port: int, total: int, context: ssl.SSLContext, connections: int) -> tuple:
+    pool = SMTPPool(
+        "127.0.0.1", port, username=SENDER, password=PASSWORD, ssl_context=context, max_connections=connections
+    )
+    emailer = EmailUtils(pool=pool)
+
+    async def send_all():
+        results = await asyncio.gather(*(
+            emailer.send_email(f"user{i}@example.com", "Bench", f"Benchmark message {i}") for i in range(total)
+        ))
+        assert all(results)
+
+    try:
+        return await measure(send_all) + (pool.connections_opened,)
+    finally:
+        await pool.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.02, help="sink round-trip delay in seconds")
+    parser.add_argument("--connections", type=int, default=2, help="SMTPPool max_connections")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = write_self_signed_cert(directory)
+        context = ssl.create_default_context(cafile=cert_path)
+        port = free_port()
+        sink = multiprocessing.Process(
+            target=run_sink, args=(port, args.latency, cert_path, key_path), daemon=True
+        )
+        sink.start()
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("SMTP sink did not start")
+                time.sleep(0.05)
+        try:
+            per_message = asyncio.run(run_per_message(port, args.messages, context))
+            pooled = asyncio.run(run_pooled(port, args.messages, context, args.connections))
+        finally:
+            sink.terminate()
+            sink.join()
+
+    print(f"{args.messages} emails, sink round trip {args.latency * 1000:.0f}ms, STARTTLS + AUTH")
+    print(f"{'transport':<26} {'seconds':>8} {'emails/s':>9} {'sessions':>9} {'worst loop stall':>17}")
+    for label, (elapsed, stall, sessions) in (
+        ("smtplib per message", per_message),
+        (f"SMTPPool (x{args.connections})", pooled),
+    ):
+        print(
+            f"{label:<26} {elapsed:>8.2f} {args.messages / elapsed:>9.1f} {sessions:>9} {stall * 1000:>15.0f}ms"
+        )
+    print(f"speedup {per_message[0] / pooled[0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Helper search before and after the stored tsvector and single-call RPC.
+
+Seeds a scratch Postgres with synthetic helpers, then times searches the way
+HelperService made them with the 0003 functions (count_helpers_matching_criteria
+then get_helpers_matching_criteria, each rebuilding to_tsvector per row) and
+again after applying 0014 (one search_helpers call against the stored,
+GIN-indexed search_vector, total from count(*) OVER ()). Both must return the
+same page and total.
+
+Needs ``psycopg`` plus either ``pgserver`` or BENCH_DATABASE_URL pointing at a
+disposable database. Run from the repository root:
+
+    python -m tests.benchmarks.bench_helper_search --helpers 100000
+"""
+import argparse
+import statistics
+import time
+
+from tests.benchmarks._support import (
+    SEARCH_SCHEMA_SQL,
+    postgres_database,
+    read_migration,
+)
+
+# (search_query, search_college, search_graduation_year)
+SEARCHES = (
+    ("calculus", None, None),
+    ("moving help", None, None),
+    ("tutor", "Tufts", None),
+    (None, "Boston", 2025),
+    ("photography", None, 2025),
+)
+
+SKILLS = (
+    "calculus tutor", "moving help", "dog walking", "photography", "furniture assembly",
+    "spanish lessons", "yard work", "coding bootcamp mentor", "cleaning", "piano teacher",
+)
+COLLEGES = ("Tufts University", "Boston University", "Northeastern", "Harvard", "MIT", "Boston College")
+
+
+def seed(conn, helpers: int) -> None:
+    conn.execute(
+        "INSERT INTO zip_codes (zip_code, state, city, lat, lng) "
+        "SELECT lpad(i::text, 5, '0'), 'MA', 'City ' || i, 42, -71 FROM generate_series(1, 100) AS i"
+    )
+    conn.execute(
+        """
+        INSERT INTO helpers (email, phone, first_name, last_name, college, bio,
+                             graduation_year, zip_code, created_at)
+        SELECT 'helper' || i || '@example.com',
+               '+1666' || lpad(i::text, 7, '0'),
+               'First' || (i %% 997),
+               'Last' || (i %% 991),
+               (%s::text[])[1 + i %% %s],
+               'I can help with ' || (%s::text[])[1 + i %% %s] || ' and '
+                   || (%s::text[])[1 + (i / 7) %% %s] || '. Helper number ' || i || '.',
+               2024 + i %% 4,
+               lpad((1 + i %% 100)::text, 5, '0'),
+               now() - make_interval(mins => i)
+        FROM generate_series(1, %s) AS i
+        """,
+        (list(COLLEGES), len(COLLEGES), list(SKILLS), len(SKILLS), list(SKILLS), len(SKILLS), helpers),
+    )
+    conn.execute("ANALYZE")
+
+
+def search_before(conn, query, college, year):
+    params = (query, college, year, None)
+    total = conn.execute("SELECT count_helpers_matching_criteria(%s, %s, %s, %s)", params).fetchone()[0]
+    rows = conn.execute(
+        "SELECT id FROM get_helpers_matching_criteria(%s, %s, %s, %s, 20, 0)", params
+    ).fetchall()
+    return total, [row[0] for row in rows]
+
+
+def search_after(conn, query, college, year):
+    rows = conn.execute(
+        "SELECT id, total_count FROM search_helpers(%s, %s, %s, %s, 20, 0)", (query, college, year, None)
+    ).fetchall()
+    return (rows[0][1] if rows else 0), [row[0] for row in rows]
+
+
+def time_searches(conn, search, repeats: int):
+    timings, results = {}, {}
+    for params in SEARCHES:
+        samples = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            results[params] = search(conn, *params)
+            samples.append(time.perf_counter() - started)
+        timings[params] = statistics.median(samples)
+    return timings, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--helpers", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    import psycopg
+
+    with postgres_database() as url, psycopg.connect(url, autocommit=True) as conn:
+        conn.execute(SEARCH_SCHEMA_SQL)
+        conn.execute(read_migration("0003_add_distance_calculation.sql"))
+        started = time.perf_counter()
+        seed(conn, args.helpers)
+        print(f"seeded {args.helpers} helpers in {time.perf_counter() - started:.1f}s")
+
+        before, before_results = time_searches(conn, search_before, args.repeats)
+        started = time.perf_counter()
+        conn.execute(read_migration("0014_helper_full_text_search.sql"))
+        conn.execute("ANALYZE")
+        print(f"applied 0014 (stored search_vector) in {time.perf_counter() - started:.1f}s")
+        after, after_results = time_searches(conn, search_after, args.repeats)
+
+        if before_results != after_results:
+            raise SystemExit("search_helpers returned a different page or total")
+
+        print(f"{'search':<32} {'matches':>8} {'count+page ms':>14} {'single ms':>10} {'speedup':>9}")
+        for params in SEARCHES:
+            label = " / ".join(str(p) for p in params if p is not None)
+            print(
+                f"{label:<32} {after_results[params][0]:>8} {before[params] * 1000:>14.1f}"
+                f" {after[params] * 1000:>10.1f} {before[params] / after[params]:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
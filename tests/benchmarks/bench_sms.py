@@ -0,0 +1,124 @@
+"""
+Concurrent SMS sends: blocking requests.post vs the pooled async OpenPhoneClient.
+
+Both sides send the same batch of message notifications to the local fake
+OpenPhone server (tests/benchmarks/fake_openphone.py) from ``async def``
+callers, the way the notification workers do, while a ticker task measures how
+long the event loop is stalled. The "blocking" side reproduces the previous
+SMSUtils._send_sms (requests.post inside the coroutine); the other side is
+SMSUtils on the shared async client. A final run adds server-side throttling
+to show that 429 retries still deliver every message.
+
+Run from the repository root:
+
+    python -m tests.benchmarks.bench_sms --messages 200 --latency 0.2
+"""
+import argparse
+import asyncio
+import time
+
+import requests
+
+from tests.benchmarks._support import load_placeholder_env, serve_in_process
+from tests.benchmarks.fake_openphone import build_fake_openphone
+
+load_placeholder_env()
+
+from app.schemas.sms import MessageNotification  # noqa: E402
+from app.services.openphone_client import OpenPhoneClient  # noqa: E402
+from app.utils.sms import SMSUtils  # noqa: E402
+
+
+def notifications(total: int):
+    return [
+        MessageNotification(
+            recipient_phone=f"+1555{i:07d}", sender_name="Bench Sender", chat_id="bench", message_preview="hello"
+        )
+        for i in range(total)
+    ]
+
+
+async def measure(send_all) -> tuple:
+    """Run ``send_all`` while sampling event loop lag; returns (seconds, worst stall)"""
+    worst = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal worst
+        while not done.is_set():
+            before = time.perf_counter()
+            await asyncio.sleep(0.01)
+            worst = max(worst, time.perf_counter() - before - 0.01)
+
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await send_all()
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick
+    return elapsed, worst
+
+
+async def run_blocking(url: str, batch) -> tuple:
+    async def send(notification):
+        # The previous transport: a blocking call inside the coroutine
+        response = requests.post(
+            f"{url}/messages",
+            headers={"Authorization": "bench", "Content-Type": "application/json"},
+            json={"from": "+15550000000", "to": [notification.recipient_phone], "content": "hello"},
+            timeout=30,
+        )
+        assert response.status_code == 202
+
+    async def send_all():
+        await asyncio.gather(*(send(n) for n in batch))
+
+    return await measure(send_all)
+
+
+async def run_pooled(url: str, batch, concurrency: int) -> tuple:
+    client = OpenPhoneClient(url, "bench", max_concurrency=concurrency, backoff_base=0.1)
+    sms = SMSUtils(client=client)
+
+    async def send_all():
+        await asyncio.gather(*(sms.send_message_notification(n) for n in batch))
+
+    try:
+        return await measure(send_all)
+    finally:
+        await client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake OpenPhone response time in seconds")
+    parser.add_argument("--concurrency", type=int, default=10, help="OpenPhoneClient max_concurrency")
+    args = parser.parse_args()
+    batch = notifications(args.messages)
+
+    with serve_in_process(build_fake_openphone, args.latency) as base:
+        url = f"{base}/v1"
+        blocking = asyncio.run(run_blocking(url, batch))
+        pooled = asyncio.run(run_pooled(url, batch, args.concurrency))
+
+    # Throttled to 50 req/s: 429 retries must still land every message
+    with serve_in_process(build_fake_openphone, args.latency, 50) as base:
+        throttled = asyncio.run(run_pooled(f"{base}/v1", batch, args.concurrency))
+        stats = requests.get(f"{base}/v1/stats", timeout=5).json()
+
+    print(f"{args.messages} SMS, fake OpenPhone latency {args.latency * 1000:.0f}ms")
+    print(f"{'transport':<28} {'seconds':>8} {'msgs/s':>8} {'worst loop stall':>17}")
+    for label, (elapsed, stall) in (
+        ("blocking requests.post", blocking),
+        (f"OpenPhoneClient (x{args.concurrency})", pooled),
+        ("  + 429s", throttled),
+    ):
+        print(f"{label:<28} {elapsed:>8.2f} {args.messages / elapsed:>8.1f} {stall * 1000:>15.0f}ms")
+    print(
+        f"throttled run: {stats['accepted']} delivered, {stats['throttled']} 429s retried"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+get_tasks_with_distance before and after the bounding-box prefilter.
+
+Seeds a scratch Postgres with synthetic zip codes spread over the continental
+US and a few hundred thousand tasks, then times radius searches with the
+0004 definition (Haversine on every open task) and again after applying 0005
+(index lookup of the zips inside the radius). Both versions must return the
+same page.
+
+Needs ``psycopg`` plus either ``pgserver`` or BENCH_DATABASE_URL pointing at a
+disposable database. Run from the repository root:
+
+    python -m tests.benchmarks.bench_task_distance_search --tasks 300000
+"""
+import argparse
+import statistics
+import time
+
+from tests.benchmarks._support import (
+    SEARCH_SCHEMA_SQL,
+    postgres_database,
+    read_migration,
+)
+
+RADII = (10, 25, 50, 100)
+
+
+def seed(conn, zips: int, tasks: int) -> None:
+    conn.execute("SELECT setseed(0.42)")
+    conn.execute(
+        """
+        INSERT INTO zip_codes (zip_code, state, city, lat, lng)
+        SELECT lpad(i::text, 5, '0'), 'ST', 'City ' || i,
+               round((25 + random() * 24)::numeric, 6),
+               round((-124 + random() * 57)::numeric, 6)
+        FROM generate_series(1, %s) AS i
+        """,
+        (zips,),
+    )
+    conn.execute(
+        """
+        INSERT INTO clients (phone, email, first_name, last_name)
+        SELECT '+1555' || lpad(i::text, 7, '0'), 'client' || i || '@example.com', 'Client', 'No' || i
+        FROM generate_series(1, 2000) AS i
+        """
+    )
+    conn.execute(
+        """
+        WITH ids AS (SELECT array_agg(id) AS ids FROM clients)
+        INSERT INTO tasks (client_id, hourly_rate, title, dates, location_type, zip_code,
+                           description, completed_at, created_at)
+        SELECT ids.ids[1 + i %% 2000],
+               15 + (i %% 30),
+               'Task ' || i,
+               '[]'::jsonb,
+               CASE WHEN i %% 20 = 0 THEN 'remote' ELSE 'in_person' END,
+               CASE WHEN i %% 50 = 1 THEN NULL
+                    ELSE lpad((1 + (i::bigint * 7919) %% %s)::text, 5, '0') END,
+               'Synthetic task number ' || i,
+               CASE WHEN i %% 10 = 0 THEN now() END,
+               now() - make_interval(mins => i)
+        FROM generate_series(1, %s) AS i, ids
+        """,
+        (zips, tasks),
+    )
+    conn.execute("ANALYZE")
+
+
+def time_searches(conn, origins, repeats: int):
+    timings = {}
+    pages = {}
+    for radius in RADII:
+        samples = []
+        for origin in origins:
+            for _ in range(repeats):
+                started = time.perf_counter()
+                rows = conn.execute(
+                    "SELECT id FROM get_tasks_with_distance(%s, NULL, NULL, NULL, NULL, 20, 0, %s)",
+                    (origin, radius),
+                ).fetchall()
+                samples.append(time.perf_counter() - started)
+            pages[(origin, radius)] = rows
+        timings[radius] = statistics.median(samples)
+    return timings, pages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=300_000)
+    parser.add_argument("--zips", type=int, default=30_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    import psycopg
+
+    with postgres_database() as url, psycopg.connect(url, autocommit=True) as conn:
+        conn.execute(SEARCH_SCHEMA_SQL)
+        for name in ("0003_add_distance_calculation.sql", "0004_task_search_keyset_pagination.sql"):
+            conn.execute(read_migration(name))
+        started = time.perf_counter()
+        seed(conn, args.zips, args.tasks)
+        print(f"seeded {args.tasks} tasks over {args.zips} zips in {time.perf_counter() - started:.1f}s")
+
+        origins = [row[0] for row in conn.execute(
+            "SELECT zip_code FROM zip_codes ORDER BY zip_code LIMIT 5 OFFSET 1000"
+        )]
+
+        before, before_pages = time_searches(conn, origins, args.repeats)
+        conn.execute(read_migration("0005_task_distance_bounding_box.sql"))
+        conn.execute("ANALYZE")
+        after, after_pages = time_searches(conn, origins, args.repeats)
+
+        if before_pages != after_pages:
+            raise SystemExit("prefiltered search returned different pages")
+
+        print(f"{'radius':>8} {'full scan ms':>14} {'bbox ms':>10} {'speedup':>9}")
+        for radius in RADII:
+            print(
+                f"{radius:>8} {before[radius] * 1000:>14.1f} {after[radius] * 1000:>10.1f}"
+                f" {before[radius] / after[radius]:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
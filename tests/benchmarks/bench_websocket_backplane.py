@@ -0,0 +1,109 @@
+"""
+Cross-worker WebSocket fan-out over the Postgres LISTEN/NOTIFY backplane.
+
+Starts several WebSocketManagers, each with its own PostgresBackplane (so its
+own LISTEN connection, as a separate uvicorn worker would have) and one fake
+socket in a shared chat. One manager broadcasts a stream of chat messages; the
+script checks every other manager delivered each frame exactly once, in order,
+and reports delivery latency at the offered rate.
+
+Needs ``psycopg`` plus either ``pgserver`` or BENCH_DATABASE_URL. Run from the
+repository root:
+
+    python -m tests.benchmarks.bench_websocket_backplane --workers 4 --messages 2000 --rate 1000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from tests.benchmarks._support import load_placeholder_env, postgres_database
+
+load_placeholder_env()
+
+from app.schemas.chat import MessageResponse, WebSocketChatMessage  # noqa: E402
+from app.services.websocket_backplane import PostgresBackplane  # noqa: E402
+from app.services.websocket_manager import WebSocketManager  # noqa: E402
+
+
+class TimingSocket:
+    def __init__(self, sent_at):
+        self.sent_at = sent_at
+        self.received = []
+        self.latencies = []
+
+    async def send_text(self, text):
+        message_id = WebSocketChatMessage.model_validate_json(text).message.id
+        self.latencies.append(time.perf_counter() - self.sent_at[message_id])
+        self.received.append(message_id)
+
+
+async def run(url: str, workers: int, messages: int, rate: float) -> None:
+    interval = 1 / rate
+    managers = [WebSocketManager(PostgresBackplane(url)) for _ in range(workers)]
+    for manager in managers:
+        await manager.start()
+    await asyncio.gather(*(m.backplane.listening.wait() for m in managers))
+
+    chat_id = uuid4()
+    sent_at = {}
+    sockets = [TimingSocket(sent_at) for _ in managers]
+    for manager, socket in zip(managers, sockets):
+        await manager.connect(socket, chat_id)
+
+    now = datetime.now(timezone.utc)
+    frames = [
+        WebSocketChatMessage(
+            chat_id=chat_id,
+            message=MessageResponse(
+                id=uuid4(), chat_id=chat_id, sender_id=uuid4(), content=f"message {i}",
+                read_at=None, created_at=now, updated_at=now,
+            ),
+        )
+        for i in range(messages)
+    ]
+
+    started = time.perf_counter()
+    for frame in frames:
+        sent_at[frame.message.id] = time.perf_counter()
+        await managers[0].broadcast_chat_message(chat_id, frame)
+        # Broadcasts only queue; pace them like a stream of send requests
+        await asyncio.sleep(interval)
+    deadline = time.monotonic() + 30
+    while any(len(s.received) < messages for s in sockets):
+        if time.monotonic() > deadline:
+            raise SystemExit("timed out waiting for remote delivery")
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - started
+
+    expected = [frame.message.id for frame in frames]
+    for index, socket in enumerate(sockets):
+        if socket.received != expected:
+            raise SystemExit(f"worker {index} delivered frames out of order or more than once")
+
+    remote = sorted(latency for socket in sockets[1:] for latency in socket.latencies)
+    print(f"{workers} workers, {messages} messages, every frame delivered once and in order")
+    print(f"remote delivery p50 {statistics.median(remote) * 1000:.2f}ms"
+          f"  p99 {remote[int(len(remote) * 0.99)] * 1000:.2f}ms")
+    print(f"{messages / elapsed:,.0f} broadcasts/s offered,"
+          f" {messages * (workers - 1) / elapsed:,.0f} remote deliveries/s")
+
+    for manager in managers:
+        await manager.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=1000, help="broadcasts per second")
+    args = parser.parse_args()
+
+    with postgres_database() as url:
+        asyncio.run(run(url, args.workers, args.messages, args.rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Zips within a radius: in-process NumPy index vs the SQL function.
+
+Builds a synthetic zip table, loads it into a scratch Postgres and into a
+ZipCodeIndex, then times a radius lookup with zip_codes_within_radius vs
+ZipCodeIndex.within_radius. Both sides must return the same zips, with
+distances that agree to within a millionth of a mile.
+
+Needs ``psycopg`` plus either ``pgserver`` or BENCH_DATABASE_URL pointing at a
+disposable database. Run from the repository root:
+
+    python -m tests.benchmarks.bench_zip_distance --zips 40000
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from tests.benchmarks._support import (
+    SEARCH_SCHEMA_SQL,
+    load_placeholder_env,
+    postgres_database,
+    read_migration,
+)
+
+load_placeholder_env()
+
+from app.services.zip_code_index import ZipCodeIndex  # noqa: E402
+
+
+def median_seconds(fn, repeats: int):
+    samples = []
+    result = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--zips", type=int, default=40_000)
+    parser.add_argument("--radius", type=float, default=50)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    import psycopg
+
+    rng = np.random.default_rng(42)
+    rows = [
+        {
+            "zip_code": f"{i:05d}",
+            "city": f"City {i}",
+            "state": "ST",
+            "lat": round(float(lat), 6),
+            "lng": round(float(lng), 6),
+        }
+        for i, (lat, lng) in enumerate(
+            zip(rng.uniform(25, 49, args.zips), rng.uniform(-124, -67, args.zips)), start=1
+        )
+    ]
+    origin = rows[len(rows) // 2]["zip_code"]
+
+    with postgres_database() as url, psycopg.connect(url, autocommit=True) as conn:
+        conn.execute(SEARCH_SCHEMA_SQL)
+        for name in (
+            "0003_add_distance_calculation.sql",
+            "0005_task_distance_bounding_box.sql",
+        ):
+            conn.execute(read_migration(name))
+        with conn.cursor().copy("COPY zip_codes (zip_code, city, state, lat, lng) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row((row["zip_code"], row["city"], row["state"], row["lat"], row["lng"]))
+        conn.execute("ANALYZE zip_codes")
+
+        sql_radius, sql_nearby = median_seconds(
+            lambda: conn.execute(
+                """
+                SELECT nz.zip_code, nz.distance
+                FROM zip_codes o, public.zip_codes_within_radius(o.lat, o.lng, %s) AS nz
+                WHERE o.zip_code = %s
+                """,
+                (args.radius, origin),
+            ).fetchall(),
+            args.repeats,
+        )
+
+    started = time.perf_counter()
+    index = ZipCodeIndex(rows)
+    build = time.perf_counter() - started
+    np_radius, np_nearby = median_seconds(lambda: index.within_radius(origin, args.radius), args.repeats)
+
+    sql_distances = dict((zip_code, float(distance)) for zip_code, distance in sql_nearby)
+    if sorted(sql_distances) != sorted(zip_code for zip_code, _ in np_nearby):
+        raise SystemExit("radius lookups returned different zips")
+    worst = max((abs(sql_distances[zip_code] - distance) for zip_code, distance in np_nearby), default=0.0)
+    if worst > 1e-6:
+        raise SystemExit(f"distances disagree by up to {worst} miles")
+
+    print(f"{args.zips} zips, index built in {build * 1000:.0f}ms, max difference {worst:.2e} miles")
+    print(f"{'query':<28} {'sql ms':>10} {'numpy ms':>10} {'speedup':>9}")
+    label = f"{len(np_nearby)} zips within {args.radius:g} mi"
+    print(f"{label:<28} {sql_radius * 1000:>10.2f} {np_radius * 1000:>10.2f} {sql_radius / np_radius:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
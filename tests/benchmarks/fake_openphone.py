@@ -0,0 +1,81 @@
+"""
+Local stand-in for the OpenPhone messages API, for load tests.
+
+Answers POST /v1/messages like OpenPhone does (202 with a message id) after a
+fixed delay. Beyond ``--rate-limit`` requests per second it answers 429 with a
+Retry-After header, and ``--error-rate`` of requests fail with 503. GET
+/v1/stats reports what it has seen.
+
+Run it standalone and point the app at it:
+
+    python -m tests.benchmarks.fake_openphone --port 8765 --latency 0.2 --rate-limit 10
+    OPENPHONE_URL=http://127.0.0.1:8765/v1 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def build_fake_openphone(latency: float = 0.2, rate_limit: int = 0, error_rate: float = 0.0) -> FastAPI:
+    fake = FastAPI()
+    stats = {"accepted": 0, "recipients": 0, "throttled": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0}
+    window = {"second": 0, "count": 0}
+
+    @fake.post("/v1/messages")
+    async def send_message(request: Request):
+        body = await request.json()
+        now = int(time.monotonic())
+        if window["second"] != now:
+            window["second"], window["count"] = now, 0
+        window["count"] += 1
+        if rate_limit and window["count"] > rate_limit:
+            stats["throttled"] += 1
+            return JSONResponse({"message": "Too many requests"}, status_code=429, headers={"Retry-After": "1"})
+        if random.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"message": "Service unavailable"}, status_code=503)
+
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            stats["in_flight"] -= 1
+        stats["accepted"] += 1
+        stats["recipients"] += len(body.get("to", []))
+        return JSONResponse(
+            {"data": {"id": f"AC{uuid.uuid4().hex}", "to": body.get("to"), "status": "queued"}},
+            status_code=202,
+        )
+
+    @fake.get("/v1/stats")
+    async def get_stats():
+        return stats
+
+    return fake
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per accepted message")
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per second before 429s (0: none)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    args = parser.parse_args()
+    uvicorn.run(
+        build_fake_openphone(args.latency, args.rate_limit, args.error_rate),
+        host="127.0.0.1",
+        port=args.port,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Local SMTP sink for testing mail throughput.
+
+Speaks enough ESMTP for smtplib and aiosmtplib (the app's SMTPPool): EHLO (advertising
+PIPELINING and AUTH PLAIN, plus STARTTLS when given a certificate),
+AUTH, MAIL, RCPT, DATA, RSET, NOOP and QUIT. Messages are counted and
+discarded. ``latency`` models the network round trip: replies to everything
+the client sent in one write go back together after one delay, so pipelined
+commands share a round trip just as they would over a real link.
+
+Run it standalone and point the app at it:
+
+    python -m tests.benchmarks.smtp_sink --port 2525 --latency 0.05
+    SMTP_SERVER=127.0.0.1 SMTP_PORT=2525 SMTP_STARTTLS=false uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import base64
+import ssl
+from typing import Dict, List, Optional, Tuple
+
+
+class SMTPSink:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        keep_messages: bool = False,
+    ):
+        self.latency = latency
+        self.ssl_context = ssl_context
+        self.credentials = (username, password) if username else None
+        self.keep_messages = keep_messages
+        self.messages: List[Tuple[str, List[str], bytes]] = []
+        self.stats: Dict[str, int] = {
+            "connections": 0, "tls": 0, "logins": 0, "messages": 0, "bytes": 0, "round_trips": 0, "quits": 0
+        }
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats["connections"] += 1
+        session = {"tls": False, "authed": self.credentials is None, "sender": None, "rcpts": []}
+        await self._reply(writer, ["220 sink ESMTP ready"])
+        data_lines: Optional[List[bytes]] = None
+        try:
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    return
+                buffer = chunk
+                while not buffer.endswith(b"\n"):
+                    more = await reader.read(65536)
+                    if not more:
+                        return
+                    buffer += more
+
+                replies: List[str] = []
+                for raw in buffer.split(b"\r\n")[:-1]:
+                    if data_lines is not None:
+                        if raw == b".":
+                            replies.append(self._deliver(session, data_lines))
+                            data_lines = None
+                        else:
+                            data_lines.append(raw[1:] if raw.startswith(b"..") else raw)
+                        continue
+                    reply, action = self._command(session, raw.decode(errors="replace"))
+                    replies.append(reply)
+                    if action == "data":
+                        data_lines = []
+                    elif action == "starttls":
+                        await self._reply(writer, replies)
+                        replies = []
+                        await writer.start_tls(self.ssl_context)
+                        session.update(tls=True)
+                        self.stats["tls"] += 1
+                    elif action == "quit":
+                        await self._reply(writer, replies)
+                        return
+                if replies:
+                    await self._reply(writer, replies)
+        except (ConnectionError, ssl.SSLError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _reply(self, writer: asyncio.StreamWriter, replies: List[str]) -> None:
+        self.stats["round_trips"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        writer.write("".join(f"{r}\r\n" for r in replies).encode())
+        await writer.drain()
+
+    def _command(self, session: Dict, line: str) -> Tuple[str, Optional[str]]:
+        verb, _, arg = line.partition(" ")
+        verb = verb.upper()
+        if verb in ("EHLO", "HELO"):
+            extensions = ["PIPELINING", "8BITMIME", "SIZE 35882577", "AUTH PLAIN"]
+            if self.ssl_context is not None and not session["tls"]:
+                extensions.insert(0, "STARTTLS")
+            return "\r\n".join(
+                ["250-sink"] + [f"250-{e}" for e in extensions[:-1]] + [f"250 {extensions[-1]}"]
+            ), None
+        if verb == "STARTTLS":
+            return "220 2.0.0 Ready to start TLS", "starttls"
+        if verb == "AUTH":
+            mechanism, _, token = arg.partition(" ")
+            if mechanism.upper() != "PLAIN" or not token:
+                return "504 5.5.4 Only AUTH PLAIN with an initial response", None
+            _, username, password = base64.b64decode(token).decode().split("\0")
+            if self.credentials is not None and (username, password) != self.credentials:
+                return "535 5.7.8 Authentication failed", None
+            session["authed"] = True
+            self.stats["logins"] += 1
+            return "235 2.7.0 Authentication successful", None
+        if verb == "MAIL":
+            if not session["authed"]:
+                return "530 5.7.0 Authentication required", None
+            session.update(sender=self._address(arg), rcpts=[])
+            return "250 2.1.0 OK", None
+        if verb == "RCPT":
+            if session["sender"] is None:
+                return "503 5.5.1 MAIL first", None
+            recipient = self._address(arg)
+            if recipient.startswith("reject"):
+                return "550 5.1.1 No such user", None
+            session["rcpts"].append(recipient)
+            return "250 2.1.5 OK", None
+        if verb == "DATA":
+            if not session["rcpts"]:
+                return "554 5.5.1 No valid recipients", None
+            return "354 Go ahead", "data"
+        if verb == "RSET":
+            session.update(sender=None, rcpts=[])
+            return "250 2.0.0 OK", None
+        if verb == "NOOP":
+            return "250 2.0.0 OK", None
+        if verb == "QUIT":
+            self.stats["quits"] += 1
+            return "221 2.0.0 Bye", "quit"
+        return "502 5.5.2 Command not implemented", None
+
+    @staticmethod
+    def _address(arg: str) -> str:
+        """The address in "FROM:<a@b> SIZE=123", without ESMTP parameters"""
+        return arg.partition(":")[2].strip().split(" ")[0].strip("<>")
+
+    def _deliver(self, session: Dict, lines: List[bytes]) -> str:
+        data = b"\r\n".join(lines) + b"\r\n"
+        self.stats["messages"] += 1
+        self.stats["bytes"] += len(data)
+        if self.keep_messages:
+            self.messages.append((session["sender"], list(session["rcpts"]), data))
+        session.update(sender=None, rcpts=[])
+        return "250 2.0.0 OK queued"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per round trip")
+    parser.add_argument("--tls", action="store_true", help="offer STARTTLS with a throwaway certificate")
+    args = parser.parse_args()
+
+    async def serve():
+        context = None
+        if args.tls:
+            import tempfile
+
+            from tests.benchmarks._support import write_self_signed_cert
+
+            directory = tempfile.mkdtemp()
+            cert_path, key_path = write_self_signed_cert(directory)
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.load_cert_chain(cert_path, key_path)
+            print(f"STARTTLS certificate: {cert_path}")
+        sink = SMTPSink(args.latency, ssl_context=context)
+        server = await sink.start(port=args.port)
+        print(f"SMTP sink on 127.0.0.1:{args.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            print(sink.stats)
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
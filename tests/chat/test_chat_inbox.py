@@ -0,0 +1,38 @@
+from uuid import uuid4
+
+import pytest
+
+from app.services.chat_service import ChatService
+
+
+def _row(activity_at):
+    return {
+        "id": str(uuid4()),
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "updated_at": activity_at,
+        "activity_at": activity_at,
+        "last_message": "hi",
+        "last_message_at": activity_at,
+        "last_message_sender_id": str(uuid4()),
+        "unread_count": 2,
+        "participants": [{"id": str(uuid4()), "first_name": "A", "last_name": "B", "pfp_url": None}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_inbox_pages_with_a_cursor(supabase):
+    first_page = [_row("2024-01-03T00:00:00+00:00"), _row("2024-01-02T00:00:00+00:00")]
+    supabase.rpc_pages("get_chat_inbox", first_page, [_row("2024-01-01T00:00:00+00:00")])
+    service = ChatService(supabase, smser=object())
+    user_id = uuid4()
+
+    first = await service.get_inbox(user_id, limit=2)
+    assert [chat.unread_count for chat in first.chats] == [2, 2]
+    assert first.next_cursor is not None
+
+    second = await service.get_inbox(user_id, limit=2, cursor=first.next_cursor)
+    name, params = supabase.calls[1]
+    assert name == "get_chat_inbox"
+    assert params["cursor_chat_id"] == first_page[-1]["id"]
+    assert params["cursor_activity_at"] == "2024-01-02T00:00:00+00:00"
+    assert second.next_cursor is None
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.chat_membership_cache import ChatMembershipCache
+
+
+def _seed(supabase, chats) -> asyncio.Event:
+    """chat_users rows for {chat_id: [(chat_user_id, user_id)]}; queries wait while the returned event is clear"""
+    supabase.tables["chat_users"] = [
+        {"id": chat_user_id, "user_id": user_id, "chat_id": chat_id}
+        for chat_id, members in chats.items()
+        for chat_user_id, user_id in members
+    ]
+    release = asyncio.Event()
+    release.set()
+
+    async def hold(query):
+        await asyncio.sleep(0)
+        await release.wait()
+
+    supabase.intercepts["chat_users"] = hold
+    return release
+
+
+@pytest.mark.asyncio
+async def test_members_are_cached_and_concurrent_misses_share_a_query(supabase):
+    _seed(supabase, {"chat-1": [("cu-1", "u1"), ("cu-2", "u2")]})
+    cache = ChatMembershipCache(supabase)
+
+    results = await asyncio.gather(*(cache.get("chat-1") for _ in range(5)))
+    assert all(members == {"u1": "cu-1", "u2": "cu-2"} for members in results)
+    assert len(supabase.queries) == 1
+
+    members, chat_user_id = await cache.require_member("chat-1", "u2")
+    assert chat_user_id == "cu-2" and len(supabase.queries) == 1
+
+    cache.invalidate("chat-1")
+    await cache.get("chat-1")
+    assert len(supabase.queries) == 2
+
+
+@pytest.mark.asyncio
+async def test_require_member_rejects_unknown_chats_and_outsiders(supabase):
+    _seed(supabase, {"chat-1": [("cu-1", "u1")]})
+    cache = ChatMembershipCache(supabase)
+
+    with pytest.raises(HTTPException) as missing:
+        await cache.require_member("chat-2", "u1")
+    assert missing.value.status_code == 404
+
+    with pytest.raises(HTTPException) as outsider:
+        await cache.require_member("chat-1", "u3")
+    assert outsider.value.status_code == 403
+
+    # Unknown chats are not cached, so a chat created later is found
+    supabase.tables["chat_users"].append({"id": "cu-9", "user_id": "u1", "chat_id": "chat-2"})
+    assert (await cache.require_member("chat-2", "u1"))[1] == "cu-9"
+
+
+@pytest.mark.asyncio
+async def test_waiters_load_again_when_the_leading_caller_is_cancelled(supabase):
+    release = _seed(supabase, {"chat-1": [("cu-1", "u1")]})
+    cache = ChatMembershipCache(supabase)
+    release.clear()
+
+    leader = asyncio.create_task(cache.get("chat-1"))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get("chat-1"))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.wait_for(waiter, 1) == {"u1": "cu-1"}
+    assert leader.cancelled()
+    assert len(supabase.queries) == 2
+
+
+@pytest.mark.asyncio
+async def test_a_cancelled_waiter_does_not_cancel_the_query(supabase):
+    release = _seed(supabase, {"chat-1": [("cu-1", "u1")]})
+    cache = ChatMembershipCache(supabase)
+    release.clear()
+
+    leader = asyncio.create_task(cache.get("chat-1"))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get("chat-1"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await leader == {"u1": "cu-1"}
+    assert waiter.cancelled()
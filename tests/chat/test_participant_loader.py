@@ -0,0 +1,39 @@
+from uuid import uuid4
+
+import pytest
+
+from app.services.chat_service import ChatService
+
+
+def _person(user_id, name):
+    return {"id": user_id, "first_name": name, "last_name": "X", "pfp_url": None, "phone": None}
+
+
+@pytest.mark.asyncio
+async def test_user_chats_load_participants_in_one_batch(supabase):
+    me = str(uuid4())
+    helper_ids = [str(uuid4()) for _ in range(5)]
+    chats = [
+        {
+            "id": str(uuid4()),
+            "created_at": "2024-01-01T00:00:00+00:00",
+            "updated_at": "2024-01-01T00:00:00+00:00",
+            "participants": [{"user_id": me}, {"user_id": helper_id}],
+            "membership": [{"user_id": me}],
+        }
+        for helper_id in helper_ids
+    ]
+    supabase.tables.update({
+        "chats": chats,
+        "clients": [_person(me, "Client")],
+        "helpers": [_person(h, f"Helper{i}") for i, h in enumerate(helper_ids)],
+    })
+
+    response = await ChatService(supabase, smser=object()).get_user_chats(me)
+
+    # One chats query, then a single clients and a single helpers lookup
+    assert [query.table for query in supabase.queries] == ["chats", "clients", "helpers"]
+    assert [chat.users[1].first_name for chat in response.chats] == [
+        f"Helper{i}" for i in range(5)
+    ]
+    assert all(chat.users[0].first_name == "Client" for chat in response.chats)
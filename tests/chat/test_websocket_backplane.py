@@ -0,0 +1,134 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.schemas.chat import WebSocketReadReceipt
+from app.services.websocket_backplane import Backplane, InMemoryBackplane, PostgresBackplane, create_backplane
+from app.services.websocket_manager import WebSocketManager
+
+
+class _FakeSocket:
+    def __init__(self, fail: bool = False):
+        self.sent = []
+        self.fail = fail
+
+    async def send_text(self, text):
+        if self.fail:
+            raise RuntimeError("socket closed")
+        self.sent.append(text)
+
+
+async def _settle():
+    # Let the publisher and per-socket writer tasks drain
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_reaches_sockets_held_by_other_managers_once():
+    peers = []
+    worker_a = WebSocketManager(InMemoryBackplane(peers))
+    worker_b = WebSocketManager(InMemoryBackplane(peers))
+    await worker_a.start()
+    await worker_b.start()
+
+    chat_id, other_chat_id = uuid4(), uuid4()
+    on_a, on_b, elsewhere = _FakeSocket(), _FakeSocket(), _FakeSocket()
+    await worker_a.connect(on_a, chat_id)
+    await worker_b.connect(on_b, chat_id)
+    await worker_b.connect(elsewhere, other_chat_id)
+
+    receipt = WebSocketReadReceipt(
+        chat_id=chat_id, message_ids=[uuid4()], read_by=uuid4(), read_at=datetime.now(timezone.utc)
+    )
+    await worker_a.broadcast_read_receipt(chat_id, receipt)
+    await _settle()
+
+    assert on_a.sent == [receipt.model_dump_json()]
+    assert on_b.sent == [receipt.model_dump_json()]
+    assert elsewhere.sent == []
+
+    await worker_b.stop()
+    await worker_a.broadcast_read_receipt(chat_id, receipt)
+    await _settle()
+    assert len(on_a.sent) == 2
+    assert len(on_b.sent) == 1
+
+
+@pytest.mark.asyncio
+async def test_remote_delivery_drops_dead_sockets():
+    peers = []
+    worker_a = WebSocketManager(InMemoryBackplane(peers))
+    worker_b = WebSocketManager(InMemoryBackplane(peers))
+    await worker_a.start()
+    await worker_b.start()
+
+    chat_id = uuid4()
+    await worker_b.connect(_FakeSocket(fail=True), chat_id)
+    receipt = WebSocketReadReceipt(
+        chat_id=chat_id, message_ids=[], read_by=uuid4(), read_at=datetime.now(timezone.utc)
+    )
+    await worker_a.broadcast_read_receipt(chat_id, receipt)
+    await _settle()
+
+    assert worker_b.get_connection_count(chat_id) == 0
+
+
+def test_backplane_is_chosen_from_the_url():
+    assert isinstance(create_backplane(None), InMemoryBackplane)
+    assert isinstance(create_backplane("postgresql://localhost/app"), PostgresBackplane)
+    with pytest.raises(ValueError):
+        create_backplane("amqp://localhost")
+
+
+class _NotifyConnection:
+    """Publisher connection that rejects payloads the way NOTIFY does"""
+
+    closed = False
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, query, params):
+        channel, payloads = params
+        if any(len(payload.encode()) >= 8000 for payload in payloads):
+            raise ValueError("payload string too long")
+        self.statements.append(payloads)
+
+
+@pytest.mark.asyncio
+async def test_oversized_frames_are_split_and_do_not_block_the_batch():
+    publisher, subscriber = PostgresBackplane("postgresql://unused"), PostgresBackplane("postgresql://unused")
+    publisher._publisher = _NotifyConnection()
+    delivered = []
+
+    async def deliver(chat_id, frame):
+        delivered.append((chat_id, frame))
+
+    await Backplane.start(subscriber, deliver)
+
+    chat_id = uuid4()
+    long_message = json.dumps({"type": "message", "content": "\U0001F600" * 1000})
+    receipt = WebSocketReadReceipt(
+        chat_id=chat_id, message_ids=[uuid4() for _ in range(200)], read_by=uuid4(),
+        read_at=datetime.now(timezone.utc),
+    ).model_dump_json()
+    assert len(publisher._encode(chat_id, long_message).encode()) > 8000
+
+    await publisher.publish_many([(chat_id, "before"), (chat_id, long_message), (chat_id, receipt), (chat_id, "after")])
+
+    statements = publisher._publisher.statements
+    # "before", then each oversized frame in its own statement, then "after"
+    assert len(statements) == 4
+    assert len(statements[1]) > 1 and len(statements[2]) > 1
+    for payloads in statements:
+        for payload in payloads:
+            await subscriber._receive(payload)
+
+    assert delivered == [
+        (str(chat_id), "before"), (str(chat_id), long_message), (str(chat_id), receipt), (str(chat_id), "after"),
+    ]
+    assert subscriber._pending == {}
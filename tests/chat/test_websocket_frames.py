@@ -0,0 +1,150 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from postgrest.exceptions import APIError
+
+from app.api.v1.endpoints import chat as chat_endpoint
+from app.schemas.auth import CurrentUser
+from app.schemas.chat import MessageResponse
+from app.services.message_batcher import MessageBatcher
+from app.services.websocket_manager import WebSocketManager
+
+
+def _messages(supabase, fail=False):
+    async def insert(query):
+        await asyncio.sleep(0)
+        if fail:
+            raise RuntimeError("insert failed")
+        if any(row["content"] == "bad" for row in query.values):
+            raise APIError({"code": "23514", "message": "violates check constraint"})
+        # PostgREST does not promise the rows come back in insert order
+        return [dict(row) for row in reversed(query.values)]
+
+    supabase.intercepts["messages"] = insert
+    return supabase
+
+
+def _batches(supabase):
+    return [query.values for query in supabase.queries]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_inserts_are_group_committed_in_order(supabase):
+    batcher = MessageBatcher(_messages(supabase), max_batch=3)
+
+    stored = await asyncio.gather(*(batcher.insert({"content": str(i)}) for i in range(5)))
+
+    assert [row["content"] for row in stored] == ["0", "1", "2", "3", "4"]
+    assert [[row["content"] for row in batch] for batch in _batches(supabase)] == [["0", "1", "2"], ["3", "4"]]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_fails_every_caller(supabase):
+    batcher = MessageBatcher(_messages(supabase, fail=True))
+
+    results = await asyncio.gather(*(batcher.insert({"content": "x"}) for _ in range(2)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_a_rejected_row_fails_only_its_own_sender(supabase):
+    batcher = MessageBatcher(_messages(supabase))
+
+    results = await asyncio.gather(
+        *(batcher.insert({"content": content}) for content in ("a", "bad", "b")), return_exceptions=True
+    )
+
+    assert results[0]["content"] == "a" and results[2]["content"] == "b"
+    assert isinstance(results[1], APIError)
+    assert [len(batch) for batch in _batches(supabase)] == [3, 1, 1, 1]
+
+
+class _Socket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+class _ChatService:
+    async def send_message(self, chat_id, sender_id, request):
+        now = datetime.now(timezone.utc)
+        return MessageResponse(
+            id=uuid4(), chat_id=chat_id, sender_id=sender_id, content=request.content,
+            read_at=None, created_at=now, updated_at=now,
+        )
+
+
+class _NotificationService:
+    def __init__(self):
+        self.sent = []
+
+    async def send_msg_notification(self, chat_id, sender_id, content):
+        self.sent.append(content)
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_send_frame_is_acked_with_the_server_id_then_broadcast():
+    manager = WebSocketManager()
+    await manager.start()
+    chat_id, socket, notifications = uuid4(), _Socket(), _NotificationService()
+    await manager.connect(socket, chat_id)
+    user = CurrentUser(id=str(uuid4()))
+
+    frame = json.dumps({"type": "send_message", "client_id": "c-1", "content": "hello"})
+    await chat_endpoint.handle_client_frame(socket, chat_id, user, frame, _ChatService(), notifications, manager)
+    await chat_endpoint.handle_client_frame(socket, chat_id, user, '{"type": "nope"}', _ChatService(), notifications, manager)
+    await _settle()
+
+    ack, broadcast, error = socket.sent
+    assert ack["type"] == "ack" and ack["client_id"] == "c-1"
+    assert broadcast["type"] == "chat_message"
+    assert broadcast["message"]["id"] == ack["message_id"]
+    assert error["type"] == "error"
+    assert notifications.sent == ["hello"]
+    await manager.stop()
+
+
+class _ReadChatService:
+    async def mark_messages_read(self, chat_id, user_id, request):
+        return {"read_at": datetime.now(timezone.utc)}
+
+
+def test_http_broadcasts_use_the_manager_of_the_running_lifespan(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.deps.container import ServiceContainer
+    from app.deps.supabase import get_chat_service, get_current_user
+    from app.main import app
+
+    async def startup(self):
+        pass
+
+    monkeypatch.setattr(ServiceContainer, "startup", startup)
+    monkeypatch.setitem(app.dependency_overrides, get_current_user, lambda: CurrentUser(id=str(uuid4())))
+    monkeypatch.setitem(app.dependency_overrides, get_chat_service, _ReadChatService)
+
+    receipts = []
+    for _ in range(2):
+        with TestClient(app) as client:
+            manager = app.state.services.websocket_manager
+
+            async def broadcast_read_receipt(chat_id, receipt, manager=manager):
+                receipts.append(manager)
+
+            manager.broadcast_read_receipt = broadcast_read_receipt
+            response = client.post(f"/api/v1/chat/{uuid4()}/read", json={"message_ids": [str(uuid4())]})
+            assert response.status_code == 200
+            assert receipts[-1] is manager
+
+    assert receipts[0] is not receipts[1]
@@ -0,0 +1,103 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from app.services.chat_service import ChatService
+from app.services.websocket_backplane import InMemoryBackplane
+from app.services.websocket_manager import WebSocketManager
+
+
+class _Socket:
+    async def send_text(self, text):
+        pass
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_presence_is_shared_across_nodes_and_cleared_on_leave():
+    peers = []
+    node_a = WebSocketManager(InMemoryBackplane(peers))
+    node_b = WebSocketManager(InMemoryBackplane(peers))
+    await node_a.start()
+    await node_b.start()
+    chat_id, user_id = uuid4(), str(uuid4())
+    first, second = _Socket(), _Socket()
+
+    await node_a.connect(first, chat_id, user_id)
+    await node_a.connect(second, chat_id, user_id)
+    await node_a.connect(_Socket(), chat_id)
+    await _settle()
+    assert node_a.is_online(chat_id, user_id)
+    assert node_b.online_users(chat_id) == {user_id}
+    assert not node_b.is_online(uuid4(), user_id)
+
+    # Still online while one of the user's sockets remains
+    await node_a.disconnect(first, chat_id)
+    await _settle()
+    assert node_b.is_online(chat_id, user_id)
+
+    await node_a.disconnect(second, chat_id)
+    await _settle()
+    assert not node_a.is_online(chat_id, user_id)
+    assert not node_b.is_online(chat_id, user_id)
+
+
+@pytest.mark.asyncio
+async def test_late_node_learns_presence_and_forgets_stopped_or_silent_nodes():
+    peers = []
+    node_a = WebSocketManager(InMemoryBackplane(peers), presence_heartbeat=0.01)
+    await node_a.start()
+    chat_id, user_id = uuid4(), str(uuid4())
+    await node_a.connect(_Socket(), chat_id, user_id)
+
+    node_b = WebSocketManager(InMemoryBackplane(peers), presence_heartbeat=0.01)
+    await node_b.start()
+    await _settle()
+    assert node_b.is_online(chat_id, user_id)
+
+    await node_a.stop()
+    await _settle()
+    assert not node_b.is_online(chat_id, user_id)
+
+    # A node that vanishes without saying goodbye expires after missed heartbeats
+    node_c = WebSocketManager(InMemoryBackplane(peers), presence_heartbeat=0.01)
+    await node_c.start()
+    await node_c.connect(_Socket(), chat_id, user_id)
+    await _settle()
+    assert node_b.is_online(chat_id, user_id)
+    node_c._heartbeat.cancel()
+    await asyncio.sleep(0.05)
+    assert not node_b.is_online(chat_id, user_id)
+    await node_b.stop()
+
+
+class _SMS:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message_notification(self, notification):
+        self.sent.append(notification)
+
+
+class _Presence:
+    def __init__(self, online):
+        self.online = online
+
+    def is_online(self, chat_id, user_id):
+        return str(user_id) in self.online
+
+
+@pytest.mark.asyncio
+async def test_sms_is_skipped_for_recipients_with_the_chat_open():
+    sender, recipient = uuid4(), str(uuid4())
+    sms = _SMS()
+    service = ChatService(object(), smser=sms, presence=_Presence({recipient}))
+
+    await service.send_message_notification(recipient, sender, uuid4(), "hi")
+
+    assert sms.sent == []
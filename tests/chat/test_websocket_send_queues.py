@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.schemas.chat import WebSocketReadReceipt
+from app.services.websocket_manager import WebSocketManager
+
+
+class _Socket:
+    def __init__(self, stall: bool = False):
+        self.sent = []
+        self.closed_with = None
+        self.stall = stall
+        self.release = asyncio.Event()
+
+    async def send_text(self, text):
+        if self.stall:
+            await self.release.wait()
+        self.sent.append(text)
+
+    async def close(self, code=1000, reason=None):
+        self.closed_with = code
+
+
+def _receipt(chat_id):
+    return WebSocketReadReceipt(
+        chat_id=chat_id, message_ids=[], read_by=uuid4(), read_at=datetime.now(timezone.utc)
+    )
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_is_evicted_without_delaying_others():
+    manager = WebSocketManager(send_queue_size=2)
+    await manager.start()
+    chat_id = uuid4()
+    slow, fast = _Socket(stall=True), _Socket()
+    await manager.connect(slow, chat_id)
+    await manager.connect(fast, chat_id)
+
+    # One frame in flight on the stalled send, two queued, the fourth overflows
+    for _ in range(4):
+        await manager.broadcast_read_receipt(chat_id, _receipt(chat_id))
+        await _settle()
+
+    assert len(fast.sent) == 4
+    assert slow.sent == []
+    assert slow.closed_with == 1013
+    assert manager.get_connection_count(chat_id) == 1
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_stalled_send_times_out_and_evicts():
+    manager = WebSocketManager(send_timeout=0.01)
+    await manager.start()
+    chat_id = uuid4()
+    stuck = _Socket(stall=True)
+    await manager.connect(stuck, chat_id)
+
+    await manager.broadcast_read_receipt(chat_id, _receipt(chat_id))
+    await asyncio.sleep(0.05)
+
+    assert stuck.closed_with == 1013
+    assert manager.get_connection_count(chat_id) == 0
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_returns_before_any_socket_is_written():
+    manager = WebSocketManager()
+    await manager.start()
+    chat_id = uuid4()
+    stuck = _Socket(stall=True)
+    await manager.connect(stuck, chat_id)
+
+    await asyncio.wait_for(manager.broadcast_read_receipt(chat_id, _receipt(chat_id)), 0.1)
+
+    stuck.release.set()
+    await _settle()
+    assert len(stuck.sent) == 1
+    await manager.stop()
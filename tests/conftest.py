@@ -0,0 +1,214 @@
+import inspect
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+
+# Unit tests never reach external services; placeholder settings let app modules import.
+for _key, _value in {
+    "SUPABASE_URL": "http://127.0.0.1:54321",
+    "SUPABASE_ANON_KEY": "test.anon.key",
+    "SUPABASE_SERVICE_ROLE_KEY": "test.service.key",
+    "STRIPE_SECRET_KEY": "sk_test",
+    "STRIPE_PUBLISHABLE_KEY": "pk_test",
+    "STRIPE_WEBHOOK_SECRET": "whsec_test",
+    "STRIPE_PREMIUM_PRICE_ID": "price_test",
+    "STRIPE_ONE_TIME_POST_PRICE_ID": "price_test",
+    "FRONTEND_URL": "http://localhost:3000",
+    "OPENPHONE_API_KEY": "test",
+    "OPENPHONE_FROM_NUMBER": "+15550000000",
+    "OPENAI_API_KEY": "test",
+    "EMAIL_PASSWORD": "test",
+    "HELPER_MOBILE_APP_BUNDLE_ID": "com.helperu.test",
+    "HELPER_PUSH_NOTIFICATION_P8_ID": "TEST",
+    "PUSH_TOKEN_SECRET": "test",
+    "APPLE_ID": "TEST",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+
+class FakeResult:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    """One PostgREST table request, run against the rows in ``FakeSupabase.tables``.
+
+    Filters on an embedded resource ("tasks.client_id") match the embedded
+    row, or any row of an embedded list.
+    """
+
+    def __init__(self, client: "FakeSupabase", table: str):
+        self.client = client
+        self.table = table
+        self.action = "select"
+        self.columns: Optional[str] = None
+        self.values: Any = None
+        self.filters: List[tuple] = []
+        self.orders: List[tuple] = []
+        self.bounds: Optional[tuple] = None
+
+    def select(self, *columns, count=None):
+        self.columns = ",".join(columns)
+        return self
+
+    def insert(self, values):
+        self.action, self.values = "insert", values
+        return self
+
+    def update(self, values):
+        self.action, self.values = "update", values
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(("eq", column, value))
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(("in", column, list(values)))
+        return self
+
+    def order(self, column, desc=False, **_):
+        self.orders.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def limit(self, count):
+        self.bounds = (0, count - 1)
+        return self
+
+    def _matches(self, row: Dict) -> bool:
+        for op, column, value in self.filters:
+            embed, _, field = column.rpartition(".")
+            targets = row.get(embed) if embed else row
+            targets = targets if isinstance(targets, list) else [targets or {}]
+            if op == "eq" and not any(target.get(field) == value for target in targets):
+                return False
+            if op == "in" and not any(target.get(field) in value for target in targets):
+                return False
+        return True
+
+    async def execute(self) -> FakeResult:
+        self.client.queries.append(self)
+        intercept = self.client.intercepts.get(self.table)
+        if intercept is not None:
+            data = intercept(self)
+            if inspect.isawaitable(data):
+                data = await data
+            if data is not None:
+                return FakeResult(data, len(data))
+
+        rows = self.client.tables.setdefault(self.table, [])
+        if self.action == "insert":
+            defaults = self.client.defaults.get(self.table, dict)
+            values = self.values if isinstance(self.values, list) else [self.values]
+            inserted = [{**defaults(), **row} for row in values]
+            rows.extend(inserted)
+            return FakeResult([dict(row) for row in inserted])
+
+        matched = [row for row in rows if self._matches(row)]
+        if self.action == "update":
+            for row in matched:
+                row.update(self.values)
+        elif self.action == "delete":
+            rows[:] = [row for row in rows if row not in matched]
+        for column, desc in reversed(self.orders):
+            if all(column in row for row in matched):
+                matched = sorted(matched, key=lambda row: row[column], reverse=desc)
+        count = len(matched)
+        if self.bounds:
+            matched = matched[self.bounds[0]:self.bounds[1] + 1]
+        return FakeResult([dict(row) for row in matched], count)
+
+
+class FakeRpc:
+    def __init__(self, client: "FakeSupabase", name: str, params: Dict):
+        self.client, self.name, self.params = client, name, params
+
+    async def execute(self) -> FakeResult:
+        self.client.calls.append((self.name, self.params))
+        if self.name not in self.client.rpcs:
+            raise AssertionError(f"unexpected rpc {self.name}")
+        outcome = self.client.rpcs[self.name]
+        if callable(outcome):
+            outcome = outcome(self.params)
+            if inspect.isawaitable(outcome):
+                outcome = await outcome
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResult(outcome)
+
+
+class FakeSupabase:
+    """In-memory stand-in for the async Supabase client's PostgREST surface.
+
+    - ``tables``: rows per table; select, insert, update and delete work on them.
+    - ``defaults``: per table, a callable giving default columns for inserted rows.
+    - ``rpcs``: per function, the data to return, an exception to raise, or a
+      (sync or async) callable taking the params and returning either.
+    - ``intercepts``: per table, a (sync or async) callable run with each query
+      before it executes; returning data (or raising) replaces the default.
+
+    Every executed query is kept in ``queries`` and every rpc call in ``calls``.
+    """
+
+    def __init__(self):
+        self.tables: Dict[str, List[Dict]] = {}
+        self.defaults: Dict[str, Callable[[], Dict]] = {}
+        self.rpcs: Dict[str, Any] = {}
+        self.intercepts: Dict[str, Callable[[FakeQuery], Any]] = {}
+        self.queries: List[FakeQuery] = []
+        self.calls: List[tuple] = []
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: Dict) -> FakeRpc:
+        return FakeRpc(self, name, params)
+
+    def rpc_pages(self, name: str, *pages: List[Dict]) -> None:
+        """Answer successive calls to the ``name`` rpc with ``pages`` in turn"""
+        remaining = list(pages)
+        self.rpcs[name] = lambda params: remaining.pop(0)
+
+
+class FakeJobs:
+    """Records what services hand to the notification queue instead of running it"""
+
+    max_attempts = 5
+
+    def __init__(self):
+        self.enqueued: List[tuple] = []
+        self.coalesced: List[tuple] = []
+        self.notified = 0
+
+    def register(self, *_, **__):
+        pass
+
+    async def enqueue(self, kind, payload):
+        self.enqueued.append((kind, payload))
+
+    async def enqueue_coalesced(self, kind, key, payload):
+        self.coalesced.append((kind, key, payload))
+
+    def notify(self, count=1):
+        self.notified += count
+
+
+@pytest.fixture
+def supabase() -> FakeSupabase:
+    return FakeSupabase()
+
+
+@pytest.fixture
+def jobs() -> FakeJobs:
+    return FakeJobs()
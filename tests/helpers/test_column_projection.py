@@ -0,0 +1,58 @@
+from typing import List, Optional
+
+import pytest
+from pydantic import BaseModel
+
+from app.schemas.helper import HelperResponse
+from app.services.helper_service import HelperService
+from app.utils.projection import select_columns
+
+
+class _Owner(BaseModel):
+    id: str
+    name: str
+
+
+class _Tag(BaseModel):
+    label: str
+
+
+class _Item(BaseModel):
+    id: str
+    owner_id: str
+    secret: Optional[str] = None
+    owner: Optional[_Owner] = None
+    tags: List[_Tag] = []
+
+
+class _Wrapper(BaseModel):
+    id: str
+    item: _Item
+
+
+def test_flat_and_excluded_fields():
+    assert select_columns(_Owner) == "id,name"
+    assert select_columns(_Item, exclude=["secret", "owner", "tags"]) == "id,owner_id"
+
+
+def test_nested_models_become_embeds():
+    assert select_columns(_Item, exclude=["secret"], relations={"owner": "owner_id"}) == (
+        "id,owner_id,owner:owner_id(id,name),tags(label)"
+    )
+    assert select_columns(_Wrapper, relations={"item": "item_id", "item.owner": "owner_id"}) == (
+        "id,item:item_id(id,owner_id,secret,owner:owner_id(id,name),tags(label))"
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_helper_fetches_the_response_fields_only(supabase):
+    supabase.tables["helpers"] = [{
+        "id": "h1", "first_name": "Ann", "last_name": "Lee", "college": "Tufts", "bio": "",
+        "graduation_year": 2026, "zip_code": "02155",
+    }]
+
+    helper = await HelperService(supabase).get_helper("h1")
+
+    assert helper.id == "h1"
+    # The same response as select("*"): contact details and counters included
+    assert supabase.queries[0].columns.split(",") == list(HelperResponse.model_fields)
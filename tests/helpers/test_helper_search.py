@@ -0,0 +1,47 @@
+import pytest
+
+from app.schemas.helper import HelperSearchRequest
+from app.services.helper_service import HelperService
+
+NOW = "2025-01-01T00:00:00+00:00"
+
+
+def _helper(helper_id, total_count):
+    return {
+        "id": helper_id, "first_name": "Ann", "last_name": "Lee", "college": "Tufts", "bio": "Calculus tutor",
+        "graduation_year": 2026, "zip_code": "02155", "created_at": NOW, "updated_at": NOW,
+        "total_count": total_count,
+    }
+
+
+@pytest.mark.asyncio
+async def test_page_and_total_come_from_one_call(supabase):
+    supabase.rpcs["search_helpers"] = [_helper("h1", 42), _helper("h2", 42)]
+
+    result = await HelperService(supabase).search_helpers(HelperSearchRequest(search_query="calculus", limit=2))
+
+    assert [name for name, _ in supabase.calls] == ["search_helpers"]
+    assert supabase.calls[0][1]["search_limit"] == 2
+    assert result.total_count == 42
+    assert [helper.id for helper in result.helpers] == ["h1", "h2"]
+
+
+@pytest.mark.asyncio
+async def test_no_matches_is_one_call(supabase):
+    supabase.rpcs["search_helpers"] = []
+
+    result = await HelperService(supabase).search_helpers(HelperSearchRequest(search_query="nobody"))
+
+    assert len(supabase.calls) == 1
+    assert result.total_count == 0 and result.helpers == []
+
+
+@pytest.mark.asyncio
+async def test_page_past_the_end_still_reports_the_total(supabase):
+    supabase.rpcs.update({"search_helpers": [], "count_helpers_matching_criteria": 7})
+
+    result = await HelperService(supabase).search_helpers(HelperSearchRequest(search_query="calculus", offset=40))
+
+    assert [name for name, _ in supabase.calls] == ["search_helpers", "count_helpers_matching_criteria"]
+    assert "search_limit" not in supabase.calls[1][1]
+    assert result.total_count == 7 and result.helpers == []
@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+
+from app.schemas.helper import HelperListResponse, HelperResponse, HelperSearchRequest
+from app.schemas.profile import ProfileUpdateData
+from app.services.helper_search_cache import HelperSearchCache
+from app.services.profile_service import ProfileService
+
+
+def _page(*helper_ids):
+    helpers = [
+        HelperResponse(
+            id=helper_id, first_name="Ann", last_name="Lee", college="Tufts", bio="",
+            graduation_year=2026, zip_code="02155",
+        )
+        for helper_id in helper_ids
+    ]
+    return HelperListResponse(helpers=helpers, total_count=len(helpers), limit=20, offset=0)
+
+
+class _Loader:
+    def __init__(self, page=None):
+        self.page = page or _page("h1")
+        self.requests = []
+
+    async def __call__(self, request):
+        self.requests.append(request)
+        await asyncio.sleep(0)
+        return self.page
+
+
+@pytest.mark.asyncio
+async def test_equivalent_searches_share_an_entry():
+    cache, load = HelperSearchCache(), _Loader()
+
+    await cache.get_or_load(HelperSearchRequest(search_college="Tufts", search_query=""), load)
+    await cache.get_or_load(HelperSearchRequest(search_college="  tufts ", search_query=None), load)
+    await cache.get_or_load(HelperSearchRequest(search_college="tufts", search_zip_code="02155"), load)
+
+    assert len(load.requests) == 2
+    assert load.requests[0].search_college == "tufts" and load.requests[0].search_query is None
+    assert cache.metrics()["hits"] == 1 and cache.metrics()["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_query():
+    cache, load = HelperSearchCache(), _Loader()
+
+    await asyncio.gather(*(cache.get_or_load(HelperSearchRequest(search_query="math"), load) for _ in range(5)))
+
+    assert len(load.requests) == 1
+    assert cache.metrics()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_and_lru_is_evicted():
+    cache, load = HelperSearchCache(ttl_seconds=0), _Loader()
+    await cache.get_or_load(HelperSearchRequest(), load)
+    await cache.get_or_load(HelperSearchRequest(), load)
+    assert len(load.requests) == 2 and cache.metrics()["expirations"] == 1
+
+    cache, load = HelperSearchCache(max_size=2), _Loader()
+    for offset in (0, 20, 0, 40):
+        await cache.get_or_load(HelperSearchRequest(offset=offset), load)
+    await cache.get_or_load(HelperSearchRequest(offset=0), load)
+
+    # offset=20 was least recently used when offset=40 arrived
+    assert [request.offset for request in load.requests] == [0, 20, 40]
+    assert cache.metrics()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidation_depends_on_the_fields_changed():
+    cache = HelperSearchCache()
+    await cache.get_or_load(HelperSearchRequest(offset=0), _Loader(_page("h1")))
+    await cache.get_or_load(HelperSearchRequest(offset=20), _Loader(_page("h2")))
+
+    cache.invalidate_helper("h1", ["venmo"])
+    assert cache.metrics()["size"] == 2
+
+    cache.invalidate_helper("h1", ["pfp_url"])
+    assert cache.metrics()["size"] == 1
+
+    cache.invalidate_helper("h9", ["college"])
+    assert cache.metrics()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_a_search_in_flight_during_invalidation_is_not_stored():
+    cache = HelperSearchCache()
+    release = asyncio.Event()
+
+    async def slow(request):
+        await release.wait()
+        return _page("h1")
+
+    search = asyncio.create_task(cache.get_or_load(HelperSearchRequest(), slow))
+    await asyncio.sleep(0)
+    cache.invalidate_all()
+    release.set()
+    await search
+
+    assert cache.metrics()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_waiters_search_again_when_the_leading_caller_is_cancelled():
+    cache, load = HelperSearchCache(), _Loader()
+    release = asyncio.Event()
+
+    async def slow(request):
+        await release.wait()
+        return _page("h1")
+
+    leader = asyncio.create_task(cache.get_or_load(HelperSearchRequest(), slow))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_load(HelperSearchRequest(), load))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    page = await asyncio.wait_for(waiter, 1)
+    assert [helper.id for helper in page.helpers] == ["h1"]
+    assert leader.cancelled()
+    assert len(load.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_display_only_changes_drop_pages_with_the_helper():
+    cache = HelperSearchCache()
+    await cache.get_or_load(HelperSearchRequest(offset=0), _Loader(_page("h1")))
+    await cache.get_or_load(HelperSearchRequest(offset=20), _Loader(_page("h2")))
+
+    for field in ("phone", "email", "number_of_applications"):
+        cache.invalidate_helper("h9", [field])
+    assert cache.metrics()["size"] == 2
+
+    cache.invalidate_helper("h1", ["number_of_applications"])
+    assert cache.metrics()["size"] == 1
+
+
+@pytest.mark.asyncio
+async def test_profile_updates_invalidate_only_for_searched_fields(supabase):
+    supabase.tables["helpers"] = [{"id": "h1", "first_name": "Ann", "last_name": "Lee"}]
+    cache = HelperSearchCache()
+    service = ProfileService(supabase, helper_search_cache=cache)
+    await cache.get_or_load(HelperSearchRequest(), _Loader(_page("h1")))
+
+    await service.update_helper_profile("h1", ProfileUpdateData(venmo="@ann"))
+    assert cache.metrics()["size"] == 1
+
+    await service.update_helper_profile("h1", ProfileUpdateData(bio="Calculus tutor"))
+    assert cache.metrics()["size"] == 0
+    assert cache.metrics()["invalidations"] == 1
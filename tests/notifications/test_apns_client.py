@@ -0,0 +1,92 @@
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from app.services.apns_client import APNsClient, APNsError
+from app.services.notification_service import NotificationService
+
+SIGNING_KEY = ec.generate_private_key(ec.SECP256R1()).private_bytes(
+    serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+).decode()
+
+
+def _client(handler) -> APNsClient:
+    return APNsClient(
+        "https://apns.test", topic="com.helperu.test", key_id="KEY", team_id="TEAM",
+        private_key=SIGNING_KEY, transport=httpx.MockTransport(handler),
+    )
+
+
+def _reply(statuses):
+    """Answer each device token with its (status, reason)"""
+    def handler(request):
+        status, reason = statuses[request.url.path.rsplit("/", 1)[-1]]
+        return httpx.Response(status, json={"reason": reason} if reason else None)
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_retryable_statuses_raise_and_dead_tokens_are_classified():
+    client = _client(_reply({
+        "ok": (200, None), "gone": (410, "Unregistered"), "bad": (400, "BadDeviceToken"),
+        "big": (413, "PayloadTooLarge"), "busy": (429, "TooManyRequests"), "down": (503, "ServiceUnavailable"),
+    }))
+
+    ok, gone, bad, big, busy, down = await client.send_many(["ok", "gone", "bad", "big", "busy", "down"], {})
+    await client.aclose()
+
+    assert ok["status"] == 200 and not client.is_dead_token(ok)
+    assert client.is_dead_token(gone) and client.is_dead_token(bad)
+    assert big["status"] == 413 and not client.is_dead_token(big)
+    assert isinstance(busy, APNsError) and busy.status == 429
+    assert isinstance(down, APNsError) and down.reason == "ServiceUnavailable"
+
+
+def _helper_tokens(supabase, tokens):
+    """A helper row, with remove_helper_push_tokens filtering its tokens in place"""
+    helper = {"id": "h1", "push_notification_token": tokens}
+    supabase.tables["helpers"] = [helper]
+
+    def remove(params):
+        assert params["token_helper_id"] == helper["id"]
+        helper["push_notification_token"] = [
+            token for token in helper["push_notification_token"] if token not in params["dead_tokens"]
+        ]
+
+    supabase.rpcs["remove_helper_push_tokens"] = remove
+    return helper
+
+
+@pytest.mark.asyncio
+async def test_dead_tokens_are_pruned_and_only_missed_devices_are_retried(supabase, jobs):
+    helper = _helper_tokens(supabase, ["ok", "gone", "bad", "busy"])
+    apns = _client(_reply({
+        "ok": (200, None), "gone": (410, "Unregistered"), "bad": (400, "BadDeviceToken"), "busy": (429, None),
+    }))
+    service = NotificationService(supabase, membership_cache=object(), apns=apns, jobs=jobs)
+
+    await service.send_push_notification("h1", "s1", "c1", "hello")
+    await apns.aclose()
+
+    assert helper["push_notification_token"] == ["ok", "busy"]
+    assert ("remove_helper_push_tokens", {"token_helper_id": "h1", "dead_tokens": ["gone", "bad"]}) in supabase.calls
+    assert not any(query.action == "update" for query in supabase.queries)
+    assert jobs.enqueued == [("push.chat_message", {
+        "recipient_id": "h1", "sender_id": "s1", "chat_id": "c1", "content": "hello", "count": 1,
+        "device_tokens": ["busy"],
+    })]
+
+
+@pytest.mark.asyncio
+async def test_the_job_fails_when_no_device_got_the_push(supabase, jobs):
+    helper = _helper_tokens(supabase, ["busy", "gone"])
+    apns = _client(_reply({"busy": (503, None), "gone": (410, "Unregistered")}))
+    service = NotificationService(supabase, membership_cache=object(), apns=apns, jobs=jobs)
+
+    with pytest.raises(APNsError):
+        await service.send_push_notification("h1", "s1", "c1", "hello")
+    await apns.aclose()
+
+    assert helper["push_notification_token"] == ["busy"]
+    assert jobs.enqueued == []
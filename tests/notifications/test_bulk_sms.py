@@ -0,0 +1,195 @@
+import asyncio
+import json
+import time
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from app.schemas.sms import BulkNotificationRequest
+from app.services import bulk_sms_service
+from app.services.bulk_sms_service import BulkSMSService
+from app.services.openphone_client import OpenPhoneClient
+from app.utils.sms import SMSUtils
+
+
+def _campaign_tables(supabase):
+    """sms_campaigns and sms_campaign_chunks in memory, with the chunk-claiming rpc"""
+    supabase.tables.update({"sms_campaigns": [], "sms_campaign_chunks": []})
+    supabase.defaults["sms_campaigns"] = lambda: {"id": str(uuid4())}
+    supabase.defaults["sms_campaign_chunks"] = lambda: {"status": "pending", "message_id": None, "attempts": 0}
+
+    def claim(params):
+        # Claims in one step, like the UPDATE ... RETURNING in the rpc
+        claimable = [
+            row for row in supabase.tables["sms_campaign_chunks"]
+            if row["campaign_id"] == params["campaign"] and row["status"] == "pending"
+        ]
+        claimed = sorted(claimable, key=lambda row: row["chunk_index"])[:params["batch_size"]]
+        for row in claimed:
+            row.update(status="sending", attempts=row["attempts"] + 1)
+        return [dict(row) for row in claimed]
+
+    supabase.rpcs["claim_sms_campaign_chunks"] = claim
+
+
+def _smser(handler, chunk_size=2, **kwargs) -> SMSUtils:
+    smser = SMSUtils(client=OpenPhoneClient(
+        "https://openphone.test/v1", "key", max_retries=0, transport=httpx.MockTransport(handler), **kwargs
+    ))
+    smser.bulk_chunk_size = chunk_size
+    return smser
+
+
+def _numbers(count):
+    return [f"+1555000{i:04d}" for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_large_lists_are_sent_in_chunks_with_per_chunk_results():
+    sent = []
+
+    def handler(request):
+        recipients = json.loads(request.read())["to"]
+        sent.append(recipients)
+        if "+15550000002" in recipients:
+            return httpx.Response(400, text="invalid number")
+        return httpx.Response(202, json={"data": {"id": f"AC{len(sent)}"}})
+
+    smser = _smser(handler)
+    response = await smser.send_bulk_notification(BulkNotificationRequest(
+        phone_numbers=_numbers(5) + ["1 (555) 000-0000"], content="hello"
+    ))
+
+    assert sorted(len(chunk) for chunk in sent) == [1, 2, 2]
+    assert [chunk.recipients for chunk in response.chunks] == [
+        ["+15550000000", "+15550000001"], ["+15550000002", "+15550000003"], ["+15550000004"]
+    ]
+    assert not response.success
+    assert (response.total_recipients, response.successful_sends, response.failed_sends) == (5, 3, 2)
+    assert not response.chunks[1].success and "invalid number" in response.chunks[1].error
+    assert len(response.message_ids) == 2
+
+
+@pytest.mark.asyncio
+async def test_resuming_a_campaign_resends_only_failed_chunks(supabase):
+    sent = []
+    failing = {"+15550000002"}
+
+    def handler(request):
+        recipients = json.loads(request.read())["to"]
+        sent.append(recipients)
+        if failing & set(recipients):
+            return httpx.Response(400, text="invalid number")
+        return httpx.Response(202, json={"data": {"id": f"AC{len(sent)}"}})
+
+    _campaign_tables(supabase)
+    service = BulkSMSService(supabase, smser=_smser(handler))
+    first = await service.send(BulkNotificationRequest(phone_numbers=_numbers(5), content="hello"))
+
+    assert first.failed_sends == 2 and first.campaign_id
+    assert [row["status"] for row in supabase.tables["sms_campaign_chunks"]] == ["sent", "failed", "sent"]
+
+    failing.clear()
+    sent.clear()
+    resumed = await service.send(BulkNotificationRequest(
+        phone_numbers=[], content="ignored", campaign_id=first.campaign_id
+    ))
+
+    assert sent == [["+15550000002", "+15550000003"]]
+    assert resumed.success and resumed.successful_sends == 5
+    assert [chunk.attempts for chunk in resumed.chunks] == [1, 2, 1]
+    assert all(row["status"] == "sent" for row in supabase.tables["sms_campaign_chunks"])
+
+
+@pytest.mark.asyncio
+async def test_a_run_sends_permanently_failing_chunks_once(supabase, monkeypatch):
+    monkeypatch.setattr(bulk_sms_service, "CLAIM_BATCH", 2)
+    sent = []
+
+    def handler(request):
+        sent.append(json.loads(request.read())["to"])
+        return httpx.Response(400, text="invalid number")
+
+    _campaign_tables(supabase)
+    service = BulkSMSService(supabase, smser=_smser(handler, chunk_size=1))
+    response = await asyncio.wait_for(
+        service.send(BulkNotificationRequest(phone_numbers=_numbers(5), content="hello")), 1
+    )
+
+    assert sorted(sent) == [[number] for number in _numbers(5)]
+    assert response.failed_sends == 5
+    assert all(row["status"] == "failed" for row in supabase.tables["sms_campaign_chunks"])
+
+    sent.clear()
+    await asyncio.wait_for(service.resume(response.campaign_id), 1)
+    assert len(sent) == 5
+
+
+@pytest.mark.asyncio
+async def test_chunks_openphone_may_have_accepted_are_not_resent(supabase):
+    sent = []
+
+    def handler(request):
+        recipients = json.loads(request.read())["to"]
+        sent.append(recipients)
+        if "+15550000002" in recipients:
+            return httpx.Response(502, text="bad gateway")
+        if "+15550000004" in recipients:
+            raise httpx.ReadTimeout("timed out", request=request)
+        return httpx.Response(202, json={"data": {"id": f"AC{len(sent)}"}})
+
+    _campaign_tables(supabase)
+    service = BulkSMSService(supabase, smser=_smser(handler))
+    first = await service.send(BulkNotificationRequest(phone_numbers=_numbers(5), content="hello"))
+
+    assert [row["status"] for row in supabase.tables["sms_campaign_chunks"]] == ["sent", "unknown", "unknown"]
+    assert [chunk.uncertain for chunk in first.chunks] == [False, True, True]
+
+    sent.clear()
+    resumed = await service.resume(first.campaign_id)
+
+    assert sent == []
+    assert resumed.successful_sends == 2 and resumed.failed_sends == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_resumes_send_each_chunk_once(supabase):
+    sent = []
+
+    async def handler(request):
+        await asyncio.sleep(0.01)
+        sent.append(json.loads(request.content)["to"])
+        return httpx.Response(202, json={"data": {"id": f"AC{len(sent)}"}})
+
+    _campaign_tables(supabase)
+    supabase.tables["sms_campaigns"].append({"id": "c1", "content": "hello", "user_id": None})
+    supabase.tables["sms_campaign_chunks"].extend(
+        {"campaign_id": "c1", "chunk_index": index, "recipients": [number], "status": "pending",
+         "message_id": None, "attempts": 0}
+        for index, number in enumerate(_numbers(6))
+    )
+    service = BulkSMSService(supabase, smser=_smser(handler, chunk_size=1))
+
+    first, second = await asyncio.gather(service.resume("c1"), service.resume("c1"))
+
+    assert sorted(sent) == [[number] for number in _numbers(6)]
+    assert all(row["status"] == "sent" for row in supabase.tables["sms_campaign_chunks"])
+    assert first.successful_sends == 6
+    # The second run found every chunk claimed and reports them as in flight
+    assert second.successful_sends == 0 and all(chunk.uncertain for chunk in second.chunks)
+
+
+@pytest.mark.asyncio
+async def test_chunks_share_the_client_rate_limit():
+    def handler(request):
+        return httpx.Response(202, json={"data": {"id": "AC1"}})
+
+    smser = _smser(handler, chunk_size=1, rate_limit=50)
+    smser.client._limiter.burst = smser.client._limiter._tokens = 1
+    started = time.monotonic()
+    response = await smser.send_bulk_notification(BulkNotificationRequest(phone_numbers=_numbers(6), content="hi"))
+
+    assert response.successful_sends == 6
+    # One token up front, then one every 20ms
+    assert time.monotonic() - started >= 0.09
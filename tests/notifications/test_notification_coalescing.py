@@ -0,0 +1,108 @@
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from app.schemas.chat import MessageCreateRequest
+from app.schemas.sms import MessageNotification
+from app.services.apns_client import APNsClient
+from app.services.chat_service import ChatService
+from app.services.notification_service import NotificationService
+from app.services.openphone_client import OpenPhoneClient
+from app.utils.sms import SMSUtils
+
+
+class _Membership:
+    def __init__(self, members):
+        self.members = members
+
+    async def require_member(self, chat_id, user_id):
+        return self.members, user_id
+
+
+class _Batcher:
+    async def insert(self, row):
+        now = "2025-01-01T00:00:00+00:00"
+        return {"id": str(uuid4()), "is_read": False, "read_at": None, "created_at": now, "updated_at": now, **row}
+
+
+class _APNs:
+    is_dead_token = staticmethod(APNsClient.is_dead_token)
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_many(self, tokens, payload):
+        self.sent.append((list(tokens), payload))
+        return [{"device_token": token, "status": 200, "reason": None} for token in tokens]
+
+
+@pytest.mark.asyncio
+async def test_chat_messages_queue_one_coalesced_sms_per_recipient(supabase, jobs):
+    sender, recipient, chat_id = str(uuid4()), str(uuid4()), uuid4()
+    service = ChatService(
+        supabase, smser=object(), membership_cache=_Membership({sender, recipient}),
+        message_batcher=_Batcher(), jobs=jobs,
+    )
+
+    await service.send_message(chat_id, sender, MessageCreateRequest(content="one"))
+    await service.send_message(chat_id, sender, MessageCreateRequest(content="two"))
+
+    assert [key for _, key, _ in jobs.coalesced] == [f"sms.chat_message:{chat_id}:{recipient}"] * 2
+    assert jobs.coalesced[-1][2] == {
+        "recipient_id": recipient, "sender_id": sender, "chat_id": str(chat_id), "content": "two"
+    }
+
+
+@pytest.mark.asyncio
+async def test_summary_sms_counts_the_messages():
+    bodies = []
+
+    def handler(request):
+        bodies.append(request.read().decode())
+        return httpx.Response(202, json={"data": {"id": "AC1"}})
+
+    sms = SMSUtils(client=OpenPhoneClient("https://openphone.test/v1", "key", transport=httpx.MockTransport(handler)))
+    await sms.send_message_notification(MessageNotification(
+        recipient_phone="+15550001111", sender_name="Ann Lee", chat_id="c1",
+        message_preview="see you there", message_count=3,
+    ))
+
+    assert "3 new messages from Ann Lee" in bodies[0]
+    assert "see you there" in bodies[0]
+
+
+@pytest.mark.asyncio
+async def test_summary_push_names_the_sender(supabase, jobs):
+    sender, recipient, chat_id = str(uuid4()), str(uuid4()), str(uuid4())
+    supabase.tables.update({
+        "helpers": [{"id": recipient, "push_notification_token": ["tok1", "tok2"]}],
+        "clients": [{"id": sender, "first_name": "Ann", "last_name": "Lee", "pfp_url": None, "phone": None}],
+    })
+    apns = _APNs()
+    service = NotificationService(supabase, membership_cache=object(), apns=apns, jobs=jobs)
+
+    await service.send_push_notification(recipient, sender, chat_id, "latest", count=3)
+    await service.send_push_notification(recipient, sender, chat_id, "only one")
+
+    assert apns.sent[0][0] == ["tok1", "tok2"]
+    assert apns.sent[0][1]["aps"]["alert"]["body"] == "3 new messages from Ann Lee"
+    assert apns.sent[1][1]["aps"]["alert"]["body"] == "only one"
+
+
+@pytest.mark.asyncio
+async def test_pushes_are_queued_for_offline_members_only(supabase, jobs):
+    sender, online, offline, chat_id = str(uuid4()), str(uuid4()), str(uuid4()), uuid4()
+
+    class _Presence:
+        def online_users(self, _):
+            return {online}
+
+    service = NotificationService(
+        supabase, membership_cache=_Membership({sender, online, offline}),
+        presence=_Presence(), apns=_APNs(), jobs=jobs,
+    )
+
+    await service.send_msg_notification(chat_id, sender, "hi")
+
+    assert [key for _, key, _ in jobs.coalesced] == [f"push.chat_message:{chat_id}:{offline}"]
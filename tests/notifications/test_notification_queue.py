@@ -0,0 +1,170 @@
+import asyncio
+import itertools
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.notification_queue import NotificationQueue, RateLimiter
+
+
+def _queue_tables(supabase):
+    """notification_jobs in memory, with claim_notification_jobs taking due pending jobs and lapsed leases"""
+    ids = itertools.count(1)
+    supabase.defaults["notification_jobs"] = lambda: {
+        "id": next(ids), "status": "pending", "attempts": 0, "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+    def claim(params):
+        now = datetime.now(timezone.utc)
+        due = [
+            j for j in supabase.tables["notification_jobs"]
+            if (j["status"] == "pending" and j["run_at"] <= now.isoformat())
+            or (j["status"] == "running" and j["locked_until"] < now.isoformat())
+        ]
+        claimed = due[: params["batch_size"]]
+        locked_until = (now + timedelta(seconds=params["lease_seconds"])).isoformat()
+        for job in claimed:
+            job.update(status="running", attempts=job["attempts"] + 1, locked_by=params["worker_id"],
+                       locked_until=locked_until)
+        return [dict(job) for job in claimed]
+
+    supabase.rpcs.update({"claim_notification_jobs": claim, "prune_notification_jobs": []})
+    supabase.tables["notification_jobs"] = []
+    return supabase.tables["notification_jobs"]
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_once_and_are_marked_done(supabase):
+    queued = _queue_tables(supabase)
+    queue = NotificationQueue(supabase, workers=2, poll_interval=0.05)
+    calls = []
+
+    async def send(phone, body):
+        calls.append((phone, body))
+
+    queue.register("sms.test", send)
+    queue.start()
+    try:
+        await queue.enqueue_many([("sms.test", {"phone": "1", "body": "a"}), ("sms.test", {"phone": "2", "body": "b"})])
+        await _wait_for(lambda: all(job["status"] == "done" for job in queued))
+    finally:
+        await queue.stop()
+
+    assert sorted(calls) == [("1", "a"), ("2", "b")]
+    assert all(job["locked_by"] is None and job["finished_at"] for job in queued)
+    metrics = queue.metrics()
+    assert metrics["enqueued"] == 2 and metrics["succeeded"] == 2
+    assert metrics["latency_seconds"]["p50"] is not None
+
+
+@pytest.mark.asyncio
+async def test_failed_jobs_are_retried_with_backoff_then_given_up(supabase):
+    queued = _queue_tables(supabase)
+    queue = NotificationQueue(supabase, workers=1, poll_interval=0.02, max_attempts=3, backoff_base=0.05)
+    attempts = []
+
+    async def flaky():
+        attempts.append(time.monotonic())
+        raise RuntimeError("provider down")
+
+    queue.register("sms.flaky", flaky)
+    queue.start()
+    try:
+        await queue.enqueue("sms.flaky", {})
+        await _wait_for(lambda: queued[0]["status"] == "failed")
+    finally:
+        await queue.stop()
+
+    job = queued[0]
+    assert len(attempts) == 3 and job["attempts"] == 3
+    assert job["last_error"] == "provider down"
+    # Second retry waits about twice as long as the first
+    assert attempts[2] - attempts[1] > attempts[1] - attempts[0] > 0.03
+    assert queue.metrics()["retried"] == 2 and queue.metrics()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_job_kinds_fail_without_running(supabase):
+    queued = _queue_tables(supabase)
+    queue = NotificationQueue(supabase, workers=1, poll_interval=0.02)
+    queue.start()
+    try:
+        await queue.enqueue("sms.missing", {})
+        await _wait_for(lambda: queued[0]["status"] == "failed")
+    finally:
+        await queue.stop()
+
+    assert "No handler" in queued[0]["last_error"]
+
+
+@pytest.mark.asyncio
+async def test_slow_handlers_run_to_completion_and_keep_their_lease(supabase):
+    queued = _queue_tables(supabase)
+    queue = NotificationQueue(supabase, workers=1, poll_interval=0.02, lease_seconds=0.15)
+    sends = []
+
+    async def slow_send(body):
+        await asyncio.sleep(0.3)
+        sends.append(body)
+
+    queue.register("sms.slow", slow_send)
+    queue.start()
+    try:
+        await queue.enqueue("sms.slow", {"body": "hi"})
+        await _wait_for(lambda: "locked_until" in queued[0])
+        await _wait_for(lambda: queued[0]["status"] == "done")
+    finally:
+        await queue.stop()
+
+    assert sends == ["hi"]
+    assert queued[0]["attempts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_claimed_jobs_keep_their_lease_while_waiting_for_a_worker(supabase):
+    queued = _queue_tables(supabase)
+    sends = []
+
+    async def slow_send(body):
+        await asyncio.sleep(0.25)
+        sends.append(body)
+
+    busy = NotificationQueue(supabase, workers=2, poll_interval=0.02, lease_seconds=0.15)
+    busy.register("sms.slow", slow_send)
+    busy.start()
+    try:
+        await busy.enqueue("sms.slow", {"body": "a"})
+        await _wait_for(lambda: queued[0]["status"] == "running")
+        # Both claimed; "c" waits for a free worker for longer than its lease
+        await busy.enqueue_many([("sms.slow", {"body": "b"}), ("sms.slow", {"body": "c"})])
+        await _wait_for(lambda: all(job["status"] == "running" for job in queued))
+        other = NotificationQueue(supabase, workers=1, poll_interval=0.02, lease_seconds=0.15)
+        other.register("sms.slow", slow_send)
+        other.start()
+        try:
+            await _wait_for(lambda: all(job["status"] == "done" for job in queued))
+        finally:
+            await other.stop()
+    finally:
+        await busy.stop()
+
+    assert sorted(sends) == ["a", "b", "c"]
+    assert [job["attempts"] for job in queued] == [1, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_out_acquisitions_after_the_burst():
+    limiter = RateLimiter(rate=50, burst=2)
+    started = time.monotonic()
+    for _ in range(6):
+        await limiter.acquire()
+    # Two from the burst, then four at 50/s
+    assert time.monotonic() - started >= 0.07
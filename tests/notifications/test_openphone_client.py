@@ -0,0 +1,155 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.sms import MessageNotification
+from app.services.openphone_client import OpenPhoneClient
+from app.utils.sms import SMSUtils
+
+
+def _client(handler, **kwargs) -> OpenPhoneClient:
+    kwargs.setdefault("backoff_base", 0.001)
+    return OpenPhoneClient(
+        "https://openphone.test/v1", "key", transport=httpx.MockTransport(handler), **kwargs
+    )
+
+
+def _accepted(request):
+    return httpx.Response(202, json={"data": {"id": "AC1"}})
+
+
+@pytest.mark.asyncio
+async def test_throttled_requests_are_retried():
+    statuses = [429, 429, 202]
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        status = statuses.pop(0)
+        if status == 202:
+            return _accepted(request)
+        return httpx.Response(status, headers={"Retry-After": "0"})
+
+    client = _client(handler)
+    response = await client.send_message({"to": ["+15550001111"], "content": "hi"})
+    await client.aclose()
+
+    assert response.status_code == 202
+    assert len(seen) == 3
+    assert seen[0].headers["authorization"] == "key"
+    assert str(seen[0].url) == "https://openphone.test/v1/messages"
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries_and_returns_the_last_response():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(429, headers={"Retry-After": "0"})
+
+    client = _client(handler, max_retries=2)
+    response = await client.send_message({})
+    await client.aclose()
+
+    assert response.status_code == 429
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_connect_errors_are_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        return _accepted(request)
+
+    client = _client(handler)
+    assert (await client.send_message({})).status_code == 202
+    await client.aclose()
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_requests_that_may_have_been_accepted_are_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ReadTimeout("no response", request=request)
+        return httpx.Response(502, text="bad gateway")
+
+    client = _client(handler)
+    with pytest.raises(httpx.ReadTimeout):
+        await client.send_message({})
+    assert (await client.send_message({})).status_code == 502
+    await client.aclose()
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400, text="bad number")
+
+    client = _client(handler)
+    assert (await client.send_message({})).status_code == 400
+    await client.aclose()
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_in_flight_requests_are_capped():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _accepted(request)
+
+    client = _client(handler, max_concurrency=3)
+    await asyncio.gather(*(client.send_message({}) for _ in range(12)))
+    await client.aclose()
+
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_sms_utils_sends_through_the_async_client():
+    bodies = []
+
+    def handler(request):
+        bodies.append(request.content)
+        return _accepted(request)
+
+    sms = SMSUtils(client=_client(handler))
+    result = await sms.send_message_notification(MessageNotification(
+        recipient_phone="(555) 000-1111", sender_name="A B", chat_id="c1", message_preview="hello"
+    ))
+
+    assert result.message_id == "AC1"
+    assert result.recipients == ["+5550001111"]
+    assert b'"to":["+5550001111"]' in bodies[0].replace(b" ", b"")
+
+
+@pytest.mark.asyncio
+async def test_sms_utils_raises_when_openphone_rejects_the_message():
+    sms = SMSUtils(client=_client(lambda request: httpx.Response(400, text="bad number")))
+
+    with pytest.raises(HTTPException) as exc:
+        await sms.send_message_notification(MessageNotification(
+            recipient_phone="+15550001111", sender_name="A B", chat_id="c1", message_preview="hello"
+        ))
+    assert "bad number" in exc.value.detail
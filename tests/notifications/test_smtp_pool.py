@@ -0,0 +1,146 @@
+import asyncio
+import ssl
+from email.mime.text import MIMEText
+
+import aiosmtplib
+import pytest
+
+from app.services.smtp_pool import SMTPPool
+from app.utils.emailer import EmailUtils
+from tests.benchmarks._support import write_self_signed_cert
+from tests.benchmarks.smtp_sink import SMTPSink
+
+
+def _message(body: str) -> MIMEText:
+    message = MIMEText(body)
+    message["Subject"] = "Test"
+    return message
+
+
+async def _serve(sink: SMTPSink):
+    server = await sink.start()
+    return server, server.sockets[0].getsockname()[1]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_sends_share_one_authenticated_session():
+    sink = SMTPSink(username="bot@helperu.com", password="secret", keep_messages=True)
+    server, port = await _serve(sink)
+    pool = SMTPPool(
+        "127.0.0.1", port, username="bot@helperu.com", password="secret", starttls=False, max_connections=1
+    )
+
+    await asyncio.gather(*(
+        pool.send_message(_message(f"hello {i}\n.leading dot"), "bot@helperu.com", [f"user{i}@example.com"])
+        for i in range(20)
+    ))
+    await pool.aclose()
+    server.close()
+
+    assert sink.stats["connections"] == 1
+    assert sink.stats["logins"] == 1
+    assert sink.stats["messages"] == 20
+    assert sink.stats["quits"] == 1
+    sender, recipients, data = sink.messages[0]
+    assert sender == "bot@helperu.com" and recipients == ["user0@example.com"]
+    assert b"hello 0\r\n.leading dot\r\n" in data
+
+
+@pytest.mark.asyncio
+async def test_refused_recipient_raises_and_the_session_is_reused():
+    sink = SMTPSink()
+    server, port = await _serve(sink)
+    pool = SMTPPool("127.0.0.1", port, starttls=False)
+
+    with pytest.raises(aiosmtplib.SMTPRecipientsRefused):
+        await pool.send_message(_message("nope"), "bot@helperu.com", ["reject@example.com"])
+    await pool.send_message(_message("yes"), "bot@helperu.com", ["ok@example.com"])
+    await pool.aclose()
+    server.close()
+
+    assert sink.stats["connections"] == 1
+    assert sink.stats["messages"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_retired_after_max_messages():
+    sink = SMTPSink()
+    server, port = await _serve(sink)
+    pool = SMTPPool("127.0.0.1", port, starttls=False, max_messages_per_connection=2)
+
+    for i in range(5):
+        await pool.send_message(_message(str(i)), "bot@helperu.com", ["ok@example.com"])
+    await pool.aclose()
+    server.close()
+
+    assert sink.stats["messages"] == 5
+    assert pool.connections_opened == 3
+    # Retired sessions are closed with QUIT, and aclose() waits for them
+    assert sink.stats["quits"] == 3
+
+
+@pytest.mark.asyncio
+async def test_expired_idle_sessions_are_quit_before_aclose_returns():
+    sink = SMTPSink()
+    server, port = await _serve(sink)
+    pool = SMTPPool("127.0.0.1", port, starttls=False, idle_timeout=0)
+
+    for i in range(3):
+        await pool.send_message(_message(str(i)), "bot@helperu.com", ["ok@example.com"])
+    await pool.aclose()
+    server.close()
+
+    assert pool.connections_opened == 3
+    assert sink.stats["quits"] == 3
+    assert not pool._closing
+
+
+@pytest.mark.asyncio
+async def test_a_dropped_idle_session_is_replaced():
+    sink = SMTPSink()
+    server, port = await _serve(sink)
+    pool = SMTPPool("127.0.0.1", port, starttls=False)
+
+    await pool.send_message(_message("first"), "bot@helperu.com", ["ok@example.com"])
+    # The server drops the pooled session while it sits idle
+    pool._idle[0].smtp.transport.close()
+    await asyncio.sleep(0)
+    await pool.send_message(_message("second"), "bot@helperu.com", ["ok@example.com"])
+    await pool.aclose()
+    server.close()
+
+    assert sink.stats["messages"] == 2
+    assert pool.connections_opened == 2
+
+
+@pytest.mark.asyncio
+async def test_starttls_upgrades_before_login(tmp_path):
+    cert_path, key_path = write_self_signed_cert(str(tmp_path))
+    server_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server_context.load_cert_chain(cert_path, key_path)
+    sink = SMTPSink(ssl_context=server_context, username="bot", password="secret")
+    server, port = await _serve(sink)
+    pool = SMTPPool(
+        "127.0.0.1", port, username="bot", password="secret",
+        ssl_context=ssl.create_default_context(cafile=cert_path),
+    )
+
+    await pool.send_message(_message("secure"), "bot@helperu.com", ["ok@example.com"])
+    await pool.aclose()
+    server.close()
+
+    assert sink.stats["tls"] == 1 and sink.stats["messages"] == 1
+
+
+@pytest.mark.asyncio
+async def test_email_utils_reports_success_and_failure():
+    sink = SMTPSink()
+    server, port = await _serve(sink)
+    emailer = EmailUtils(pool=SMTPPool("127.0.0.1", port, starttls=False))
+
+    assert await emailer.send_contact_form_email("Ann", "ann@example.com", "Hi", "general", "Hello")
+    assert not await emailer.send_email("reject@example.com", "Subject", "Body")
+    await emailer.pool.aclose()
+    server.close()
+
+    assert sink.stats["messages"] == 2
@@ -0,0 +1,78 @@
+import pytest
+
+from app.services.application_service import ApplicationService
+
+NOW = "2025-01-01T00:00:00+00:00"
+
+
+def _task(task_id, client_id):
+    return {
+        "id": task_id,
+        "client_id": client_id,
+        "title": "Help",
+        "hourly_rate": 20,
+        "dates": [],
+        "location_type": "remote",
+        "description": "desc",
+        "created_at": NOW,
+        "updated_at": NOW,
+    }
+
+
+def _helper(helper_id):
+    return {
+        "id": helper_id,
+        "first_name": "Ann",
+        "last_name": "Lee",
+        "college": "Tufts",
+        "bio": "",
+        "graduation_year": 2026,
+        "zip_code": "02155",
+        "created_at": NOW,
+        "updated_at": NOW,
+    }
+
+
+def _seed(client, tasks, applications_per_task):
+    client.tables["tasks"] = tasks
+    client.tables["applications"] = [
+        {
+            "id": f"{task['id']}-a{i}",
+            "task_id": task["id"],
+            "helper_id": f"h{i}",
+            "introduction_message": "hi",
+            "created_at": NOW,
+            "updated_at": NOW,
+            "helpers": _helper(f"h{i}"),
+            "tasks": task,
+        }
+        for task in tasks
+        for i in range(applications_per_task)
+    ]
+
+
+def _service(client, jobs):
+    return ApplicationService(client, task_service=object(), helper_service=object(), smser=object(), jobs=jobs)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("task_count", [1, 5, 20])
+async def test_query_count_does_not_grow_with_tasks(supabase, jobs, task_count):
+    tasks = [_task(f"t{i}", "c1") for i in range(task_count)] + [_task("other", "c2")]
+    _seed(supabase, tasks, applications_per_task=2)
+
+    result = await _service(supabase, jobs).get_applications_by_client("c1", limit=100)
+
+    assert len(supabase.queries) == 1
+    assert result.total_count == 2 * task_count
+    assert {application.task.client_id for application in result.applications} == {"c1"}
+
+
+@pytest.mark.asyncio
+async def test_pages_are_over_applications_not_tasks(supabase, jobs):
+    _seed(supabase, [_task("t1", "c1"), _task("t2", "c1")], applications_per_task=3)
+
+    page = await _service(supabase, jobs).get_applications_by_client("c1", limit=4, offset=4)
+
+    assert page.total_count == 6
+    assert [application.application.id for application in page.applications] == ["t1-a1", "t1-a0"]
@@ -0,0 +1,76 @@
+import pytest
+from fastapi import HTTPException
+from postgrest.exceptions import APIError
+
+from app.schemas.applications import ApplicationCreateRequest
+from app.schemas.helper import HelperListResponse, HelperResponse, HelperSearchRequest
+from app.services.application_service import ApplicationService
+from app.services.helper_search_cache import HelperSearchCache
+from app.services.helper_service import HelperService
+
+NOW = "2025-01-01T00:00:00+00:00"
+
+CREATED = {
+    "application": {
+        "id": "a1", "task_id": "t1", "helper_id": "h1", "introduction_message": "hi",
+        "supplements_url": None, "created_at": NOW, "updated_at": NOW,
+    },
+    "helper": {
+        "id": "h1", "first_name": "Ann", "last_name": "Lee", "college": "Tufts", "bio": "",
+        "graduation_year": 2026, "zip_code": "02155", "number_of_applications": 4,
+    },
+    "task": {
+        "id": "t1", "client_id": "c1", "title": "Move", "hourly_rate": 20, "dates": [],
+        "location_type": "remote", "description": "desc", "created_at": NOW, "updated_at": NOW,
+        "client": {"id": "c1", "first_name": "Bo", "last_name": "Ng", "phone": "1", "email": "b@x.y"},
+    },
+}
+
+
+def _request():
+    return ApplicationCreateRequest(task_id="t1", helper_id="h1", introduction_message="hi")
+
+
+def _service(client, jobs, search_cache=None):
+    helper_service = HelperService(client, search_cache=search_cache)
+    return ApplicationService(client, task_service=object(), helper_service=helper_service, smser=object(), jobs=jobs)
+
+
+@pytest.mark.asyncio
+async def test_application_is_created_in_one_round_trip(supabase, jobs):
+    supabase.rpcs["create_application"] = CREATED
+    cache = HelperSearchCache()
+
+    async def search(request):
+        return HelperListResponse(helpers=[HelperResponse(**CREATED["helper"])], total_count=1, limit=20, offset=0)
+
+    await cache.get_or_load(HelperSearchRequest(), search)
+    response = await _service(supabase, jobs, cache).create_application("h1", "t1", _request())
+
+    assert [name for name, _ in supabase.calls] == ["create_application"]
+    assert supabase.queries == []
+    assert supabase.calls[0][1]["application_task_id"] == "t1"
+    assert supabase.calls[0][1]["application_helper_id"] == "h1"
+    assert response.application.id == "a1"
+    assert response.helper.first_name == "Ann"
+    assert response.task.client.first_name == "Bo"
+    assert jobs.notified == 1
+    # The cached page shows the helper's old application count
+    assert cache.metrics()["size"] == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("code, message, expected", [
+    ("23505", "You have already applied to this task", 400),
+    ("P0002", "Task not found", 404),
+    ("P0002", "Helper not found", 404),
+    ("XX000", "boom", 500),
+])
+async def test_rpc_errors_map_to_http_errors(supabase, jobs, code, message, expected):
+    supabase.rpcs["create_application"] = APIError({"code": code, "message": message})
+
+    with pytest.raises(HTTPException) as error:
+        await _service(supabase, jobs).create_application("h1", "t1", _request())
+
+    assert error.value.status_code == expected
+    assert jobs.notified == 0
@@ -0,0 +1,75 @@
+"""
+The radius-prefiltered search RPCs (0005, 0006) against the 0004 full scan.
+
+Runs on a scratch Postgres (``pgserver`` or BENCH_DATABASE_URL), so it is
+skipped when neither is available.
+"""
+import os
+
+import pytest
+
+from tests.benchmarks._support import SEARCH_SCHEMA_SQL, postgres_database, read_migration
+
+psycopg = pytest.importorskip("psycopg")
+if not os.environ.get("BENCH_DATABASE_URL"):
+    pytest.importorskip("pgserver")
+
+SEARCH = "SELECT id, distance FROM {}(%s, NULL, NULL, NULL, NULL, 1000, 0, %s)"
+
+ZIPS = [
+    ("02155", 42.4184, -71.1062),
+    ("02139", 42.3647, -71.1042),
+    ("10001", 40.7506, -73.9972),
+    ("94103", 37.7726, -122.4099),
+]
+# (zip, completed); 99999 has no row in zip_codes
+TASKS = [("02155", False), ("02139", False), ("10001", False), ("94103", False),
+         (None, False), ("99999", False), ("99999", True), ("02155", True)]
+
+
+@pytest.fixture(scope="module")
+def conn():
+    with postgres_database() as url, psycopg.connect(url, autocommit=True) as conn:
+        conn.execute(SEARCH_SCHEMA_SQL)
+        # Rows imported before the foreign key existed can point at unknown zips
+        conn.execute("ALTER TABLE tasks DROP CONSTRAINT IF EXISTS tasks_zip_code_fkey")
+        for name in ("0003_add_distance_calculation.sql", "0004_task_search_keyset_pagination.sql"):
+            conn.execute(read_migration(name))
+        for zip_code, lat, lng in ZIPS:
+            conn.execute(
+                "INSERT INTO zip_codes (zip_code, state, city, lat, lng) VALUES (%s, 'ST', 'City', %s, %s)",
+                (zip_code, lat, lng),
+            )
+        client_id = conn.execute(
+            "INSERT INTO clients (phone, email, first_name, last_name)"
+            " VALUES ('+15550000000', 'client@example.com', 'Client', 'One') RETURNING id"
+        ).fetchone()[0]
+        for i, (zip_code, completed) in enumerate(TASKS):
+            conn.execute(
+                "INSERT INTO tasks (client_id, hourly_rate, title, dates, location_type, zip_code,"
+                " description, completed_at, created_at)"
+                " VALUES (%s, 20, %s, '[]', 'in_person', %s, 'Task', CASE WHEN %s THEN now() END,"
+                " now() - make_interval(mins => %s))",
+                (client_id, f"Task {i}", zip_code, completed, i),
+            )
+        yield conn
+
+
+def _search(conn, function: str, zip_code: str, radius: int):
+    return conn.execute(SEARCH.format(function), (zip_code, radius)).fetchall()
+
+
+def test_prefiltered_search_matches_the_full_scan(conn):
+    cases = [(zip_code, radius) for zip_code in ("02155", "94103", "55555") for radius in (10, 250, 5000)]
+    before = {case: _search(conn, "get_tasks_with_distance", *case) for case in cases}
+    # Tasks in 99999 come back with an unknown distance
+    assert len(before[("02155", 10)]) == 4
+
+    conn.execute(read_migration("0005_task_distance_bounding_box.sql"))
+    assert {case: _search(conn, "get_tasks_with_distance", *case) for case in cases} == before
+
+    conn.execute(read_migration("0006_task_full_text_search.sql"))
+    assert {case: _search(conn, "get_tasks_with_distance", *case) for case in cases} == before
+    for case in cases:
+        relevance = _search(conn, "get_tasks_by_relevance", *case)
+        assert sorted(relevance, key=lambda row: row[0]) == sorted(before[case], key=lambda row: row[0])
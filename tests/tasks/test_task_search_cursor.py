@@ -0,0 +1,90 @@
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.task import TaskSearchRequest
+from app.services.task_service import TaskService
+from app.utils.pagination import InvalidCursorError, decode_cursor, task_search_cursor
+
+
+def _task(task_id, created_at, distance=None, location_type="in_person"):
+    return {
+        "id": task_id,
+        "client_id": "c1",
+        "title": "Help",
+        "hourly_rate": 20,
+        "dates": [],
+        "location_type": location_type,
+        "zip_code": "02155",
+        "description": "desc",
+        "created_at": created_at,
+        "updated_at": created_at,
+        "distance": distance,
+        "client": {"id": "c1", "first_name": "A", "last_name": "B", "phone": "1", "email": "a@b.c"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_distance_cursor_resumes_after_last_row(supabase):
+    page = [
+        _task("a", "2024-01-02T00:00:00+00:00", distance=1.5),
+        _task("b", "2024-01-01T00:00:00+00:00", distance=2.25),
+    ]
+    supabase.rpc_pages("get_tasks_with_distance", page, [])
+    service = TaskService(supabase, None, emailer=object(), smser=object())
+
+    first = await service.search_tasks(
+        TaskSearchRequest(search_zip_code="02155", search_limit=2, sort_by="distance")
+    )
+    assert first.next_cursor is not None
+    assert "cursor_id" not in supabase.calls[0][1]
+
+    second = await service.search_tasks(
+        TaskSearchRequest(
+            search_zip_code="02155", search_limit=2, sort_by="distance", cursor=first.next_cursor
+        )
+    )
+    name, params = supabase.calls[1]
+    assert name == "get_tasks_with_distance"
+    assert params["cursor_id"] == "b"
+    assert params["cursor_bucket"] == 1
+    assert params["cursor_distance"] == 2.25
+    assert params["cursor_created_at"] == "2024-01-01T00:00:00+00:00"
+    assert second.tasks == [] and second.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_cursor_for_another_sort_is_rejected(supabase):
+    cursor = task_search_cursor("post_date", _task("a", "2024-01-01T00:00:00+00:00"))
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, "distance")
+
+    service = TaskService(supabase, None, emailer=object(), smser=object())
+    with pytest.raises(HTTPException) as exc:
+        await service.search_tasks(
+            TaskSearchRequest(search_zip_code="02155", sort_by="distance", cursor=cursor)
+        )
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_relevance_cursor_keeps_reference_time(supabase):
+    page = [dict(_task("a", "2024-01-02T00:00:00+00:00"), relevance=0.7)]
+    supabase.rpc_pages("get_tasks_by_relevance", page, [])
+    service = TaskService(supabase, None, emailer=object(), smser=object())
+
+    first = await service.search_tasks(
+        TaskSearchRequest(search_zip_code="02155", search_limit=1, sort_by="relevance")
+    )
+    name, params = supabase.calls[0]
+    assert name == "get_tasks_by_relevance"
+    reference_time = params["rank_reference_time"]
+
+    await service.search_tasks(
+        TaskSearchRequest(
+            search_zip_code="02155", search_limit=1, sort_by="relevance", cursor=first.next_cursor
+        )
+    )
+    _, params = supabase.calls[1]
+    assert params["rank_reference_time"] == reference_time
+    assert params["cursor_relevance"] == 0.7
+    assert params["cursor_id"] == "a"
@@ -0,0 +1,46 @@
+import pytest
+
+from app.schemas.task import GetZipCodesRequest
+from app.services.task_service import TaskService
+from app.services.zip_code_index import ZipCodeIndex
+
+ROWS = [
+    {"zip_code": "02155", "city": "Medford", "state": "MA", "lat": 42.4184, "lng": -71.1062},
+    {"zip_code": "02139", "city": "Cambridge", "state": "MA", "lat": 42.3647, "lng": -71.1042},
+    {"zip_code": "10001", "city": "New York", "state": "NY", "lat": 40.7506, "lng": -73.9972},
+]
+
+
+def test_radius():
+    index = ZipCodeIndex(ROWS)
+
+    nearby = index.within_radius("02155", 200)
+    assert [zip_code for zip_code, _ in nearby] == ["02155", "02139", "10001"]
+    assert nearby[1][1] == pytest.approx(3.72, abs=0.05)
+    assert nearby[2][1] == pytest.approx(188, abs=2)
+    assert index.within_radius("02155", 10) == nearby[:2]
+    assert index.within_radius("99999", 10) == []
+
+
+def _service(client) -> TaskService:
+    return TaskService(client, None, emailer=object(), smser=object(), zip_code_index=ZipCodeIndex(ROWS))
+
+
+@pytest.mark.asyncio
+async def test_get_zip_codes_only_queries_unknown_zips(supabase):
+    response = await _service(supabase).get_zip_codes(GetZipCodesRequest(zip_codes=["02155", "10001", "99999"]))
+
+    assert [row.city for row in response.result] == ["Medford", "New York"]
+    assert [query.filters for query in supabase.queries] == [[("in", "zip_code", ["99999"])]]
+
+
+@pytest.mark.asyncio
+async def test_repeated_zips_are_returned_once(supabase):
+    supabase.tables["zip_codes"] = [{"zip_code": "99999", "city": "Nowhere", "state": "ZZ", "lat": 0, "lng": 0}]
+
+    response = await _service(supabase).get_zip_codes(
+        GetZipCodesRequest(zip_codes=["02155", "99999", "02155", "99999"])
+    )
+
+    assert [row.zip_code for row in response.result] == ["02155", "99999"]
+    assert [query.filters for query in supabase.queries] == [[("in", "zip_code", ["99999"])]]